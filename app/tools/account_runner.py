@@ -0,0 +1,312 @@
+"""Run the message analysis for several LinkedIn accounts in parallel
+
+Every account runs in its own worker process with its own Chrome profile, log
+file and credentials. A scheduler starts workers only while the machine has
+CPU and memory left for another Chrome instance, and the results of all
+accounts are collected into one report.
+
+Worker processes are started with `python -m app.tools.account_runner --worker`.
+The configuration is read from the environment at import time, so the account
+is handed to a worker through its environment rather than through arguments.
+"""
+import hashlib
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from app.utils.logger import logger
+from app.tools.browser_watchdog import process_tree_rss
+from app.utils.config import (
+    BASE_DIR, PROFILES_DIR, ACCOUNTS_FILE,
+    MAX_PARALLEL_ACCOUNTS, BROWSER_CPUS, BROWSER_MEMORY_MB, ACCOUNT_TIMEOUT
+)
+
+# Seconds between checks for finished workers and free resources
+POLL_INTERVAL = 0.5
+
+# Seconds a worker gets to shut its browser down after SIGTERM
+TERMINATE_GRACE = 10
+
+
+def account_key(email):
+    """Stable, file name safe identity of an account that does not reveal the address"""
+    return hashlib.sha256(email.lower().encode("utf-8")).hexdigest()[:16]
+
+
+def load_accounts(path=ACCOUNTS_FILE):
+    """Read the accounts to analyze from a JSON file
+
+    The file holds a list of objects with an "email" and either a "password"
+    or a "password_env" naming the environment variable that holds it. An
+    optional "name" is used in logs and the report instead of the address.
+
+    Returns:
+        list: Account dicts {'name', 'email', 'password'}
+
+    Raises:
+        ValueError: If the file is malformed or an account has no password
+    """
+    with open(path, "r") as f:
+        entries = json.load(f)
+
+    if not isinstance(entries, list):
+        raise ValueError(f"{path} must contain a list of accounts")
+
+    accounts = []
+    for index, entry in enumerate(entries):
+        email = entry.get("email") if isinstance(entry, dict) else None
+        if not email:
+            raise ValueError(f"Account #{index + 1} in {path} has no email")
+        password = entry.get("password") or os.getenv(entry.get("password_env") or "", "")
+        if not password:
+            raise ValueError(f"Account {entry.get('name') or email} has no password "
+                             f"(set password or password_env)")
+        accounts.append({"name": entry.get("name") or email, "email": email, "password": password})
+    return accounts
+
+
+def available_memory_mb():
+    """Memory available to new processes, from /proc/meminfo
+
+    Returns:
+        float: Available memory in MB, or None where it cannot be read
+    """
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def cpu_count():
+    """CPU cores this process may run on"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class ResourceScheduler:
+    """Decides how many Chrome instances may run at the same time
+
+    The CPU limit is fixed by the number of cores. The memory limit is checked
+    again before every start, so browsers that grow, or other programs on the
+    machine, hold back further workers. One worker is always allowed, so a
+    run makes progress even on a small machine.
+    """
+
+    def __init__(self, max_parallel=MAX_PARALLEL_ACCOUNTS, cpus_per_browser=BROWSER_CPUS,
+                 memory_per_browser_mb=BROWSER_MEMORY_MB, memory_probe=available_memory_mb,
+                 usage_probe=process_tree_rss, cpus=None):
+        """
+        Args:
+            max_parallel (int): Upper bound regardless of resources, 0 for none
+            cpus_per_browser (float): CPU cores reserved per Chrome instance
+            memory_per_browser_mb (int): Memory reserved per Chrome instance
+            memory_probe (callable): Returns the currently available memory in MB, or None
+            usage_probe (callable): Returns the memory in bytes used by a worker and its browser, or None
+            cpus (int): Number of cores, detected when None
+        """
+        self.max_parallel = max_parallel
+        self.memory_per_browser_mb = memory_per_browser_mb
+        self.memory_probe = memory_probe
+        self.usage_probe = usage_probe
+        cpus = cpus or cpu_count()
+        self.cpu_limit = max(1, int(cpus // cpus_per_browser)) if cpus_per_browser > 0 else None
+
+    def limit(self):
+        """Largest number of concurrent workers allowed by configuration and CPU, None for no limit"""
+        limits = [limit for limit in (self.max_parallel, self.cpu_limit) if limit]
+        return min(limits) if limits else None
+
+    def reserved_mb(self, pid):
+        """Memory a running worker has not taken yet, but will once its browser is up"""
+        used = self.usage_probe(pid)
+        if used is None:
+            return self.memory_per_browser_mb
+        return max(0, self.memory_per_browser_mb - used / (1024 * 1024))
+
+    def free_slots(self, running):
+        """Number of workers that may be started now, next to the ones already running
+
+        Args:
+            running (list): Process ids of the running workers
+        """
+        slots = self.limit() - len(running) if self.limit() else sys.maxsize
+        available = self.memory_probe() if self.memory_per_browser_mb > 0 else None
+        if available is not None:
+            # The available memory already leaves out what the running browsers use, only
+            # the share that a just started browser has not taken yet is held back
+            available -= sum(self.reserved_mb(pid) for pid in running)
+            slots = min(slots, int(available // self.memory_per_browser_mb))
+        return max(1 if not running else 0, slots)
+
+
+class AccountWorker:
+    """A worker process analyzing the inbox of one account"""
+
+    def __init__(self, account, work_dir):
+        self.account = account
+        self.key = account_key(account["email"])
+        self.result_path = os.path.join(work_dir, f"result_{self.key}.json")
+        self.process = None
+        self.started_at = None
+
+    def environment(self):
+        """Environment of the worker - credentials, browser profile and log file of its account"""
+        env = dict(os.environ)
+        env.update({
+            "LINKEDIN_EMAIL": self.account["email"],
+            "LINKEDIN_PASSWORD": self.account["password"],
+            "BROWSER_PROFILE_DIR": str(PROFILES_DIR / self.key),
+            "LOG_FILE_NAME": f"linkedin_log_{self.key}.jsonl",
+            # A one-shot worker has nothing to keep warm
+            "BROWSER_POOL_SIZE": "0",
+        })
+        return env
+
+    def command(self):
+        """Command line that starts the worker"""
+        return [sys.executable, "-m", "app.tools.account_runner", "--worker", "--result", self.result_path]
+
+    def start(self):
+        self.started_at = time.monotonic()
+        # Own process group, so Chrome and ChromeDriver are stopped along with the worker
+        self.process = subprocess.Popen(
+            self.command(), env=self.environment(), cwd=str(BASE_DIR),
+            stdin=subprocess.DEVNULL, start_new_session=True,
+        )
+        logger.info(f"Started worker for account {self.account['name']} (pid {self.process.pid})")
+
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    def poll(self):
+        """Exit code of the worker, None while it is running"""
+        return self.process.poll()
+
+    def stop(self):
+        """Stop the worker and everything it started"""
+        for sig, wait in ((signal.SIGTERM, TERMINATE_GRACE), (signal.SIGKILL, None)):
+            try:
+                os.killpg(self.process.pid, sig)
+            except (ProcessLookupError, PermissionError):
+                return
+            try:
+                self.process.wait(timeout=wait)
+                return
+            except subprocess.TimeoutExpired:
+                continue
+
+    def result(self, status=None):
+        """Result of a finished worker as reported in the run summary"""
+        result = {"account": self.account["name"], "seconds": round(self.elapsed(), 2)}
+        if status:
+            result.update(status=status, error=f"Account run exceeded {ACCOUNT_TIMEOUT:.0f} seconds")
+            return result
+
+        try:
+            with open(self.result_path, "r") as f:
+                result.update(json.load(f))
+        except (OSError, ValueError):
+            result.update(status="failed", error=f"Worker exited with code {self.process.returncode}")
+        return result
+
+
+def run_accounts(accounts, scheduler=None, timeout=ACCOUNT_TIMEOUT, worker_class=AccountWorker):
+    """Analyze the inboxes of several accounts in parallel worker processes
+
+    Args:
+        accounts (list): Account dicts as returned by load_accounts
+        scheduler (ResourceScheduler): Decides when another worker may start
+        timeout (float): Seconds after which a worker is stopped, 0 for no limit
+        worker_class: Worker implementation, replaced in tests
+
+    Returns:
+        list: One result dict per account, in the order of the accounts
+    """
+    scheduler = scheduler or ResourceScheduler()
+    pending = list(accounts)
+    running = []
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix="linkedin-accounts-") as work_dir:
+        try:
+            while pending or running:
+                for worker in list(running):
+                    if worker.poll() is not None:
+                        running.remove(worker)
+                        results[worker.key] = worker.result()
+                        logger.info(f"Account {worker.account['name']} finished: "
+                                    f"{results[worker.key]['status']} in {worker.elapsed():.1f}s")
+                    elif timeout and worker.elapsed() > timeout:
+                        logger.error(f"Account {worker.account['name']} timed out, stopping its worker")
+                        worker.stop()
+                        running.remove(worker)
+                        results[worker.key] = worker.result(status="timeout")
+
+                slots = scheduler.free_slots([worker.process.pid for worker in running])
+                for _ in range(min(len(pending), slots)):
+                    worker = worker_class(pending.pop(0), work_dir)
+                    worker.start()
+                    running.append(worker)
+
+                if pending or running:
+                    time.sleep(POLL_INTERVAL)
+        finally:
+            # Interrupted - take the remaining browsers down with us
+            for worker in running:
+                worker.stop()
+
+    return [results.get(account_key(account["email"]), {"account": account["name"], "status": "not_run"})
+            for account in accounts]
+
+
+def format_report(results):
+    """Human readable report of a multi-account run"""
+    succeeded = sum(1 for result in results if result.get("status") == "ok")
+    lines = [f"Analyzed {succeeded} of {len(results)} accounts"]
+    for result in results:
+        lines.append("")
+        lines.append(f"=== {result['account']} ({result.get('status')}, {result.get('seconds', 0):.1f}s) ===")
+        lines.append(result.get("output") or result.get("error") or "")
+    return "\n".join(lines)
+
+
+def run_worker(result_path):
+    """Body of a worker process - analyze the inbox of the account in the environment"""
+    from app.utils.tracing import tracer
+    from app.tools.linkedin_tools import AnalysisError, run_pipeline
+
+    start = time.perf_counter()
+    try:
+        result = {"status": "ok", "output": run_pipeline()["output"]}
+    except AnalysisError as e:
+        logger.error(f"Worker could not analyze the inbox: {e}")
+        result = {"status": "failed", "error": str(e)}
+    except Exception as e:
+        logger.error(f"Worker failed: {e}")
+        result = {"status": "failed", "error": str(e)}
+    finally:
+        tracer.export()
+    result["worker_seconds"] = round(time.perf_counter() - start, 2)
+
+    with open(result_path, "w") as f:
+        json.dump(result, f)
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Worker process of a multi-account run")
+    parser.add_argument("--worker", action="store_true", required=True)
+    parser.add_argument("--result", required=True, help="File the result is written to")
+    run_worker(parser.parse_args().result)
@@ -0,0 +1,301 @@
+"""Searchable history of analyzed conversations
+
+Every analysis result (contact, message, message type, suggestion, model and
+when it was made) is kept in one SQLite database with indexes on contact, type
+and time and an FTS5 full-text index over contacts, messages and suggestions,
+so "what did we suggest to X last week" is one indexed query instead of a grep
+through logs/message_analysis/.
+
+Usage:
+    python -m app.tools.analysis_store --contact "Jane Doe" --since 7d
+    python -m app.tools.analysis_store "contract renewal" --type sales_pitch --json
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from app.utils.logger import logger
+from app.utils.config import DATA_DIR, LINKEDIN_EMAIL, SUGGESTION_MODEL, ANALYSIS_HISTORY
+
+COLUMNS = ["id", "account", "conversation_key", "contact", "message", "message_type",
+           "suggestion", "message_count", "message_timestamp", "model", "run_id", "analyzed_at"]
+
+RELATIVE_TIME = re.compile(r"^(\d+(?:\.\d+)?)([mhdw])$")
+RELATIVE_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def parse_time(value, now=None):
+    """Turn a time range bound into a Unix timestamp
+
+    Args:
+        value (str): "30m", "24h", "7d" or "2w" ago, or an ISO date or date and time
+        now (float): Reference for relative times, defaults to the current time
+
+    Returns:
+        float: Unix timestamp
+
+    Raises:
+        ValueError: If the value is neither a relative time nor an ISO date
+    """
+    match = RELATIVE_TIME.match(value.strip().lower())
+    if match:
+        return (time.time() if now is None else now) - float(match.group(1)) * RELATIVE_UNITS[match.group(2)]
+    return datetime.fromisoformat(value.strip()).timestamp()
+
+
+def fts_query(text):
+    """Quote every word, so punctuation in the search text is not read as FTS5 syntax"""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+class AnalysisStore:
+    """SQLite-backed history of analysis results, shared by every account
+
+    Several worker processes of a multi-account run write to the same file,
+    so the database runs in WAL mode and writers wait for each other.
+    """
+
+    def __init__(self, path=None, account=None):
+        self.path = str(path or os.path.join(str(DATA_DIR), "analyses.sqlite3"))
+        self.account = account or LINKEDIN_EMAIL or "default"
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        if self.path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            "id INTEGER PRIMARY KEY, "
+            "account TEXT NOT NULL, "
+            "conversation_key TEXT, "
+            "contact TEXT, "
+            "message TEXT, "
+            "message_type TEXT, "
+            "suggestion TEXT, "
+            "message_count INTEGER, "
+            "message_timestamp TEXT, "
+            "model TEXT, "
+            "run_id TEXT, "
+            "analyzed_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS analyses_time ON analyses (analyzed_at);"
+            "CREATE INDEX IF NOT EXISTS analyses_contact ON analyses (contact COLLATE NOCASE, analyzed_at);"
+            "CREATE INDEX IF NOT EXISTS analyses_type ON analyses (message_type, analyzed_at);"
+        )
+        self.full_text = self._create_fts()
+        self._db.commit()
+
+    def _create_fts(self):
+        """Full-text index kept in sync by triggers, False where SQLite lacks FTS5"""
+        try:
+            self._db.executescript(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS analyses_fts USING fts5("
+                "contact, message, suggestion, content='analyses', content_rowid='id');"
+                "CREATE TRIGGER IF NOT EXISTS analyses_fts_insert AFTER INSERT ON analyses BEGIN "
+                "INSERT INTO analyses_fts (rowid, contact, message, suggestion) "
+                "VALUES (new.id, new.contact, new.message, new.suggestion); END;"
+                "CREATE TRIGGER IF NOT EXISTS analyses_fts_delete AFTER DELETE ON analyses BEGIN "
+                "INSERT INTO analyses_fts (analyses_fts, rowid, contact, message, suggestion) "
+                "VALUES ('delete', old.id, old.contact, old.message, old.suggestion); END;"
+            )
+            return True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite has no FTS5, text search of the analysis history falls back to LIKE: {e}")
+            return False
+
+    def add(self, analyzed, run_id=None, model=SUGGESTION_MODEL):
+        """Record the results of an analysis run
+
+        Args:
+            analyzed (list): Analysis dicts as yielded by stream_analysis
+            run_id (str): Groups the results of one run, defaults to the current time
+            model (str): Model that wrote the suggestions
+
+        Returns:
+            int: Number of results recorded
+        """
+        now = time.time()
+        run_id = run_id or datetime.fromtimestamp(now).strftime("%Y%m%d_%H%M%S")
+        rows = [
+            (
+                self.account,
+                msg.get("conversation_key"),
+                msg.get("contact"),
+                msg.get("message"),
+                msg.get("message_type"),
+                msg.get("potential_answer"),
+                msg.get("message_count"),
+                msg.get("timestamp"),
+                model,
+                run_id,
+                now,
+            )
+            for msg in analyzed
+        ]
+        try:
+            with self._lock:
+                self._db.executemany(
+                    "INSERT INTO analyses (account, conversation_key, contact, message, message_type, suggestion, "
+                    "message_count, message_timestamp, model, run_id, analyzed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Could not record {len(rows)} results in the analysis history: {e}")
+            return 0
+        return len(rows)
+
+    def search(self, text=None, contact=None, message_type=None, since=None, until=None,
+               account=None, limit=50):
+        """Find analysis results, newest first
+
+        Args:
+            text (str): Words that must all appear in the contact, message or suggestion
+            contact (str): Exact contact name, case-insensitive
+            message_type (str): One of the message types of the classifier
+            since (float): Unix timestamp, only results analyzed at or after it
+            until (float): Unix timestamp, only results analyzed before it
+            account (str): Only results of this account, all accounts when None
+            limit (int): Maximum number of results
+
+        Returns:
+            list: Result dicts with the keys in COLUMNS
+        """
+        conditions, params = [], []
+        source = "analyses"
+        order = "analyses.analyzed_at DESC, analyses.id DESC"
+        if text and self.full_text:
+            source = "analyses_fts JOIN analyses ON analyses.id = analyses_fts.rowid"
+            if not contact:
+                # Results are added in time order, so the text index can stop after the newest
+                # matches; a contact is more selective, its index is used then
+                order = "analyses_fts.rowid DESC"
+            conditions.append("analyses_fts MATCH ?")
+            params.append(fts_query(text))
+        elif text:
+            for word in text.split():
+                conditions.append("(analyses.contact LIKE ? OR analyses.message LIKE ? OR analyses.suggestion LIKE ?)")
+                params.extend([f"%{word}%"] * 3)
+        if contact:
+            conditions.append("analyses.contact = ? COLLATE NOCASE")
+            params.append(contact)
+        if message_type:
+            conditions.append("analyses.message_type = ?")
+            params.append(message_type)
+        if since is not None:
+            conditions.append("analyses.analyzed_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("analyses.analyzed_at < ?")
+            params.append(until)
+        if account:
+            conditions.append("analyses.account = ?")
+            params.append(account)
+
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        columns = ", ".join(f"analyses.{column}" for column in COLUMNS)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {columns} FROM {source} {where}ORDER BY {order} LIMIT ?",
+                params + [limit],
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self):
+        """Number of results stored, across all accounts"""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._db.close()
+
+
+def format_result(result):
+    """Format one stored result for the command line"""
+    analyzed_at = datetime.fromtimestamp(result["analyzed_at"]).strftime("%Y-%m-%d %H:%M")
+    return (
+        f"{analyzed_at}  {result['contact']} ({result['message_type']}, {result['account']})\n"
+        f"Message: {result['message']}\n"
+        f"Potential Answer: {result['suggestion']}\n"
+        f"{'=' * 50}"
+    )
+
+
+_analysis_store = None
+_analysis_store_lock = threading.Lock()
+
+
+def get_analysis_store():
+    """Return the process-wide analysis history, or None when it is disabled"""
+    global _analysis_store
+
+    if not ANALYSIS_HISTORY:
+        return None
+
+    with _analysis_store_lock:
+        if _analysis_store is None:
+            try:
+                _analysis_store = AnalysisStore()
+            except sqlite3.Error as e:
+                logger.error(f"Could not open the analysis history, results are only logged: {e}")
+                return None
+        return _analysis_store
+
+
+def main(argv=None):
+    """Search the analysis history from the command line"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Search the history of analyzed LinkedIn conversations.")
+    parser.add_argument("text", nargs="?", help="Words to find in contacts, messages and suggestions")
+    parser.add_argument("--contact", help="Exact contact name, case-insensitive")
+    parser.add_argument("--type", dest="message_type",
+                        help="Message type, e.g. job_opportunity, sales_pitch, connection_request or general")
+    parser.add_argument("--since", help="Start of the time range: 24h, 7d, 2w or an ISO date")
+    parser.add_argument("--until", help="End of the time range: 24h, 7d, 2w or an ISO date")
+    parser.add_argument("--account", help="Only results of this LinkedIn account")
+    parser.add_argument("--limit", type=int, default=20, help="Maximum number of results (default: 20)")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    parser.add_argument("--db", help="Database file (default: DATA_DIR/analyses.sqlite3)")
+    args = parser.parse_args(argv)
+
+    try:
+        since = parse_time(args.since) if args.since else None
+        until = parse_time(args.until) if args.until else None
+    except ValueError as e:
+        parser.error(f"invalid time: {e}")
+
+    path = args.db or os.path.join(str(DATA_DIR), "analyses.sqlite3")
+    if not os.path.exists(path):
+        print(f"No analysis history at {path} yet")
+        return []
+
+    store = AnalysisStore(path)
+    try:
+        start = time.perf_counter()
+        results = store.search(args.text, contact=args.contact, message_type=args.message_type,
+                               since=since, until=until, account=args.account, limit=args.limit)
+        elapsed = time.perf_counter() - start
+    finally:
+        store.close()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            print(format_result(result))
+        print(f"{len(results)} results in {elapsed * 1000:.1f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    main()
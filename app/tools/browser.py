@@ -5,72 +5,77 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.core.os_manager import ChromeType
+from selenium.common.exceptions import (
+    TimeoutException, NoSuchElementException, JavascriptException, StaleElementReferenceException
+)
 
 from app.utils.logger import logger
-from app.utils.config import HEADLESS
+from app.utils.tracing import tracer
+from app.tools.driver_cache import resolve_chromedriver
+from app.tools.browser_watchdog import process_tree_rss
+from app.utils.config import (
+    HEADLESS, WAIT_TIMEOUT, NETWORK_IDLE_TIME, NETWORK_IDLE_TIMEOUT, SCROLL_LOAD_TIMEOUT, DRIVERS_DIR, BROWSER_PROFILE_DIR,
+    LEAN_BROWSER, LEAN_BLOCKED_URL_PATTERNS, PAGE_LOAD_STRATEGY
+)
+
+# Returns [index, element] for the first selector that matches, or null
+FIRST_PRESENT_SCRIPT = """
+var selectors = arguments[0];
+for (var i = 0; i < selectors.length; i++) {
+    var element = document.querySelector(selectors[i]);
+    if (element) { return [i, element]; }
+}
+return null;
+"""
+
+# Number of resource requests the page has started, leaving out analytics beacons
+# and pings that keep firing on a loaded page
+RESOURCE_COUNT_SCRIPT = """
+var count = 0;
+var entries = window.performance.getEntriesByType('resource');
+for (var i = 0; i < entries.length; i++) {
+    var type = entries[i].initiatorType;
+    if (type !== 'beacon' && type !== 'ping') { count++; }
+}
+return count;
+"""
+
+# Raised by a poll while the page navigates away (e.g. after submitting a form), the next poll sees the new page
+TRANSIENT_WAIT_EXCEPTIONS = (JavascriptException, StaleElementReferenceException)
+
+# Chrome content settings for lean mode, 2 means blocked
+LEAN_CONTENT_SETTINGS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.default_content_setting_values.geolocation": 2,
+    "profile.default_content_setting_values.media_stream": 2,
+}
+
+# Chrome switches for lean mode
+LEAN_ARGUMENTS = [
+    '--blink-settings=imagesEnabled=false',
+    '--disable-remote-fonts',
+    '--autoplay-policy=user-gesture-required',
+    '--mute-audio',
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-extensions',
+]
 
 class BrowserTool:
     """A tool for managing the web browser using Selenium"""
     
-    def __init__(self):
+    def __init__(self, lean=LEAN_BROWSER):
+        """
+        Args:
+            lean (bool): Do not load images, video, audio, web fonts and trackers
+        """
         self.driver = None
+        self.lean = lean
+        self.started_at = None
         
-    def _get_chrome_version(self):
-        """Get the Chrome browser version installed on the system"""
-        import subprocess
-        import platform
-        import re
-        
-        try:
-            system = platform.system()
-            if system == "Linux":
-                # Try different commands for Linux
-                commands = [
-                    ["google-chrome", "--version"],
-                    ["google-chrome-stable", "--version"],
-                    ["chromium", "--version"],
-                    ["chromium-browser", "--version"]
-                ]
-                
-                for cmd in commands:
-                    try:
-                        output = subprocess.check_output(cmd, stderr=subprocess.STDOUT).decode('utf-8')
-                        version = re.search(r'\d+\.\d+\.\d+', output)
-                        if version:
-                            logger.info(f"Detected Chrome version: {version.group(0)}")
-                            return version.group(0)
-                    except:
-                        continue
-                        
-            elif system == "Darwin":  # macOS
-                cmd = ["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome", "--version"]
-                output = subprocess.check_output(cmd).decode('utf-8')
-                version = re.search(r'\d+\.\d+\.\d+', output)
-                if version:
-                    return version.group(0)
-                    
-            elif system == "Windows":
-                cmd = r'reg query "HKEY_CURRENT_USER\Software\Google\Chrome\BLBeacon" /v version'
-                output = subprocess.check_output(cmd, shell=True).decode('utf-8')
-                version = re.search(r'\d+\.\d+\.\d+\.\d+', output)
-                if version:
-                    return version.group(0)
-                    
-            logger.warning("Could not detect Chrome version, using default.")
-            return None
-            
-        except Exception as e:
-            logger.warning(f"Error detecting Chrome version: {e}")
-            return None
-        
-    def start_browser(self):
-        """Initialize and start the Chrome browser"""
-        logger.info("Starting browser...")
-        
-        # Set up Chrome options
+    def chrome_options(self):
+        """Build the Chrome options, including the lean mode settings when enabled"""
         options = Options()
         if HEADLESS:
             options.add_argument('--headless')
@@ -81,54 +86,97 @@ class BrowserTool:
         options.add_argument('--disable-blink-features=AutomationControlled')
         options.add_experimental_option('excludeSwitches', ['enable-automation'])
         options.add_experimental_option('useAutomationExtension', False)
+        if BROWSER_PROFILE_DIR:
+            # A profile per account keeps cookies and caches of parallel accounts apart
+            options.add_argument(f'--user-data-dir={BROWSER_PROFILE_DIR}')
+        options.page_load_strategy = PAGE_LOAD_STRATEGY
+        
+        if self.lean:
+            for argument in LEAN_ARGUMENTS:
+                options.add_argument(argument)
+            options.add_experimental_option('prefs', LEAN_CONTENT_SETTINGS)
+        return options
+    
+    def block_resources(self):
+        """Block the lean mode URL patterns for every request of the page, through DevTools
+        
+        Returns:
+            bool: True if the patterns are active
+        """
+        if not self.driver or not LEAN_BLOCKED_URL_PATTERNS:
+            return False
+        
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URL_PATTERNS})
+            logger.info(f"Lean mode: blocking {len(LEAN_BLOCKED_URL_PATTERNS)} URL patterns")
+            return True
+        except Exception as e:
+            # Images and fonts are still off through the Chrome settings
+            logger.warning(f"Could not block URLs through DevTools: {e}")
+            return False
+        
+    def _launch(self, driver_path, options):
+        """Start Chrome through the given ChromeDriver and prepare it for use"""
+        service = Service(executable_path=driver_path) if driver_path else Service()
+        self.driver = webdriver.Chrome(service=service, options=options)
+        self._prepare_driver()
+    
+    def _prepare_driver(self):
+        """Setup every started browser gets, whichever way the driver was found"""
+        self.driver.maximize_window()
+        
+        # Mask automation
+        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        
+        if self.lean:
+            self.block_resources()
+    
+    @tracer.traced("browser.start")
+    def start_browser(self):
+        """Initialize and start the Chrome browser"""
+        logger.info("Starting browser...")
+        self.started_at = time.monotonic()
+        
+        # Set up Chrome options
+        options = self.chrome_options()
         
         # Initialize Chrome driver
         try:
-            # Try to detect Chrome version
-            chrome_version = self._get_chrome_version()
-            
-            # Create a local .drivers directory in the project root for driver storage
-            import os
-            drivers_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".drivers")
-            os.makedirs(drivers_dir, exist_ok=True)
-            logger.info(f"Using drivers directory: {drivers_dir}")
-            
-            # Import ChromeDriverManager within the function scope to avoid variable access issues
-            from webdriver_manager.chrome import ChromeDriverManager
-            
-            # Install ChromeDriver with version if available
-            if chrome_version:
-                logger.info(f"Installing ChromeDriver for Chrome version {chrome_version}")
-                driver_path = ChromeDriverManager(version=chrome_version, path=drivers_dir).install()
-            else:
-                logger.info("Installing latest ChromeDriver")
-                driver_path = ChromeDriverManager(path=drivers_dir).install()
-                
-            logger.info(f"Using ChromeDriver from path: {driver_path}")
-            
-            # Make sure ChromeDriver is executable
-            os.chmod(driver_path, 0o755)
-            
-            service = Service(executable_path=driver_path)
-            self.driver = webdriver.Chrome(service=service, options=options)
-            self.driver.maximize_window()
+            # Resolve the driver from the manifest - probing Chrome and installing
+            # a driver only happens when the browser binary has changed
+            resolved = resolve_chromedriver()
+            if not resolved:
+                raise RuntimeError("Could not resolve a ChromeDriver for the installed Chrome")
             
-            # Mask automation
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            try:
+                options.binary_location = resolved["chrome_binary"]
+                logger.info(f"Using ChromeDriver from path: {resolved['driver_path']}")
+                self._launch(resolved["driver_path"], options)
+            except Exception as e:
+                if not resolved.get("cached"):
+                    raise
+                # Chrome may have been updated without changing the size or mtime of its
+                # binary, so the cached driver is resolved again once before giving up
+                logger.warning(f"Cached ChromeDriver failed to start, resolving it again: {e}")
+                resolved = resolve_chromedriver(refresh=True)
+                if not resolved:
+                    raise
+                options.binary_location = resolved["chrome_binary"]
+                self._launch(resolved["driver_path"], options)
             
             logger.info("Browser started successfully")
             return True
         except Exception as e:
             logger.error(f"Failed to start browser: {e}")
             import os
-            import glob
             import subprocess
             
             if "Exec format error" in str(e):
                 logger.error("This appears to be an executable permission issue with ChromeDriver")
                 try:
                     # Find the correct ChromeDriver executable in the .drivers directory
-                    drivers_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".drivers")
+                    drivers_dir = str(DRIVERS_DIR)
                     
                     # Try to find Chrome/Chromium to determine if it's installed
                     try:
@@ -161,33 +209,13 @@ class BrowserTool:
                                 os.chmod(driver, 0o755)
                                 
                                 # Try to use this driver
-                                service = Service(executable_path=driver)
-                                self.driver = webdriver.Chrome(service=service, options=options)
-                                self.driver.maximize_window()
+                                self._launch(driver, options)
                                 
                                 logger.info(f"Success! Using ChromeDriver: {driver}")
                                 return True
                             except Exception as inner_e:
                                 logger.error(f"Failed with this driver: {inner_e}")
                                 continue
-                    
-                    # If we're here, none of the existing drivers worked
-                    logger.info("Attempting to download ChromeDriver again with different settings")
-                    
-                    # Try a few different approaches
-                    try:
-                        # Try using ChromeDriverManager with explicit version
-                        from webdriver_manager.chrome import ChromeDriverManager
-                        driver_path = ChromeDriverManager(version="latest", path=drivers_dir).install()
-                        os.chmod(driver_path, 0o755)
-                        
-                        service = Service(executable_path=driver_path)
-                        self.driver = webdriver.Chrome(service=service, options=options)
-                        self.driver.maximize_window()
-                        logger.info("Browser started successfully with 'latest' ChromeDriver")
-                        return True
-                    except Exception as retry_e:
-                        logger.error(f"Failed to start with 'latest' version: {retry_e}")
                         
                 except Exception as e2:
                     logger.error(f"Failed to fix ChromeDriver issues: {e2}")
@@ -211,7 +239,8 @@ class BrowserTool:
         
         try:
             logger.info(f"Navigating to URL: {url}")
-            self.driver.get(url)
+            with tracer.span("browser.navigate", url=url):
+                self.driver.get(url)
             return True
         except Exception as e:
             logger.error(f"Failed to navigate to {url}: {e}")
@@ -219,14 +248,104 @@ class BrowserTool:
     
     def wait_for_element(self, selector, by=By.CSS_SELECTOR, timeout=10):
         """Wait for an element to be present on the page"""
-        try:
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((by, selector))
-            )
-            return element
-        except TimeoutException:
-            logger.error(f"Timed out waiting for element with selector: {selector}")
+        start = time.monotonic()
+        with tracer.span("browser.wait", condition=f"element {selector}") as span:
+            try:
+                element = WebDriverWait(self.driver, timeout).until(
+                    EC.presence_of_element_located((by, selector))
+                )
+                logger.info(f"Element {selector} appeared after {time.monotonic() - start:.2f}s")
+                return element
+            except TimeoutException:
+                span.set(timed_out=True)
+                logger.error(f"Timed out after {time.monotonic() - start:.2f}s waiting for element with selector: {selector}")
+                return None
+    
+    def wait_until(self, condition, timeout=None, description="condition", poll_frequency=0.1):
+        """Wait until a condition is met instead of sleeping for a fixed time
+        
+        Args:
+            condition (callable): Called with the driver, waiting ends when it returns a truthy value
+            timeout (float): Upper bound in seconds, defaults to WAIT_TIMEOUT
+            description (str): Human readable name of the condition for logging
+            poll_frequency (float): Seconds between condition checks
+            
+        Returns:
+            The truthy value returned by the condition, or None on timeout
+        """
+        if not self.driver:
+            logger.error("Browser not started. Call start_browser() first.")
             return None
+        
+        timeout = WAIT_TIMEOUT if timeout is None else timeout
+        start = time.monotonic()
+        with tracer.span("browser.wait", condition=description) as span:
+            try:
+                result = WebDriverWait(self.driver, timeout, poll_frequency=poll_frequency,
+                                       ignored_exceptions=TRANSIENT_WAIT_EXCEPTIONS).until(condition)
+                logger.info(f"Waited {time.monotonic() - start:.2f}s for {description}")
+                return result
+            except TimeoutException:
+                span.set(timed_out=True)
+                logger.warning(f"Timed out after {time.monotonic() - start:.2f}s waiting for {description}")
+                return None
+    
+    def wait_for_network_idle(self, idle_time=None, timeout=None):
+        """Wait until the page has not started any new network request for idle_time seconds
+        
+        Beacons and pings are not counted. The wait is capped at NETWORK_IDLE_TIMEOUT
+        by default, a page that keeps polling in the background is parsed as it is.
+        """
+        idle_time = NETWORK_IDLE_TIME if idle_time is None else idle_time
+        timeout = NETWORK_IDLE_TIMEOUT if timeout is None else timeout
+        state = {"count": -1, "since": time.monotonic()}
+        
+        def network_idle(driver):
+            count = driver.execute_script(RESOURCE_COUNT_SCRIPT)
+            now = time.monotonic()
+            if count != state["count"]:
+                state["count"], state["since"] = count, now
+                return False
+            return now - state["since"] >= idle_time
+        
+        return self.wait_until(network_idle, timeout, description="network idle")
+    
+    def first_present(self, selectors):
+        """Check several CSS selectors in a single round trip to the browser
+        
+        Returns:
+            tuple: (selector, element) for the first selector present on the page, or None
+        """
+        match = self.driver.execute_script(FIRST_PRESENT_SCRIPT, selectors)
+        if match:
+            return selectors[match[0]], match[1]
+        return None
+    
+    def wait_for_any_element(self, selectors, by=By.CSS_SELECTOR, timeout=None):
+        """Wait until any of the given selectors matches an element
+        
+        Args:
+            selectors (list): Selectors to check on each poll, in priority order
+            by: Locator strategy shared by all selectors
+            timeout (float): Upper bound in seconds, defaults to WAIT_TIMEOUT
+            
+        Returns:
+            tuple: (selector, element) for the first match, or None on timeout
+        """
+        def any_present(driver):
+            # CSS selectors are all raced in one script call per poll
+            if by == By.CSS_SELECTOR:
+                return self.first_present(selectors) or False
+            for selector in selectors:
+                elements = driver.find_elements(by, selector)
+                if elements:
+                    return selector, elements[0]
+            return False
+        
+        with tracer.span("browser.wait_for_any_element", selectors=len(selectors)) as span:
+            match = self.wait_until(any_present, timeout, description=f"any of {', '.join(selectors)}")
+            span.set(selector_hit=match[0] if match else None)
+            return match
     
     def find_element(self, selector, by=By.CSS_SELECTOR):
         """Find an element on the page"""
@@ -278,11 +397,27 @@ class BrowserTool:
             return ""
         
         try:
-            return self.driver.page_source
+            with tracer.span("browser.page_source") as span:
+                page_source = self.driver.page_source
+                span.set(bytes=len(page_source))
+            return page_source
         except Exception as e:
             logger.error(f"Failed to get page source: {e}")
             return ""
     
+    def execute_script(self, script, *args):
+        """Run JavaScript in the page and return its result, or None if it fails"""
+        if not self.driver:
+            logger.error("Browser not started. Call start_browser() first.")
+            return None
+        
+        try:
+            with tracer.span("browser.execute_script"):
+                return self.driver.execute_script(script, *args)
+        except Exception as e:
+            logger.error(f"Failed to execute script in the page: {e}")
+            return None
+    
     def get_element_text(self, selector, by=By.CSS_SELECTOR):
         """Get the text content of an element"""
         element = self.find_element(selector, by)
@@ -313,6 +448,84 @@ class BrowserTool:
             logger.error(f"Failed to scroll to element: {e}")
             return False
     
+    def is_alive(self):
+        """Cheap health check that the browser and driver session still respond"""
+        if not self.driver:
+            return False
+        
+        try:
+            return bool(self.driver.window_handles)
+        except Exception as e:
+            logger.warning(f"Browser health check failed: {e}")
+            return False
+    
+    def age(self):
+        """Seconds since the browser was started, or None if it is not running"""
+        if not self.driver or self.started_at is None:
+            return None
+        return time.monotonic() - self.started_at
+    
+    def memory_usage(self):
+        """Resident memory of ChromeDriver, Chrome and all of Chrome's child processes
+        
+        Returns:
+            int: Bytes, or None if the browser is not running or the platform has no /proc
+        """
+        try:
+            pid = self.driver.service.process.pid
+        except AttributeError:
+            return None
+        return process_tree_rss(pid)
+    
+    def count_elements(self, selector):
+        """Count elements matching a CSS selector without transferring them"""
+        try:
+            return self.driver.execute_script("return document.querySelectorAll(arguments[0]).length", selector)
+        except Exception as e:
+            logger.error(f"Failed to count elements with selector '{selector}': {e}")
+            return 0
+    
+    def scroll_for_more(self, item_selector, direction="down", timeout=None):
+        """Scroll a lazily loaded list past its last (or first) item and wait for more items
+        
+        Bringing the edge item into view triggers LinkedIn's infinite-scroll
+        loading regardless of which container actually scrolls.
+        
+        Args:
+            item_selector (str): CSS selector of the list items
+            direction (str): "down" for newer-to-older lists such as the inbox,
+                             "up" for threads that load older messages at the top
+            timeout (float): Seconds to wait for new items, defaults to SCROLL_LOAD_TIMEOUT
+            
+        Returns:
+            int: New item count, or None if no more items were loaded
+        """
+        timeout = SCROLL_LOAD_TIMEOUT if timeout is None else timeout
+        before = self.count_elements(item_selector)
+        if not before:
+            return None
+        
+        try:
+            self.driver.execute_script(
+                "var items = document.querySelectorAll(arguments[0]);"
+                "var edge = arguments[1] === 'up' ? items[0] : items[items.length - 1];"
+                "edge.scrollIntoView({block: arguments[1] === 'up' ? 'start' : 'end'});",
+                item_selector,
+                direction
+            )
+        except Exception as e:
+            logger.error(f"Failed to scroll list '{item_selector}': {e}")
+            return None
+        
+        def more_items(driver):
+            count = self.count_elements(item_selector)
+            return count if count > before else False
+        
+        with tracer.span("browser.scroll_for_more", selector=item_selector, before=before) as span:
+            count = self.wait_until(more_items, timeout, description=f"more items in {item_selector}")
+            span.set(after=count)
+            return count
+    
     def sleep(self, seconds):
         """Pause execution for the specified number of seconds"""
         time.sleep(seconds)
@@ -324,6 +537,7 @@ class BrowserTool:
             try:
                 self.driver.quit()
                 self.driver = None
+                self.started_at = None
                 logger.info("Browser closed successfully")
                 return True
             except Exception as e:
@@ -359,17 +573,12 @@ class BrowserTool:
             
             # Try direct ChromeDriver download without using webdriver_manager
             try:
-                from selenium.webdriver.chrome.service import Service
-                from selenium import webdriver
-                
                 # Create a temporary directory for ChromeDriver if needed
                 chrome_driver_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".chromedriver")
                 os.makedirs(chrome_driver_dir, exist_ok=True)
                 
                 # Use selenium's built-in service
-                service = Service()
-                self.driver = webdriver.Chrome(service=service, options=options)
-                self.driver.maximize_window()
+                self._launch(None, options)
                 logger.info("Successfully started browser using Selenium's built-in ChromeDriver service")
                 return True
             except Exception as selenium_e:
@@ -386,9 +595,7 @@ class BrowserTool:
                     logger.info("Could not find system chromedriver")
                 
                 if chrome_driver_path and os.path.exists(chrome_driver_path):
-                    service = Service(executable_path=chrome_driver_path)
-                    self.driver = webdriver.Chrome(service=service, options=options)
-                    self.driver.maximize_window()
+                    self._launch(chrome_driver_path, options)
                     logger.info("Successfully started browser using system chromedriver")
                     return True
             except Exception as system_e:
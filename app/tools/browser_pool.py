@@ -0,0 +1,234 @@
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+
+from app.tools.linkedin import LinkedInTool
+from app.tools.browser_watchdog import BrowserWatchdog
+from app.utils.logger import logger
+from app.utils.config import (
+    BROWSER_POOL_SIZE,
+    BROWSER_POOL_MAX_AGE,
+    BROWSER_POOL_MAX_USES,
+    BROWSER_POOL_CHECKOUT_TIMEOUT,
+)
+
+
+class PooledBrowser:
+    """Bookkeeping for a LinkedInTool (and its BrowserTool) held by the pool"""
+
+    def __init__(self, tool):
+        self.tool = tool
+        self.created_at = time.monotonic()
+        self.uses = 0
+
+    @property
+    def age(self):
+        return time.monotonic() - self.created_at
+
+
+class BrowserPool:
+    """A bounded pool of started, logged-in LinkedInTool instances
+
+    Browsers are checked out for one unit of work and checked back in afterwards.
+    A browser is recycled (closed and replaced on the next checkout) when it fails
+    its health check, gets older than max_age seconds, has served max_uses
+    checkouts or is checked in above the memory limit of the watchdog.
+    """
+
+    def __init__(self, size=BROWSER_POOL_SIZE, max_age=BROWSER_POOL_MAX_AGE,
+                 max_uses=BROWSER_POOL_MAX_USES, factory=LinkedInTool, watchdog=None):
+        self.size = max(1, size)
+        self.max_age = max_age
+        self.max_uses = max_uses
+        self.factory = factory
+        self.watchdog = watchdog or BrowserWatchdog()
+        self._idle = []
+        self._leased = {}
+        self._creating = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def _create(self):
+        """Start and log in a new browser, returning None if either step fails"""
+        tool = self.factory()
+        if not tool.start():
+            logger.error("Browser pool could not start a browser")
+            tool.close()
+            return None
+
+        if not tool.login():
+            logger.error("Browser pool could not log in to LinkedIn")
+            tool.close()
+            return None
+
+        logger.info("Browser pool added a warm browser")
+        return PooledBrowser(tool)
+
+    def _is_reusable(self, pooled):
+        """Health check plus max-age/max-uses recycling rules"""
+        if self.max_age and pooled.age > self.max_age:
+            logger.info(f"Recycling pooled browser after {pooled.age:.0f}s")
+            return False
+        if self.max_uses and pooled.uses >= self.max_uses:
+            logger.info(f"Recycling pooled browser after {pooled.uses} uses")
+            return False
+        if not pooled.tool.logged_in or not pooled.tool.browser.is_alive():
+            logger.info("Recycling unhealthy pooled browser")
+            return False
+        return True
+
+    def warm(self, count=None):
+        """Pre-start browsers so the first checkouts do not pay for start-up and login
+
+        Args:
+            count (int): Number of idle browsers to have ready, defaults to the pool size
+
+        Returns:
+            int: Number of idle browsers after warming
+        """
+        count = min(self.size, count or self.size)
+        while True:
+            with self._condition:
+                total = len(self._idle) + len(self._leased) + self._creating
+                if self._closed or len(self._idle) >= count or total >= self.size:
+                    return len(self._idle)
+                self._creating += 1
+
+            pooled = self._create()
+            with self._condition:
+                self._creating -= 1
+                if pooled:
+                    self._idle.append(pooled)
+                self._condition.notify()
+            if not pooled:
+                return len(self._idle)
+
+    def checkout(self, timeout=BROWSER_POOL_CHECKOUT_TIMEOUT):
+        """Take a ready browser from the pool, starting one if there is room
+
+        Args:
+            timeout (float): Seconds to wait for a browser when the pool is exhausted
+
+        Returns:
+            LinkedInTool: A started, logged-in tool, or None if none could be provided
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            stale = []
+            with self._condition:
+                while True:
+                    if self._closed:
+                        return None
+
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        if self._is_reusable(pooled):
+                            pooled.uses += 1
+                            self._leased[id(pooled.tool)] = pooled
+                            return pooled.tool
+                        stale.append(pooled)
+                        continue
+
+                    total = len(self._leased) + self._creating
+                    if total < self.size:
+                        self._creating += 1
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        logger.error("Timed out waiting for a browser from the pool")
+                        return None
+                    self._condition.wait(remaining)
+
+            # Slow work happens outside the lock
+            for pooled in stale:
+                pooled.tool.close()
+
+            pooled = self._create()
+            with self._condition:
+                self._creating -= 1
+                if pooled:
+                    pooled.uses += 1
+                    self._leased[id(pooled.tool)] = pooled
+                    return pooled.tool
+                self._condition.notify()
+                return None
+
+    def checkin(self, tool, healthy=True):
+        """Return a browser to the pool
+
+        Args:
+            tool (LinkedInTool): Tool previously returned by checkout()
+            healthy (bool): Pass False to discard the browser, e.g. after an error
+        """
+        # Measured outside the lock, reading the process tree takes a few milliseconds
+        reason = self.watchdog.recycle_reason(tool.browser) if healthy else None
+        if reason:
+            logger.info(f"Recycling pooled browser: {reason}")
+            healthy = False
+
+        with self._condition:
+            pooled = self._leased.pop(id(tool), None)
+            keep = pooled is not None and healthy and not self._closed and self._is_reusable(pooled)
+            if keep:
+                self._idle.append(pooled)
+            self._condition.notify()
+
+        if not keep:
+            tool.close()
+
+    @contextmanager
+    def lease(self, timeout=BROWSER_POOL_CHECKOUT_TIMEOUT):
+        """Context manager around checkout()/checkin(), yields None if no browser is available"""
+        tool = self.checkout(timeout)
+        if tool is None:
+            yield None
+            return
+
+        healthy = True
+        try:
+            yield tool
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            self.checkin(tool, healthy=healthy)
+
+    def close(self):
+        """Close every idle browser and stop handing out new ones"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+
+        for pooled in idle:
+            pooled.tool.close()
+
+    def stats(self):
+        """Current pool occupancy"""
+        with self._condition:
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "leased": len(self._leased),
+                "creating": self._creating,
+            }
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """Return the process-wide pool, or None when BROWSER_POOL_SIZE is 0"""
+    global _shared_pool
+
+    if BROWSER_POOL_SIZE <= 0:
+        return None
+
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = BrowserPool()
+            atexit.register(_shared_pool.close)
+        return _shared_pool
@@ -0,0 +1,138 @@
+"""Memory and age limits for long-lived browsers
+
+Chrome keeps growing over a long session. The watchdog measures the resident
+memory of the whole process tree behind a browser (ChromeDriver, Chrome and
+its renderer, GPU and utility processes) from /proc, records it as a metric
+and tells the owner of the browser when it is time to replace it. Recycling
+happens between units of work, never in the middle of one.
+"""
+import os
+
+from app.utils.logger import logger
+from app.utils.tracing import tracer
+from app.utils.config import BROWSER_MAX_RSS_MB, BROWSER_MAX_AGE
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def process_tree(pid, proc="/proc"):
+    """The given process and all of its descendants
+
+    Returns:
+        list: Process ids, the given one first, or [] where /proc is not available
+    """
+    try:
+        entries = os.listdir(proc)
+    except OSError:
+        return []
+
+    children = {}
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(os.path.join(proc, entry, "stat"), "r") as f:
+                stat = f.read()
+        except OSError:
+            # The process ended while we were looking
+            continue
+        # The command name may contain spaces and parentheses, the fields after it do not
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, []))
+    return tree
+
+
+def process_tree_rss(pid, proc="/proc"):
+    """Resident memory of a process and its descendants
+
+    Memory shared between the processes (such as Chrome's code) is counted
+    once per process, so the total is an upper bound.
+
+    Returns:
+        int: Bytes, or None where it cannot be measured
+    """
+    tree = process_tree(pid, proc)
+    if not tree:
+        return None
+
+    total = 0
+    for process in tree:
+        try:
+            with open(os.path.join(proc, str(process), "statm"), "r") as f:
+                total += int(f.read().split()[1]) * PAGE_SIZE
+        except (OSError, ValueError, IndexError):
+            continue
+    return total
+
+
+class BrowserWatchdog:
+    """Decides when a browser should be replaced because of its memory or age"""
+
+    def __init__(self, max_rss_mb=BROWSER_MAX_RSS_MB, max_age=BROWSER_MAX_AGE):
+        """
+        Args:
+            max_rss_mb (float): Recycle once the process tree uses more memory than this, 0 for no limit
+            max_age (float): Recycle browsers older than this many seconds, 0 for no limit
+        """
+        self.max_rss_mb = max_rss_mb
+        self.max_age = max_age
+        self.peak_rss_mb = 0.0
+        self.recycled = 0
+
+    def sample(self, browser):
+        """Measure a browser and record the measurement
+
+        Args:
+            browser (BrowserTool): Started browser
+
+        Returns:
+            float: Resident memory of its process tree in MB, or None if unknown
+        """
+        rss = browser.memory_usage()
+        if rss is None:
+            return None
+
+        rss_mb = rss / (1024 * 1024)
+        self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+        tracer.counter("browser.memory", rss_mb=round(rss_mb, 1))
+        logger.info(f"Browser memory: {rss_mb:.0f} MB", extra={"browser_rss_mb": round(rss_mb, 1)})
+        return rss_mb
+
+    def recycle_reason(self, browser):
+        """Why the browser should be replaced now
+
+        Returns:
+            str: Reason for recycling, or None while the browser is within its limits
+        """
+        age = browser.age()
+        if self.max_age and age is not None and age > self.max_age:
+            return f"browser is {age:.0f}s old (limit {self.max_age:.0f}s)"
+
+        rss_mb = self.sample(browser)
+        if self.max_rss_mb and rss_mb is not None and rss_mb > self.max_rss_mb:
+            return f"browser uses {rss_mb:.0f} MB (limit {self.max_rss_mb:.0f} MB)"
+        return None
+
+    def check(self, linkedin_tool):
+        """Recycle a logged-in tool that is over its limits
+
+        Call between units of work. The browser is closed, started again and
+        logged in, from the saved session when possible.
+
+        Returns:
+            bool: False if the tool had to be recycled and could not be logged in again
+        """
+        reason = self.recycle_reason(linkedin_tool.browser)
+        if not reason:
+            return True
+
+        logger.info(f"Recycling the browser: {reason}")
+        with tracer.span("browser.recycle", reason=reason):
+            self.recycled += 1
+            return linkedin_tool.recycle()
@@ -0,0 +1,140 @@
+"""Token-budgeted conversation context for response suggestion prompts"""
+import hashlib
+import json
+
+from app.utils.logger import logger
+from app.utils.cache import make_cache_key
+from app.utils.config import CONTEXT_TOKEN_BUDGET, CONTEXT_SUMMARY_TOKENS
+
+# Average characters per token for English chat text
+CHARS_PER_TOKEN = 4
+
+# Number of trailing summarized messages used to find where a cached summary stops
+WINDOW_SIZE = 3
+
+
+def estimate_tokens(text):
+    """Cheap token estimate, close enough to keep prompts within a budget"""
+    return len(text) // CHARS_PER_TOKEN + 1 if text else 0
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text down to roughly max_tokens"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    return text[:max(0, max_tokens - 1) * CHARS_PER_TOKEN].rstrip() + "..."
+
+
+def _window_hash(messages):
+    """Hash of the last few messages of a list, identifies how far a summary goes"""
+    payload = "\x1f".join(messages[-WINDOW_SIZE:])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ContextBuilder:
+    """Fits a conversation history into a fixed token budget
+
+    The newest messages are kept verbatim until the budget is used up. Older
+    messages are folded into a rolling summary, which is cached per
+    conversation. On the next run only the messages that fell out of the
+    verbatim window since then are added to it, so a long thread is
+    summarized once and then extended a few messages at a time.
+    """
+
+    def __init__(self, summarizer, budget=CONTEXT_TOKEN_BUDGET, summary_tokens=CONTEXT_SUMMARY_TOKENS,
+                 cache=None):
+        """
+        Args:
+            summarizer (callable): summarizer(previous_summary, messages, max_tokens) -> str,
+                                   messages are given oldest first
+            budget (int): Tokens available for the history, 0 for no limit
+            summary_tokens (int): Part of the budget reserved for the summary
+            cache (SuggestionCache): Where rolling summaries are kept between runs
+        """
+        self.summarizer = summarizer
+        self.budget = budget
+        self.summary_tokens = min(summary_tokens, budget) if budget else summary_tokens
+        self.cache = cache
+
+    def build(self, conversation_key, history):
+        """Split a history into verbatim recent messages and a summary of the rest
+
+        Args:
+            conversation_key (str): Stable identity of the conversation
+            history (list): Earlier messages, most recent first, without the message being answered
+
+        Returns:
+            tuple: (recent_messages most recent first, summary or None)
+        """
+        if not self.budget:
+            return list(history), None
+
+        recent = []
+        used = 0
+        # Leave room for the summary only if something will have to be summarized
+        total = sum(estimate_tokens(message) for message in history)
+        available = self.budget if total <= self.budget else self.budget - self.summary_tokens
+        for message in history:
+            cost = estimate_tokens(message)
+            if used + cost > available:
+                break
+            recent.append(message)
+            used += cost
+
+        older = list(reversed(history[len(recent):]))
+        if not older:
+            return recent, None
+
+        summary = self._summarize(conversation_key, older)
+        if summary is None:
+            logger.warning(f"Could not summarize {len(older)} earlier messages, they are left out of the prompt")
+        return recent, summary
+
+    def _summarize(self, conversation_key, older):
+        """Return a summary of the older messages (oldest first), extending the cached one if possible"""
+        cache_key = make_cache_key(kind="rolling_summary", conversation=conversation_key)
+        previous = None
+        pending = older
+
+        cached = self.cache.get(cache_key) if self.cache else None
+        if cached:
+            entry = json.loads(cached)
+            # Find where the cached summary stopped, messages may also have dropped off the old end
+            for end in range(len(older), 0, -1):
+                if _window_hash(older[:end]) == entry["window"]:
+                    previous, pending = entry["summary"], older[end:]
+                    break
+
+        if previous is not None and not pending:
+            return previous
+
+        summary = previous
+        try:
+            # Fold new messages in chunks that fit the budget, so every request stays bounded
+            for chunk in self._chunks(pending):
+                summary = truncate_to_tokens(
+                    self.summarizer(summary, chunk, self.summary_tokens), self.summary_tokens
+                )
+        except Exception as e:
+            logger.error(f"Failed to summarize conversation history: {e}")
+            return previous
+
+        logger.info(f"Summarized {len(pending)} earlier messages"
+                    f"{' into the cached summary' if previous is not None else ''}")
+        if self.cache:
+            self.cache.set(cache_key, json.dumps({"summary": summary, "window": _window_hash(older)}))
+        return summary
+
+    def _chunks(self, messages):
+        """Group messages into chunks of at most budget tokens"""
+        chunk, used = [], 0
+        for message in messages:
+            message = truncate_to_tokens(message, self.budget)
+            cost = estimate_tokens(message)
+            if chunk and used + cost > self.budget:
+                yield chunk
+                chunk, used = [], 0
+            chunk.append(message)
+            used += cost
+        if chunk:
+            yield chunk
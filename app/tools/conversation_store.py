@@ -0,0 +1,156 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from app.utils.logger import logger
+from app.utils.config import DATA_DIR, LINKEDIN_EMAIL, INCREMENTAL_SYNC
+
+
+def conversation_key(conversation):
+    """Stable identity of a conversation - the thread id, or the contact name as a fallback"""
+    return conversation.get("conversation_id") or f"contact:{conversation.get('contact', '')}"
+
+
+def conversation_fingerprint(conversation):
+    """Hash of what we see of a conversation in the inbox list
+
+    Any new message changes the snippet or the displayed time, so a changed
+    fingerprint means the conversation needs to be analyzed again.
+    """
+    # Threads that were opened keep the list snippet aside, that is what the next sync sees
+    snippet = conversation.get("snippet") or (conversation.get("messages") or [""])[0]
+    parts = [conversation.get("contact") or "", snippet, conversation.get("timestamp") or ""]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class ConversationStore:
+    """SQLite-backed memory of the conversations seen in an inbox
+
+    A sync is done in two steps so that nothing is lost when analysis fails:
+    changed() reports new or updated conversations, and mark_seen() records
+    them once they have been analyzed.
+    """
+
+    def __init__(self, path=None, account=None):
+        self.path = str(path or os.path.join(str(DATA_DIR), "conversations.sqlite3"))
+        self.account = account or LINKEDIN_EMAIL or "default"
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS conversations ("
+            "account TEXT NOT NULL, "
+            "conversation_key TEXT NOT NULL, "
+            "contact TEXT, "
+            "last_snippet TEXT, "
+            "timestamp TEXT, "
+            "fingerprint TEXT NOT NULL, "
+            "first_seen REAL NOT NULL, "
+            "last_changed REAL NOT NULL, "
+            "PRIMARY KEY (account, conversation_key))"
+        )
+        self._db.commit()
+
+    def _known_fingerprints(self, keys):
+        """Fingerprints stored for the given conversation keys"""
+        known = {}
+        keys = list(keys)
+        # Stay below SQLite's bound parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._db.execute(
+                f"SELECT conversation_key, fingerprint FROM conversations "
+                f"WHERE account = ? AND conversation_key IN ({placeholders})",
+                [self.account] + chunk,
+            )
+            known.update(rows.fetchall())
+        return known
+
+    def changed(self, conversations):
+        """Return the conversations that are new or changed since they were last marked as seen
+
+        Args:
+            conversations (list): Conversation dicts as returned by LinkedInTool.extract_messages
+
+        Returns:
+            list: The new or changed conversations, in their original order
+        """
+        with self._lock:
+            known = self._known_fingerprints(conversation_key(c) for c in conversations)
+
+        delta = [c for c in conversations if known.get(conversation_key(c)) != conversation_fingerprint(c)]
+        logger.info(f"Inbox sync: {len(delta)} new or changed out of {len(conversations)} conversations")
+        return delta
+
+    def mark_seen(self, conversations):
+        """Record the current state of the given conversations"""
+        now = time.time()
+        rows = [
+            (
+                self.account,
+                conversation_key(c),
+                c.get("contact"),
+                c.get("snippet") or (c.get("messages") or [None])[0],
+                c.get("timestamp"),
+                conversation_fingerprint(c),
+                now,
+                now,
+            )
+            for c in conversations
+        ]
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO conversations "
+                "(account, conversation_key, contact, last_snippet, timestamp, fingerprint, first_seen, last_changed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (account, conversation_key) DO UPDATE SET "
+                "contact = excluded.contact, last_snippet = excluded.last_snippet, "
+                "timestamp = excluded.timestamp, fingerprint = excluded.fingerprint, "
+                "last_changed = excluded.last_changed",
+                rows,
+            )
+            self._db.commit()
+
+    def sync(self, conversations):
+        """Report new or changed conversations and mark them as seen in one step"""
+        delta = self.changed(conversations)
+        self.mark_seen(delta)
+        return delta
+
+    def count(self):
+        """Number of conversations stored for this account"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM conversations WHERE account = ?", (self.account,)
+            ).fetchone()[0]
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._db.close()
+
+
+_conversation_store = None
+_conversation_store_lock = threading.Lock()
+
+
+def get_conversation_store():
+    """Return the process-wide conversation store, or None when incremental sync is disabled"""
+    global _conversation_store
+
+    if not INCREMENTAL_SYNC:
+        return None
+
+    with _conversation_store_lock:
+        if _conversation_store is None:
+            try:
+                _conversation_store = ConversationStore()
+            except sqlite3.Error as e:
+                logger.error(f"Could not open the conversation store, analyzing every conversation: {e}")
+                return None
+        return _conversation_store
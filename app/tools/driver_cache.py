@@ -0,0 +1,208 @@
+"""Resolved ChromeDriver manifest so browser start-up skips version probing"""
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import time
+
+from app.utils.logger import logger
+from app.utils.config import DRIVERS_DIR
+
+MANIFEST_NAME = "manifest.json"
+
+# Executable names searched on PATH, in order of preference
+LINUX_CHROME_COMMANDS = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser"]
+
+CHROME_PATHS = {
+    "Linux": [
+        "/usr/bin/google-chrome",
+        "/usr/bin/google-chrome-stable",
+        "/usr/bin/chromium",
+        "/usr/bin/chromium-browser",
+        "/snap/bin/chromium"
+    ],
+    "Darwin": [
+        "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+        "/Applications/Chromium.app/Contents/MacOS/Chromium"
+    ],
+    "Windows": [
+        r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+        r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+        r"C:\Users\{}\AppData\Local\Google\Chrome\Application\chrome.exe".format(os.getenv("USERNAME"))
+    ],
+}
+
+
+def find_chrome_binary():
+    """Find the Chrome/Chromium binary without starting any process
+
+    Returns:
+        str: Resolved path of the browser binary, or None if not found
+    """
+    candidates = []
+    if platform.system() == "Linux":
+        candidates.extend(filter(None, (shutil.which(cmd) for cmd in LINUX_CHROME_COMMANDS)))
+    candidates.extend(CHROME_PATHS.get(platform.system(), []))
+
+    for path in candidates:
+        if os.path.exists(path):
+            return os.path.realpath(path)
+    return None
+
+
+def probe_chrome_version(chrome_binary):
+    """Ask the browser for its version - this spawns a process, keep it off the hot path"""
+    try:
+        if platform.system() == "Windows":
+            cmd = r'reg query "HKEY_CURRENT_USER\Software\Google\Chrome\BLBeacon" /v version'
+            output = subprocess.check_output(cmd, shell=True).decode('utf-8')
+            version = re.search(r'\d+\.\d+\.\d+\.\d+', output)
+        else:
+            output = subprocess.check_output([chrome_binary, "--version"], stderr=subprocess.STDOUT).decode('utf-8')
+            version = re.search(r'\d+\.\d+\.\d+', output)
+
+        if version:
+            logger.info(f"Detected Chrome version: {version.group(0)}")
+            return version.group(0)
+    except Exception as e:
+        logger.warning(f"Error detecting Chrome version: {e}")
+
+    logger.warning("Could not detect Chrome version, using default.")
+    return None
+
+
+def install_chromedriver(chrome_version, drivers_dir):
+    """Download (or reuse from webdriver_manager's cache) a ChromeDriver matching the browser"""
+    from webdriver_manager.chrome import ChromeDriverManager
+    from webdriver_manager.core.driver_cache import DriverCacheManager
+
+    cache_manager = DriverCacheManager(root_dir=str(drivers_dir))
+    if chrome_version:
+        logger.info(f"Installing ChromeDriver for Chrome version {chrome_version}")
+    else:
+        logger.info("Installing latest ChromeDriver")
+    return ChromeDriverManager(driver_version=chrome_version, cache_manager=cache_manager).install()
+
+
+class DriverManifest:
+    """JSON manifest of resolved ChromeDriver binaries keyed by Chrome binary path
+
+    An entry stays valid while the Chrome binary keeps the same mtime and size
+    and the recorded driver is still executable, so a Chrome update is the only
+    thing that triggers a new version probe and driver install.
+    """
+
+    def __init__(self, drivers_dir=DRIVERS_DIR):
+        self.drivers_dir = str(drivers_dir)
+        self.path = os.path.join(self.drivers_dir, MANIFEST_NAME)
+
+    def read(self):
+        """Read the manifest, returning an empty one if missing or corrupt"""
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                data.setdefault("entries", {})
+                return data
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable driver manifest {self.path}: {e}")
+        return {"entries": {}}
+
+    def lookup(self, chrome_binary=None, data=None):
+        """Return the manifest entry for a Chrome binary if it is still valid
+
+        Args:
+            chrome_binary (str): Browser binary, defaults to the last one resolved
+            data (dict): Already loaded manifest, read from disk if omitted
+
+        Returns:
+            dict: Entry with chrome_binary, chrome_version and driver_path, or None
+        """
+        data = data if data is not None else self.read()
+        chrome_binary = chrome_binary or data.get("last_binary")
+        entry = data["entries"].get(chrome_binary) if chrome_binary else None
+        if not entry:
+            return None
+
+        try:
+            stat = os.stat(chrome_binary)
+        except OSError:
+            return None
+
+        if entry.get("chrome_mtime") != stat.st_mtime or entry.get("chrome_size") != stat.st_size:
+            logger.info(f"Chrome binary changed since the driver was resolved: {chrome_binary}")
+            return None
+
+        if not os.access(entry.get("driver_path", ""), os.X_OK):
+            return None
+
+        return entry
+
+    def record(self, chrome_binary, chrome_version, driver_path):
+        """Store a resolved driver for a Chrome binary and make it the default"""
+        stat = os.stat(chrome_binary)
+        entry = {
+            "chrome_binary": chrome_binary,
+            "chrome_mtime": stat.st_mtime,
+            "chrome_size": stat.st_size,
+            "chrome_version": chrome_version,
+            "driver_path": driver_path,
+            "resolved_at": time.time(),
+        }
+
+        data = self.read()
+        data["entries"][chrome_binary] = entry
+        data["last_binary"] = chrome_binary
+
+        os.makedirs(self.drivers_dir, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2)
+        # Atomic so concurrent workers never read a half-written manifest
+        os.replace(tmp_path, self.path)
+        return entry
+
+
+def resolve_chromedriver(drivers_dir=DRIVERS_DIR, refresh=False):
+    """Resolve the ChromeDriver to use, probing Chrome only when it has changed
+
+    Args:
+        drivers_dir: Directory holding downloaded drivers and the manifest
+        refresh (bool): Ignore the manifest and probe/install again
+
+    Returns:
+        dict: Manifest entry with chrome_binary, chrome_version and driver_path,
+              plus cached=True when it came from the manifest, or None if no
+              driver could be resolved
+    """
+    manifest = DriverManifest(drivers_dir)
+
+    if not refresh:
+        entry = manifest.lookup()
+        if entry:
+            logger.info(f"Using cached ChromeDriver {entry['driver_path']} for Chrome {entry['chrome_version']}")
+            return dict(entry, cached=True)
+
+    chrome_binary = find_chrome_binary()
+    if not chrome_binary:
+        logger.error("Could not find Chrome or Chromium browser. Please install it first.")
+        return None
+
+    if not refresh:
+        # The default binary may have moved, but this one could still be cached
+        entry = manifest.lookup(chrome_binary)
+        if entry:
+            return dict(entry, cached=True)
+
+    chrome_version = probe_chrome_version(chrome_binary)
+    driver_path = install_chromedriver(chrome_version, drivers_dir)
+    # Make sure ChromeDriver is executable
+    os.chmod(driver_path, 0o755)
+
+    entry = manifest.record(chrome_binary, chrome_version, driver_path)
+    logger.info(f"Resolved ChromeDriver {driver_path} for Chrome {chrome_version}")
+    return entry
@@ -0,0 +1,207 @@
+"""Long-running inbox watcher
+
+Keeps one logged-in browser open and polls the messaging page, so the cost of
+starting Chrome and logging in is paid once instead of on every run. Only
+conversations that are new or changed since they were last analyzed are sent
+to the LLM.
+"""
+import random
+import signal
+import threading
+
+from app.utils.logger import logger, log_content
+from app.utils.tracing import tracer
+from app.utils.config import (
+    CONVERSATION_LIMIT, THREAD_DEPTH,
+    WATCH_MIN_INTERVAL, WATCH_MAX_INTERVAL, WATCH_BACKOFF_FACTOR, WATCH_JITTER
+)
+from app.tools.linkedin import LinkedInTool
+from app.tools.browser_watchdog import BrowserWatchdog
+from app.tools.linkedin_tools import AnalysisError, format_analysis, record_analysis, stream_analysis
+from app.tools.conversation_store import ConversationStore, get_conversation_store
+
+
+class AdaptiveInterval:
+    """Polling interval that is short after activity and backs off exponentially while idle"""
+
+    def __init__(self, minimum=WATCH_MIN_INTERVAL, maximum=WATCH_MAX_INTERVAL,
+                 factor=WATCH_BACKOFF_FACTOR, jitter=WATCH_JITTER, rng=random.random):
+        """
+        Args:
+            minimum (float): Seconds between polls right after activity
+            maximum (float): Upper bound in seconds while the inbox is idle
+            factor (float): Growth of the interval per idle poll
+            jitter (float): Random spread as a fraction of the interval, so polls do not
+                            happen at perfectly regular times
+            rng (callable): Source of random numbers in [0, 1)
+        """
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.factor = max(1.0, factor)
+        self.jitter = jitter
+        self.rng = rng
+        self.current = minimum
+
+    def activity(self):
+        """New messages arrived - poll again soon. Returns the seconds to wait"""
+        self.current = self.minimum
+        return self._spread(self.current)
+
+    def idle(self):
+        """Nothing happened, or the poll failed - wait longer. Returns the seconds to wait"""
+        self.current = min(self.maximum, self.current * self.factor)
+        return self._spread(self.current)
+
+    def _spread(self, seconds):
+        return seconds * (1 + self.jitter * (2 * self.rng() - 1))
+
+
+class InboxWatcher:
+    """Polls the inbox with one long-lived LinkedIn session and analyzes what changed
+
+    A failed poll closes the browser, it is started and logged in again (from
+    the saved session when possible) on the next poll. Between polls the
+    watchdog replaces a browser that has grown too large or too old the same
+    way. SIGINT and SIGTERM let the current poll finish and then shut down; a
+    second signal stops at once.
+    """
+
+    def __init__(self, interval=None, store=None, limit=CONVERSATION_LIMIT, thread_depth=THREAD_DEPTH,
+                 tool_factory=LinkedInTool, watchdog=None):
+        """
+        Args:
+            interval (AdaptiveInterval): Polling schedule
+            store (ConversationStore): Remembers what has been analyzed, also across restarts
+            limit (int): Conversations read per poll
+            thread_depth (int): Messages of history read for changed conversations
+            tool_factory (callable): Creates the LinkedInTool, replaced in tests
+            watchdog (BrowserWatchdog): Memory and age limits of the browser
+        """
+        self.interval = interval or AdaptiveInterval()
+        self.store = store or get_conversation_store() or ConversationStore()
+        self.limit = limit
+        self.thread_depth = thread_depth
+        self.tool_factory = tool_factory
+        self.watchdog = watchdog or BrowserWatchdog()
+        self.linkedin_tool = None
+        self.stats = {"polls": 0, "active_polls": 0, "failed_polls": 0, "analyzed": 0, "logins": 0,
+                      "recycles": 0}
+        self._stop = threading.Event()
+
+    def run(self, max_polls=None):
+        """Poll until stopped
+
+        Args:
+            max_polls (int): Stop after this many polls, None to run until a signal arrives
+
+        Returns:
+            dict: Poll and analysis counters
+        """
+        restore_signals = self._install_signal_handlers()
+        logger.info(f"Watching the LinkedIn inbox every {self.interval.minimum:.0f}-{self.interval.maximum:.0f}s")
+        try:
+            while not self._stop.is_set():
+                wait = self.poll()
+                if max_polls and self.stats["polls"] >= max_polls:
+                    break
+                logger.info(f"Next inbox poll in {wait:.0f}s")
+                self._stop.wait(wait)
+        finally:
+            self.close()
+            restore_signals()
+            tracer.export()
+            logger.info(f"Inbox watcher stopped: {self.stats}")
+        return self.stats
+
+    def stop(self):
+        """Stop after the current poll"""
+        self._stop.set()
+
+    def poll(self):
+        """Check the inbox once and analyze new or changed conversations
+
+        Returns:
+            float: Seconds to wait before the next poll
+        """
+        self.stats["polls"] += 1
+        with tracer.span("watch.poll") as span:
+            try:
+                analyzed = self._analyze_changes()
+            except Exception as e:
+                self.stats["failed_polls"] += 1
+                logger.error(f"Inbox poll failed, restarting the browser on the next poll: {e}")
+                span.set(outcome="failed")
+                self.close()
+                return self.interval.idle()
+
+            span.set(outcome="active" if analyzed else "idle", analyzed=len(analyzed))
+
+        if not analyzed:
+            return self.interval.idle()
+
+        self.stats["active_polls"] += 1
+        self.stats["analyzed"] += len(analyzed)
+        log_content("\n\n".join(format_analysis(msg) for msg in analyzed), "linkedin_message_analysis")
+        record_analysis(analyzed)
+        # Keep one trace per burst of activity instead of one for the whole lifetime
+        tracer.export()
+        return self.interval.activity()
+
+    def _analyze_changes(self):
+        """Run the analysis pipeline on the open session, limited to changed conversations"""
+        linkedin_tool = self._session()
+        analyzed = list(stream_analysis(
+            limit=self.limit, thread_depth=self.thread_depth, store=self.store, linkedin_tool=linkedin_tool
+        ))
+        # An expired session shows up as an empty inbox on the login page
+        if not analyzed and linkedin_tool.is_logged_out():
+            raise AnalysisError("The LinkedIn session has expired.")
+        return analyzed
+
+    def _session(self):
+        """The open LinkedInTool, started and logged in when there is none"""
+        if self.linkedin_tool and self.linkedin_tool.browser.is_alive():
+            recycled = self.watchdog.check(self.linkedin_tool)
+            self.stats["recycles"] = self.watchdog.recycled
+            if not recycled:
+                self.close()
+                raise AnalysisError("Failed to log in again after recycling the browser.")
+            return self.linkedin_tool
+
+        self.close()
+        linkedin_tool = self.tool_factory()
+        self.stats["logins"] += 1
+        if not linkedin_tool.start():
+            linkedin_tool.close()
+            raise AnalysisError("Failed to start the browser.")
+        if not linkedin_tool.login():
+            linkedin_tool.close()
+            raise AnalysisError("Failed to login to LinkedIn.")
+        self.linkedin_tool = linkedin_tool
+        return linkedin_tool
+
+    def close(self):
+        """Close the browser, if one is open"""
+        if self.linkedin_tool:
+            self.linkedin_tool.close()
+            self.linkedin_tool = None
+
+    def _install_signal_handlers(self):
+        """Stop gracefully on SIGINT and SIGTERM, returns a function that restores the old handlers"""
+        if threading.current_thread() is not threading.main_thread():
+            # Signals are only delivered to the main thread, whoever runs us there handles them
+            return lambda: None
+
+        def handle(signum, frame):
+            if self._stop.is_set():
+                raise KeyboardInterrupt
+            logger.info(f"Received {signal.Signals(signum).name}, stopping after the current poll "
+                        f"(send it again to stop now)")
+            self.stop()
+
+        previous = {sig: signal.signal(sig, handle) for sig in (signal.SIGINT, signal.SIGTERM)}
+
+        def restore():
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+        return restore
@@ -1,23 +1,69 @@
 import time
-from bs4 import BeautifulSoup
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException
+from datetime import date, timedelta
 
 from app.tools.browser import BrowserTool
+from app.tools.message_parser import (
+    EXTRACT_CONVERSATIONS_SCRIPT,
+    THREAD_EVENT_SELECTOR,
+    conversations_from_rows,
+    parse_conversations,
+    parse_day_heading,
+    parse_thread,
+)
+from app.tools.session import SessionStore
 from app.utils.logger import logger, log_content
-from app.utils.config import LINKEDIN_EMAIL, LINKEDIN_PASSWORD
+from app.utils.tracing import tracer
+from app.utils.config import (
+    LINKEDIN_EMAIL, LINKEDIN_PASSWORD, REUSE_SESSION, LOGIN_TIMEOUT, THREAD_DEPTH, THREAD_MAX_AGE_DAYS,
+    JS_EXTRACTION
+)
 
 class LinkedInTool:
     """A tool for interacting with LinkedIn"""
     
+    # Elements that only render for an authenticated member
+    SUCCESS_SELECTORS = [
+        ".global-nav__me-photo",  # Profile icon
+        ".feed-identity-module__member-photo",  # Another possible profile icon
+        ".feed-container",  # Feed container
+        ".search-global-typeahead__input"  # Search bar
+    ]
+    
+    # Markers of a login that did not go through, mapped to the outcome they signal
+    CHALLENGE_SELECTORS = {
+        "#captcha-challenge": "captcha",
+        "#captcha-internal": "captcha",
+        "iframe[src*='captcha']": "captcha",
+        ".pin-verification": "pin",
+        "#input__email_verification_pin": "pin",
+        "input[name='pin']": "pin",
+        ".challenge-dialog": "challenge",
+        "#error-for-password": "bad_credentials",
+        "#error-for-username": "bad_credentials"
+    }
+    
+    # Conversation list entries, mirroring the fallbacks used when parsing the page
+    CONVERSATION_SELECTORS = [
+        "li.msg-conversation-card",
+        "div.msg-conversation-card__content",
+        "div.msg-conversation-listitem__link",
+        "div[data-control-name='overlay.expand_conversation']"
+    ]
+    
+    # URL fragments LinkedIn redirects to when the session is not valid
+    LOGGED_OUT_URL_MARKERS = ["/login", "/authwall", "/checkpoint", "/uas/"]
+    
     def __init__(self):
         self.browser = BrowserTool()
         self.logged_in = False
+        self.login_outcome = None
+        self.session_store = SessionStore(LINKEDIN_EMAIL) if REUSE_SESSION else None
     
     def start(self):
         """Start the browser"""
         return self.browser.start_browser()
     
+    @tracer.traced("linkedin.login")
     def login(self):
         """Log in to LinkedIn"""
         if self.logged_in:
@@ -28,6 +74,10 @@ class LinkedInTool:
             logger.error("LinkedIn credentials not set in environment variables")
             return False
         
+        # Reuse a previously saved session before falling back to the credential form
+        if self._resume_session():
+            return True
+        
         logger.info("Logging in to LinkedIn...")
         
         # Navigate to LinkedIn login page
@@ -46,45 +96,93 @@ class LinkedInTool:
         if not self.browser.wait_and_click("button[type='submit']"):
             return False
         
-        # Wait for the login to complete - LinkedIn might take longer due to security checks
-        self.browser.sleep(5)
-        
-        # Check if login was successful
+        # Race success and challenge markers - LinkedIn might take longer due to security checks,
+        # but a challenge or rejected password is reported as soon as it shows up
         try:
-            # Look for elements that would indicate successful login - try multiple selectors
-            success_selectors = [
-                ".global-nav__me-photo",  # Profile icon
-                ".feed-identity-module__member-photo",  # Another possible profile icon
-                ".feed-container",  # Feed container
-                ".search-global-typeahead__input"  # Search bar
-            ]
-            
-            for selector in success_selectors:
-                logger.info(f"Checking for login success with selector: {selector}")
-                element = self.browser.wait_for_element(selector, timeout=10)
-                if element:
-                    self.logged_in = True
-                    logger.info(f"Successfully logged in to LinkedIn (detected {selector})")
-                    return True
-            
-            # Check for security challenges or verification pages
-            challenge_selectors = [
-                ".challenge-dialog",  # Security verification
-                "#captcha-challenge",  # CAPTCHA
-                ".pin-verification"   # PIN verification
-            ]
+            self.login_outcome = self.wait_for_login_outcome()
+        except Exception as e:
+            logger.error(f"Error during login verification: {e}")
+            return False
+        
+        if self.login_outcome == "logged_in":
+            self.logged_in = True
+            logger.info("Successfully logged in to LinkedIn")
+            if self.session_store:
+                self.session_store.save(self.browser.driver)
+            return True
+        
+        if self.login_outcome in ("captcha", "pin", "challenge"):
+            logger.error(f"LinkedIn is requesting additional verification: {self.login_outcome}")
+        elif self.login_outcome == "bad_credentials":
+            logger.error("LinkedIn rejected the credentials")
+        else:
+            logger.error("Failed to log in to LinkedIn - could not verify successful login")
+        return False
+    
+    def wait_for_login_outcome(self, timeout=LOGIN_TIMEOUT):
+        """Wait for whichever login outcome shows up first after submitting credentials
+        
+        All success and challenge markers are checked together on every poll
+        instead of waiting for each selector in turn.
+        
+        Args:
+            timeout (float): Upper bound in seconds
             
-            for selector in challenge_selectors:
-                element = self.browser.find_element(selector)
-                if element:
-                    logger.error(f"LinkedIn is requesting additional verification: {selector}")
-                    return False
+        Returns:
+            str: "logged_in", "captcha", "pin", "challenge", "bad_credentials" or "unknown"
+        """
+        markers = {selector: "logged_in" for selector in self.SUCCESS_SELECTORS}
+        markers.update(self.CHALLENGE_SELECTORS)
+        selectors = list(markers)
+        
+        def login_outcome(driver):
+            found = self.browser.first_present(selectors)
+            if found:
+                return markers[found[0]], found[0]
+            # Some challenges are full pages without a stable marker element
+            if "/checkpoint/challenge" in driver.current_url:
+                return "challenge", driver.current_url
+            return False
+        
+        with tracer.span("linkedin.login_outcome") as span:
+            result = self.browser.wait_until(login_outcome, timeout, description="login outcome", poll_frequency=0.25)
+            if not result:
+                span.set(outcome="unknown")
+                return "unknown"
             
-            logger.error("Failed to log in to LinkedIn - could not verify successful login")
+            span.set(outcome=result[0], selector_hit=result[1])
+            logger.info(f"Login outcome: {result[0]} (detected {result[1]})")
+            return result[0]
+    
+    @tracer.traced("linkedin.resume_session")
+    def _resume_session(self):
+        """Try to restore a saved session and verify it is still authenticated
+        
+        Returns:
+            bool: True if the restored session is logged in
+        """
+        if not self.session_store or not self.browser.driver:
             return False
-        except Exception as e:
-            logger.error(f"Error during login verification: {e}")
+        
+        if not self.session_store.restore(self.browser.driver):
+            return False
+        
+        if not self.browser.navigate_to("https://www.linkedin.com/feed/"):
             return False
+        
+        # LinkedIn redirects stale sessions to the login or auth wall pages
+        current_url = self.browser.driver.current_url
+        if not any(marker in current_url for marker in self.LOGGED_OUT_URL_MARKERS):
+            # The feed may still be rendering - give it a short grace period
+            found = self.browser.wait_for_any_element(self.SUCCESS_SELECTORS, timeout=5)
+            if found:
+                self.logged_in = True
+                logger.info(f"Resumed saved LinkedIn session (detected {found[0]})")
+                return True
+        
+        logger.info("Saved LinkedIn session is no longer valid, logging in with credentials")
+        self.session_store.discard(self.browser.driver)
+        return False
     
     def go_to_messages(self):
         """Navigate to the LinkedIn messaging page"""
@@ -95,15 +193,20 @@ class LinkedInTool:
         logger.info("Navigating to LinkedIn messages...")
         return self.browser.navigate_to("https://www.linkedin.com/messaging/")
     
-    def extract_messages(self, limit=5):
+    @tracer.traced("linkedin.extract_messages")
+    def extract_messages(self, limit=5, thread_depth=0, max_age_days=0):
         """Extract the latest messages from LinkedIn chats
         
         Args:
             limit (int): Maximum number of messages to extract
+            thread_depth (int): Open each conversation and read up to this many messages
+                                of its history, 0 keeps the list snippet only
+            max_age_days (int): Stop reading a thread at messages older than this, 0 for no limit
             
         Returns:
             list: List of dictionaries with conversation data in format:
-                 {'contact': name, 'messages': [list_of_messages], 'message_count': count}
+                 {'contact': name, 'messages': [list_of_messages], 'message_count': count,
+                  'conversation_id': thread id or None, 'timestamp': displayed time or None}
         """
         if not self.logged_in:
             logger.error("Not logged in to LinkedIn. Cannot extract messages.")
@@ -111,63 +214,29 @@ class LinkedInTool:
         
         logger.info(f"Extracting the latest {limit} messages from LinkedIn chats...")
         
-        # Wait for the messaging UI to load
-        self.browser.sleep(3)
-        
-        # Get the page source and parse with BeautifulSoup
-        page_source = self.browser.get_page_source()
-        soup = BeautifulSoup(page_source, 'html.parser')
+        # Wait for the messaging UI to load - the conversation list renders first,
+        # then snippets keep streaming in until the network settles
+        if not self.browser.wait_for_any_element(self.CONVERSATION_SELECTORS):
+            logger.warning("Conversation list did not render, parsing the page as it is")
+        else:
+            self.browser.wait_for_network_idle()
+            self._load_conversations(limit)
         
         try:
-            messages_content = []
-            
-            # Try to find conversation list - we need to try multiple selectors as LinkedIn's UI might change
-            conversations = soup.find_all("li", {"class": "msg-conversation-card"})
+            messages_content = self._extract_in_browser(limit) if JS_EXTRACTION else None
             
-            if not conversations:
-                # Try another selector if the first one doesn't work
-                conversations = soup.find_all("div", {"class": "msg-conversation-card__content"})
-                
-            if not conversations:
-                # Try more generic selectors
-                conversations = soup.find_all("div", {"class": "msg-conversation-listitem__link"})
-                    
-                if not conversations:
-                    # As a fallback, look for any elements that might contain messaging content
-                    conversations = soup.find_all("div", {"data-control-name": "overlay.expand_conversation"})
+            if not messages_content:
+                # Get the page source and parse only the conversation cards
+                page_source = self.browser.get_page_source()
+                parse_start = time.monotonic()
+                with tracer.span("linkedin.parse_conversations", bytes=len(page_source)) as span:
+                    messages_content = parse_conversations(page_source, limit)
+                    span.set(conversations=len(messages_content))
+                logger.info(f"Parsed {len(page_source)} bytes of page source in {time.monotonic() - parse_start:.3f}s")
             
-            # Process up to the limit
-            for idx, conversation in enumerate(conversations[:limit]):
-                contact_name = "Unknown Contact"
-                last_message = "No message content"
-                
-                # Extract contact name - try multiple selectors
-                name_elem = conversation.find("h3", {"class": "msg-conversation-card__participant-names"})
-                if not name_elem:
-                    name_elem = conversation.find("span", {"class": "msg-conversation-listitem__participant-names"})
-                if not name_elem:
-                    name_elem = conversation.find("span", {"class": "t-16"})
-                if name_elem:
-                    contact_name = name_elem.get_text(strip=True)
-                
-                # Extract last message - try multiple selectors
-                msg_elem = conversation.find("span", {"class": "msg-conversation-card__message-snippet-body"})
-                if not msg_elem:
-                    msg_elem = conversation.find("div", {"class": "msg-conversation-card__message-snippet"})
-                if not msg_elem:
-                    msg_elem = conversation.find("p", {"class": "mail-messages-list__body"})
-                if not msg_elem:
-                    # Last resort - find any element that might contain message text
-                    msg_elem = conversation.find("div", class_=lambda c: c and "message" in c.lower())
-                if msg_elem:
-                    last_message = msg_elem.get_text(strip=True)
-                
-                # Add to our results with the new structure
-                messages_content.append({
-                    "contact": contact_name,
-                    "messages": [last_message],  # For now, just include the last message in the list
-                    "message_count": 1
-                })
+            if thread_depth:
+                for conversation in messages_content:
+                    self.fetch_thread(conversation, thread_depth, max_age_days)
             
             if messages_content:
                 # Format content for logging
@@ -192,6 +261,146 @@ class LinkedInTool:
             logger.error(f"Error extracting messages: {e}")
             return []
     
+    def _extract_in_browser(self, limit):
+        """Read the conversation list with a single script run inside the page
+        
+        Returns:
+            list: Conversations in the format returned by extract_messages, or None
+                  when the script failed or found no conversation card
+        """
+        extract_start = time.monotonic()
+        with tracer.span("linkedin.extract_in_page", limit=limit) as span:
+            rows = self.browser.execute_script(EXTRACT_CONVERSATIONS_SCRIPT, self.CONVERSATION_SELECTORS, limit)
+            span.set(conversations=len(rows) if rows else 0)
+        if not rows:
+            logger.info("In-page extraction found no conversations, falling back to the page source")
+            return None
+        
+        logger.info(f"Extracted {len(rows)} conversations in the page in {time.monotonic() - extract_start:.3f}s")
+        return conversations_from_rows(rows, limit)
+    
+    def iter_conversations(self, limit=5, thread_depth=0, max_age_days=0, select=None):
+        """Yield conversations one at a time, as soon as each one is ready
+        
+        The conversation list is read in one go, then threads are opened lazily so
+        the caller can start working on a conversation while the next one loads.
+        
+        Args:
+            limit (int): Maximum number of conversations to extract
+            thread_depth (int): Messages of history to read per conversation, 0 for the list snippet only
+            max_age_days (int): Stop reading a thread at messages older than this, 0 for no limit
+            select (callable): Optional filter applied to the conversation list before any
+                               thread is opened, e.g. ConversationStore.changed
+            
+        Yields:
+            dict: Conversation in the format returned by extract_messages
+        """
+        conversations = self.extract_messages(limit=limit) or []
+        if select:
+            conversations = select(conversations)
+        
+        for conversation in conversations:
+            if thread_depth:
+                self.fetch_thread(conversation, thread_depth, max_age_days)
+            yield conversation
+    
+    @tracer.traced("linkedin.load_conversations")
+    def _load_conversations(self, limit):
+        """Scroll the conversation list until it holds at least limit conversations or runs out"""
+        found = self.browser.first_present(self.CONVERSATION_SELECTORS)
+        if not found:
+            return 0
+        
+        selector = found[0]
+        count = self.browser.count_elements(selector)
+        while count < limit:
+            more = self.browser.scroll_for_more(selector, direction="down")
+            if not more:
+                logger.info(f"Conversation list exhausted at {count} conversations")
+                break
+            count = more
+        return count
+    
+    def _load_thread_history(self, depth, max_age_days=0):
+        """Scroll an open thread upwards until depth messages are loaded, the age limit is reached or it runs out"""
+        cutoff = date.today() - timedelta(days=max_age_days) if max_age_days else None
+        count = self.browser.count_elements(THREAD_EVENT_SELECTOR)
+        while count < depth:
+            if cutoff:
+                # The topmost day heading belongs to the oldest loaded message
+                headings = self.browser.get_all_text(".msg-s-message-list__time-heading")
+                day = parse_day_heading(headings[0]) if headings else None
+                if day and day < cutoff:
+                    break
+            
+            more = self.browser.scroll_for_more(THREAD_EVENT_SELECTOR, direction="up")
+            if not more:
+                break
+            count = more
+        return count
+    
+    @tracer.traced("linkedin.fetch_thread")
+    def fetch_thread(self, conversation, depth=THREAD_DEPTH, max_age_days=THREAD_MAX_AGE_DAYS):
+        """Open a conversation and replace its list snippet with the real message history
+        
+        Args:
+            conversation (dict): Conversation as returned by extract_messages
+            depth (int): Maximum number of messages to read
+            max_age_days (int): Ignore messages older than this, 0 for no limit
+            
+        Returns:
+            dict: The same conversation, with 'messages' (most recent first), 'message_count'
+                  and 'thread' (list of {'sender', 'content', 'timestamp', 'day'}) filled
+                  in, and the list snippet kept as 'snippet'
+        """
+        conversation_id = conversation.get("conversation_id")
+        if not conversation_id:
+            logger.warning(f"No thread link for {conversation['contact']}, keeping the list snippet")
+            return conversation
+        
+        if not self.browser.navigate_to(f"https://www.linkedin.com/messaging/thread/{conversation_id}/"):
+            return conversation
+        
+        if not self.browser.wait_for_any_element([THREAD_EVENT_SELECTOR]):
+            logger.warning(f"Thread for {conversation['contact']} did not render, keeping the list snippet")
+            return conversation
+        
+        self._load_thread_history(depth, max_age_days)
+        thread = parse_thread(self.browser.get_page_source(), depth, max_age_days)
+        if thread:
+            conversation["snippet"] = conversation["messages"][0]
+            conversation["thread"] = thread
+            conversation["messages"] = [message["content"] for message in thread]
+            conversation["message_count"] = len(thread)
+            logger.info(f"Read {len(thread)} messages from the thread with {conversation['contact']}")
+        return conversation
+    
+    def is_logged_out(self):
+        """Whether LinkedIn has sent the browser to a login or verification page"""
+        try:
+            current_url = self.browser.driver.current_url or ""
+        except Exception:
+            return True
+        return any(marker in current_url for marker in self.LOGGED_OUT_URL_MARKERS)
+    
+    @tracer.traced("linkedin.recycle")
+    def recycle(self):
+        """Replace the browser with a fresh one and log in again
+
+        The session is saved first, so the new browser resumes it instead of
+        going through the login form.
+
+        Returns:
+            bool: True if the new browser is started and logged in
+        """
+        if self.logged_in and self.session_store and self.browser.driver:
+            self.session_store.save(self.browser.driver)
+
+        self.browser.close()
+        self.browser = BrowserTool(lean=self.browser.lean)
+        self.logged_in = False
+        return self.start() and self.login()
+
     def close(self):
         """Close the browser"""
         return self.browser.close()
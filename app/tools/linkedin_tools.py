@@ -1,174 +1,656 @@
 """Tools for LinkedIn agent"""
-from crewai.tools import tool
+import json
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+
 from app.utils.logger import logger, log_content
+from app.utils.cache import get_suggestion_cache, make_cache_key
+from app.utils.tracing import tracer
+from app.utils.config import (
+    CONVERSATION_LIMIT, THREAD_DEPTH, THREAD_MAX_AGE_DAYS,
+    SUGGESTION_MODEL, SUGGESTION_TEMPERATURE, SUGGESTION_CONCURRENCY, SUGGESTION_BATCH_SIZE,
+    CONTEXT_TOKEN_BUDGET
+)
 from app.tools.linkedin import LinkedInTool
+from app.tools.message_classifier import label as classify_message
+from app.tools.browser_pool import get_browser_pool
+from app.tools.context_builder import ContextBuilder, estimate_tokens
+from app.tools.conversation_store import conversation_key, get_conversation_store
+from app.tools.analysis_store import get_analysis_store
+
+SUGGESTION_ERROR = "Could not generate a suggestion due to an error."
+
+# Shared LLM client, created on first use by get_llm()
+_llm = None
+_llm_lock = threading.Lock()
+
+# Requests and tokens of every LLM call made through invoke_llm() in this process
+_llm_usage = {"requests": 0, "input_tokens": 0, "output_tokens": 0}
+_llm_usage_lock = threading.Lock()
+
+# Shared context builder, created on first use by get_context_builder()
+_context_builder = None
+_context_builder_lock = threading.Lock()
 
-@tool("analyze_linkedin_messages")
-def analyze_linkedin_messages():
+class AnalysisError(Exception):
+    """Raised when the inbox cannot be read, the message is meant for the user"""
+
+def __getattr__(name):
+    """Build the CrewAI tool on first access, so the pipeline can be used without loading CrewAI"""
+    if name == "analyze_linkedin_messages":
+        from crewai.tools import tool
+
+        globals()[name] = tool("analyze_linkedin_messages")(analyze_messages)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def analyze_messages():
     """Analyze LinkedIn messages with full conversation history and suggest responses"""
     try:
-        logger.info("Starting LinkedIn message analysis task with full conversation history...")
+        return run_pipeline()["output"]
+    except AnalysisError as e:
+        return str(e)
+    except Exception as e:
+        logger.error(f"Error during LinkedIn message analysis: {e}")
+        return f"Error during LinkedIn message analysis: {str(e)}"
+
+def run_pipeline(limit=CONVERSATION_LIMIT, thread_depth=THREAD_DEPTH,
+                 max_workers=SUGGESTION_CONCURRENCY, batch_size=SUGGESTION_BATCH_SIZE):
+    """Scrape, classify and answer the inbox directly, without an agent in between
+    
+    This is what the analyze_linkedin_messages tool runs. Calling it directly
+    saves the agent's own LLM round trips and the tokens it spends reading and
+    repeating the tool output, and the result is the same on every call.
+    
+    Example:
+        result = run_pipeline(limit=10)
+        for msg in result["analyzed"]:
+            print(msg["contact"], msg["message_type"], msg["potential_answer"])
+    
+    Returns:
+        dict: {'analyzed': list of analysis dicts, 'output': formatted report,
+               'usage': LLM requests and tokens spent by this run}
         
-        # Create a LinkedInTool instance
-        linkedin_tool = LinkedInTool()
+    Raises:
+        AnalysisError: If the browser cannot be started, logged in or navigated
+    """
+    logger.info("Starting LinkedIn message analysis task with full conversation history...")
+    usage_before = get_llm_usage()
+    store = get_conversation_store()
+    
+    # Suggestions are generated while the inbox is still being read, each one is
+    # logged as soon as it is ready
+    analyzed_messages = []
+    with tracer.span("analysis.stream") as span:
+        for analyzed in stream_analysis(limit=limit, thread_depth=thread_depth, store=store,
+                                        max_workers=max_workers, batch_size=batch_size):
+            analyzed_messages.append(analyzed)
+        span.set(conversations=len(analyzed_messages))
+    
+    # If no messages were found
+    if not analyzed_messages:
+        output = ("No new or changed conversations since the last run." if store
+                  else "No messages found in LinkedIn chats.")
+    else:
+        cache = get_suggestion_cache()
+        if cache:
+            logger.info(f"Suggestion cache stats: {cache.get_stats()}")
         
+        # Format the output for display and logging
+        output = "\n\n".join([format_analysis(msg) for msg in analyzed_messages])
+        
+        # Log the analyzed messages and add them to the searchable history
+        log_content(output, "linkedin_message_analysis")
+        record_analysis(analyzed_messages)
+    
+    usage = {key: value - usage_before[key] for key, value in get_llm_usage().items()}
+    return {"analyzed": analyzed_messages, "output": output, "usage": usage}
+
+def record_analysis(analyzed):
+    """Add successfully answered conversations to the analysis history, when it is enabled"""
+    history = get_analysis_store()
+    if history:
+        history.add([msg for msg in analyzed if msg["potential_answer"] != SUGGESTION_ERROR])
+
+def format_analysis(msg):
+    """Format one analyzed conversation for display and logging"""
+    return (
+        f"Contact: {msg['contact']}\n"
+        f"Message: {msg['message']}\n"
+        f"Total Messages: {msg['message_count']}\n"
+        f"Potential Answer: {msg['potential_answer']}\n"
+        f"{'=' * 50}"
+    )
+
+@contextmanager
+def linkedin_session():
+    """Provide a logged-in LinkedInTool for one unit of work
+    
+    The tool comes from the warm browser pool when it is enabled, otherwise a
+    browser is started, logged in and closed again afterwards.
+    
+    Yields:
+        tuple: (linkedin_tool, error_message) - linkedin_tool is None when error_message is set
+    """
+    pool = get_browser_pool()
+    if pool:
+        with pool.lease() as linkedin_tool:
+            if linkedin_tool is None:
+                yield None, "Failed to get a logged-in browser from the pool."
+            else:
+                yield linkedin_tool, None
+        return
+    
+    # Create a LinkedInTool instance
+    linkedin_tool = LinkedInTool()
+    try:
         # Start the browser
         if not linkedin_tool.start():
-            return "Failed to start the browser."
-        
+            yield None, "Failed to start the browser."
         # Login to LinkedIn
-        if not linkedin_tool.login():
-            linkedin_tool.close()
+        elif not linkedin_tool.login():
             logger.error("Login failed. Stopping the LinkedIn automation process.")
-            return "Failed to login to LinkedIn. The application has been stopped to prevent multiple login attempts."
-        
-        # Go to the messages page
-        if not linkedin_tool.go_to_messages():
-            linkedin_tool.close()
-            return "Failed to navigate to the LinkedIn messages."
-        
-        # Extract messages (latest 5)
-        conversation_data = linkedin_tool.extract_messages(limit=5)
-        
+            yield None, "Failed to login to LinkedIn. The application has been stopped to prevent multiple login attempts."
+        else:
+            yield linkedin_tool, None
+    finally:
         # Close the browser
         linkedin_tool.close()
+
+def stream_analysis(limit=CONVERSATION_LIMIT, thread_depth=THREAD_DEPTH, store=None,
+                    max_workers=SUGGESTION_CONCURRENCY, batch_size=SUGGESTION_BATCH_SIZE, linkedin_tool=None):
+    """Scrape and analyze conversations as a pipeline, yielding each result as soon as it is ready
+    
+    The browser is driven from the calling thread and every conversation is handed
+    to a pool of generation workers as soon as it is parsed. At most
+    2 * max_workers conversations wait for a suggestion; beyond that, scraping
+    pauses until the oldest one is done. Results are yielded in inbox order.
+    With a batch size above 1, conversations are grouped into one request per
+    batch and the limit becomes 2 * max_workers batches.
+    
+    Args:
+        limit (int): Maximum number of conversations to extract
+        thread_depth (int): Messages of history to read per conversation, 0 for the list snippet only
+        store (ConversationStore): When given, only new or changed conversations are analyzed
+            and each one is marked as seen once its suggestion is generated
+        max_workers (int): Maximum number of LLM requests in flight
+        batch_size (int): Conversations answered by one LLM request
+        linkedin_tool (LinkedInTool): Logged-in tool to use, it is left open. A session
+            is opened and closed for this call when not given
         
-        # If no messages were found
-        if not conversation_data:
-            return "No messages found in LinkedIn chats."
-        
-        # Generate response suggestions for each message
-        analyzed_messages = []
+    Yields:
+        dict: {'contact', 'message', 'message_count', 'message_type', 'potential_answer',
+               'conversation_key', 'timestamp'}
         
-        for conversation in conversation_data:
-            contact = conversation['contact']
-            messages = conversation['messages']
-            message_count = conversation['message_count']
+    Raises:
+        AnalysisError: If the browser cannot be started, logged in or navigated
+    """
+    max_workers = max(1, max_workers)
+    batch_size = max(1, batch_size)
+    max_pending = 2 * max_workers * batch_size
+    # Submitted conversations in inbox order, with their future and position in the batch
+    pending = deque()
+    batch = []
+    
+    def submit(group):
+        if batch_size == 1:
+            pending.append((group[0], executor.submit(suggest_for_conversation, group[0]), None))
+            return
+        future = executor.submit(suggest_for_batch, group)
+        pending.extend((conversation, future, idx) for idx, conversation in enumerate(group))
+    
+    session = nullcontext((linkedin_tool, None)) if linkedin_tool else linkedin_session()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        with session as (linkedin_tool, error):
+            if error:
+                raise AnalysisError(error)
             
-            # Skip empty conversations
-            if not messages:
-                continue
-                
-            # Get the most recent message
-            latest_message = messages[0]  # The first message is the most recent one
+            # Go to the messages page
+            if not linkedin_tool.go_to_messages():
+                raise AnalysisError("Failed to navigate to the LinkedIn messages.")
             
-            # Generate a potential response using the LLM with context
-            suggestion = generate_response_suggestion_with_context(contact, latest_message, messages)
+            conversations = linkedin_tool.iter_conversations(
+                limit=limit,
+                thread_depth=thread_depth,
+                max_age_days=THREAD_MAX_AGE_DAYS,
+                select=store.changed if store else None
+            )
+            for conversation in conversations:
+                # Skip empty conversations
+                if not conversation['messages']:
+                    continue
+                
+                # Classified once here, the prompts, the cache key and the result reuse the label
+                conversation_type(conversation)
+                batch.append(conversation)
+                if len(batch) == batch_size:
+                    submit(batch)
+                    batch = []
+                
+                # Emit what is already finished, and apply backpressure when the buffer is full
+                while pending and (pending[0][1].done() or len(pending) >= max_pending):
+                    yield _finish_analysis(*pending.popleft(), store=store)
             
-            analyzed_messages.append({
-                "contact": contact,
-                "message": latest_message,
-                "message_count": message_count,
-                "potential_answer": suggestion
-            })
-        
-        # Format the output for display and logging
-        output = "\n\n".join([
-            f"Contact: {msg['contact']}\n"
-            f"Message: {msg['message']}\n"
-            f"Total Messages: {msg['message_count']}\n"
-            f"Potential Answer: {msg['potential_answer']}\n"
-            f"{'=' * 50}"
-            for msg in analyzed_messages
-        ])
+            if batch:
+                submit(batch)
         
-        # Log the analyzed messages
-        log_content(output, "linkedin_message_analysis")
-        
-        return output
+        # The browser is released, finish the remaining suggestions
+        while pending:
+            yield _finish_analysis(*pending.popleft(), store=store)
+
+def _finish_analysis(conversation, future, index=None, store=None):
+    """Wait for a conversation's suggestion and turn it into an analysis result"""
+    try:
+        suggestion = future.result() if index is None else future.result()[index]
     except Exception as e:
-        logger.error(f"Error during LinkedIn message analysis: {e}")
-        try:
-            linkedin_tool.close()
-        except:
-            pass
-        return f"Error during LinkedIn message analysis: {str(e)}"
+        logger.error(f"Failed to generate response suggestion for {conversation['contact']}: {e}")
+        suggestion = SUGGESTION_ERROR
+    
+    analyzed = {
+        "contact": conversation['contact'],
+        "message": conversation['messages'][0],  # The first message is the most recent one
+        "message_count": conversation['message_count'],
+        "message_type": conversation_type(conversation),
+        "potential_answer": suggestion,
+        "conversation_key": conversation_key(conversation),
+        "timestamp": conversation.get("timestamp")
+    }
+    logger.info(f"Analyzed conversation:\n{format_analysis(analyzed)}")
+    
+    # Failed suggestions stay unseen so they are retried on the next run
+    if store and suggestion != SUGGESTION_ERROR:
+        store.mark_seen([conversation])
+    return analyzed
 
 def generate_response_suggestion(contact, message):
     """Generate a response suggestion for a given message (legacy method)"""
     return generate_response_suggestion_with_context(contact, message, [message])
 
-def generate_response_suggestion_with_context(contact, message, message_history):
-    """Generate a response suggestion using full conversation history for context"""
-    try:
-        # Use the LLM to generate a response
-        from langchain_openai import ChatOpenAI
-        from langchain.schema import HumanMessage, SystemMessage
-        
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
-        
-        # Determine the message type to customize the response
-        message_type = determine_message_type(message)
+def get_llm():
+    """Return the LLM client shared by all suggestion requests
+    
+    The client (and its HTTP connection pool) is created once and reused, it is
+    safe to call from several threads at the same time.
+    """
+    global _llm
+    
+    with _llm_lock:
+        if _llm is None:
+            from langchain_openai import ChatOpenAI
+            _llm = ChatOpenAI(model=SUGGESTION_MODEL, temperature=SUGGESTION_TEMPERATURE)
+        return _llm
+
+def invoke_llm(system_prompt, user_prompt, kind="suggestion", **attributes):
+    """Send one chat completion through the shared client, traced with its token counts
+    
+    Returns:
+        str: The content of the answer
+    """
+    from langchain.schema import HumanMessage, SystemMessage
+    
+    with tracer.span("llm.invoke", kind=kind, model=SUGGESTION_MODEL, **attributes) as span:
+        response = get_llm().invoke([
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt)
+        ])
+        # Real token counts when the client reports them, estimates otherwise
+        usage = getattr(response, "usage_metadata", None) or {}
+        input_tokens = usage.get("input_tokens", estimate_tokens(system_prompt) + estimate_tokens(user_prompt))
+        output_tokens = usage.get("output_tokens", estimate_tokens(response.content))
+        span.set(input_tokens=input_tokens, output_tokens=output_tokens, estimated=not usage)
+    
+    with _llm_usage_lock:
+        _llm_usage["requests"] += 1
+        _llm_usage["input_tokens"] += input_tokens
+        _llm_usage["output_tokens"] += output_tokens
+    return response.content
+
+def get_llm_usage():
+    """Requests and tokens of the LLM calls made so far in this process"""
+    with _llm_usage_lock:
+        return dict(_llm_usage)
+
+def get_context_builder():
+    """Return the context builder shared by all suggestion requests"""
+    global _context_builder
+    
+    with _context_builder_lock:
+        if _context_builder is None:
+            _context_builder = ContextBuilder(summarize_history, cache=get_suggestion_cache())
+        return _context_builder
+
+def summarize_history(previous_summary, messages, max_tokens):
+    """Fold earlier messages of a conversation into a short summary
+    
+    Args:
+        previous_summary (str): Summary of the messages before these ones, or None
+        messages (list): Messages to add, oldest first
+        max_tokens (int): Approximate size limit for the summary
         
-        # Construct the prompt based on message type
-        system_prompt = (
-            "You are a professional LinkedIn communication assistant. "
-            "Generate a thoughtful, concise, and professional response to the following LinkedIn message. "
-            "Use the conversation history provided for context when crafting your response. "
-        )
+    Returns:
+        str: The updated summary
+    """
+    system_prompt = (
+        "You summarize LinkedIn conversations so a reply can be written later. "
+        "Keep names, questions, commitments, dates and open topics; drop greetings and small talk. "
+        f"Answer with the summary only, in at most {max_tokens * 3 // 4} words."
+    )
+    messages_text = "\n".join([f"Message: {m}" for m in messages])
+    user_prompt = (
+        f"Summary so far:\n{previous_summary or 'None'}\n\n"
+        f"New messages (oldest first):\n{messages_text}\n\n"
+        f"Updated summary:"
+    )
+    return invoke_llm(system_prompt, user_prompt, kind="summary").strip()
+
+def generate_suggestions(conversations, max_workers=SUGGESTION_CONCURRENCY, batch_size=SUGGESTION_BATCH_SIZE):
+    """Generate response suggestions for several conversations concurrently
+    
+    Args:
+        conversations (list): Conversation dicts as returned by LinkedInTool.extract_messages
+        max_workers (int): Maximum number of LLM requests in flight
+        batch_size (int): Conversations answered by one LLM request
         
-        if message_type == "connection_request":
-            system_prompt += (
-                "This appears to be a connection request or introduction. "
-                "Be appreciative and show interest in connecting. "
-                "Keep the response friendly, professional, and under 80 words."
-            )
-        elif message_type == "job_opportunity":
-            system_prompt += (
-                "This appears to be related to a job opportunity. "
-                "Express appropriate interest or gratitude while maintaining professionalism. "
-                "Ask 1-2 relevant follow-up questions if appropriate. "
-                "Keep the response under 100 words."
-            )
-        elif message_type == "sales_pitch":
-            system_prompt += (
-                "This appears to be a sales pitch or service offering. "
-                "Be polite but direct about your level of interest. "
-                "If declining, be respectful. If interested, ask a specific question. "
-                "Keep the response under 80 words."
-            )
-        else:
-            system_prompt += (
-                "Respond in a friendly but professional manner. "
-                "Match the tone and formality of the original message. "
-                "Keep the response under 100 words."
-            )
+    Returns:
+        list: One suggestion per conversation, in the same order. A failed
+              conversation gets an error message without affecting the others.
+    """
+    if not conversations:
+        return []
+    
+    if batch_size > 1:
+        batches = [conversations[start:start + batch_size] for start in range(0, len(conversations), batch_size)]
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as executor:
+            futures = [executor.submit(suggest_for_batch, batch) for batch in batches]
         
-        # Construct user prompt with context from message history
-        conversation_context = "\n".join([f"Message: {m}" for m in message_history[1:]]) if len(message_history) > 1 else "No previous messages"
+        suggestions = []
+        for batch, future in zip(batches, futures):
+            try:
+                suggestions.extend(future.result())
+            except Exception as e:
+                logger.error(f"Failed to generate response suggestions for a batch of {len(batch)}: {e}")
+                suggestions.extend([SUGGESTION_ERROR] * len(batch))
+        return suggestions
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(conversations)))) as executor:
+        futures = [executor.submit(suggest_for_conversation, conversation) for conversation in conversations]
+    
+    suggestions = []
+    for conversation, future in zip(conversations, futures):
+        try:
+            suggestions.append(future.result())
+        except Exception as e:
+            logger.error(f"Failed to generate response suggestion for {conversation['contact']}: {e}")
+            suggestions.append(SUGGESTION_ERROR)
+    return suggestions
+
+def suggest_for_conversation(conversation):
+    """Generate a response suggestion for the most recent message of a conversation"""
+    messages = conversation['messages']
+    return generate_response_suggestion_with_context(
+        conversation['contact'], messages[0], messages, conversation_key=conversation_key(conversation),
+        message_type=conversation_type(conversation)
+    )
+
+def build_prompts(contact, message, message_history, summary=None, message_type=None):
+    """Build the system and user prompts for a response suggestion
+    
+    Args:
+        contact (str): Name of the contact
+        message (str): The message to answer
+        message_history (list): Messages of the conversation, most recent (the one to answer) first
+        summary (str): Summary of the messages older than message_history, if any
+        message_type (str): Type of the message, classified here when not given
         
-        user_prompt = (
-            f"Contact: {contact}\n"
-            f"Conversation History:\n{conversation_context}\n\n"
-            f"Latest Message: {message}\n\n"
-            f"Suggested response:"
+    Returns:
+        tuple: (system_prompt, user_prompt)
+    """
+    # Determine the message type to customize the response
+    message_type = message_type or determine_message_type(message)
+    
+    # Construct the prompt based on message type
+    system_prompt = (
+        "You are a professional LinkedIn communication assistant. "
+        "Generate a thoughtful, concise, and professional response to the following LinkedIn message. "
+        "Use the conversation history provided for context when crafting your response. "
+    )
+    
+    if message_type == "connection_request":
+        system_prompt += (
+            "This appears to be a connection request or introduction. "
+            "Be appreciative and show interest in connecting. "
+            "Keep the response friendly, professional, and under 80 words."
         )
+    elif message_type == "job_opportunity":
+        system_prompt += (
+            "This appears to be related to a job opportunity. "
+            "Express appropriate interest or gratitude while maintaining professionalism. "
+            "Ask 1-2 relevant follow-up questions if appropriate. "
+            "Keep the response under 100 words."
+        )
+    elif message_type == "sales_pitch":
+        system_prompt += (
+            "This appears to be a sales pitch or service offering. "
+            "Be polite but direct about your level of interest. "
+            "If declining, be respectful. If interested, ask a specific question. "
+            "Keep the response under 80 words."
+        )
+    else:
+        system_prompt += (
+            "Respond in a friendly but professional manner. "
+            "Match the tone and formality of the original message. "
+            "Keep the response under 100 words."
+        )
+    
+    # Construct user prompt with context from message history
+    conversation_context = "\n".join([f"Message: {m}" for m in message_history[1:]]) if len(message_history) > 1 else "No previous messages"
+    if summary:
+        conversation_context = f"Summary of earlier messages: {summary}\n{conversation_context}"
+    
+    user_prompt = (
+        f"Contact: {contact}\n"
+        f"Conversation History:\n{conversation_context}\n\n"
+        f"Latest Message: {message}\n\n"
+        f"Suggested response:"
+    )
+    
+    return system_prompt, user_prompt
+
+def prepare_suggestion(contact, message, message_history, conversation_key=None, message_type=None):
+    """Look up the suggestion cache and build the prompts for one conversation
+    
+    The history is fitted into CONTEXT_TOKEN_BUDGET: the newest messages are sent
+    verbatim and older ones as a rolling summary cached per conversation.
+    
+    Args:
+        contact (str): Name of the contact
+        message (str): The message to answer
+        message_history (list): Messages of the conversation, most recent (the one to answer) first
+        conversation_key (str): Identity the rolling summary is cached under, defaults to the contact
+        message_type (str): Type of the message, classified here when not given
         
-        response = llm([
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_prompt)
-        ])
-        
-        return response.content.strip()
+    Returns:
+        dict: {'cache_key', 'cached', 'system_prompt', 'user_prompt'} - cached is the
+              previous suggestion when the conversation has not changed, otherwise None
+              and the prompts are ready to send
+    """
+    message_type = message_type or determine_message_type(message)
+    system_prompt, user_prompt = build_prompts(contact, message, message_history, message_type=message_type)
+    
+    # An unchanged conversation produces the same key, so the previous suggestion is reused
+    cache = get_suggestion_cache()
+    cache_key = make_cache_key(
+        contact=contact,
+        message_history=message_history,
+        message_type=message_type,
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        model=SUGGESTION_MODEL,
+        temperature=SUGGESTION_TEMPERATURE,
+        context_budget=CONTEXT_TOKEN_BUDGET
+    )
+    prepared = {"cache_key": cache_key, "cached": None, "system_prompt": system_prompt, "user_prompt": user_prompt}
+    if cache:
+        prepared["cached"] = cache.get(cache_key)
+        if prepared["cached"] is not None:
+            logger.info(f"Using cached response suggestion for {contact}")
+            return prepared
+    
+    # Only the prompt actually sent is limited, the cache key above covers the full history
+    recent, summary = get_context_builder().build(
+        conversation_key or f"contact:{contact}", message_history[1:]
+    )
+    if summary is not None or len(recent) < len(message_history) - 1:
+        prepared["system_prompt"], prepared["user_prompt"] = build_prompts(
+            contact, message, [message] + recent, summary, message_type=message_type
+        )
+    return prepared
+
+def request_suggestion(prepared):
+    """Send one prepared conversation to the LLM and cache the suggestion"""
+    # Use the shared LLM client to generate a response
+    suggestion = invoke_llm(prepared["system_prompt"], prepared["user_prompt"], kind="suggestion").strip()
+    cache = get_suggestion_cache()
+    if cache:
+        cache.set(prepared["cache_key"], suggestion)
+    return suggestion
+
+def generate_response_suggestion_with_context(contact, message, message_history, conversation_key=None,
+                                              message_type=None):
+    """Generate a response suggestion using the conversation history for context
+    
+    Args:
+        contact (str): Name of the contact
+        message (str): The message to answer
+        message_history (list): Messages of the conversation, most recent (the one to answer) first
+        conversation_key (str): Identity the rolling summary is cached under, defaults to the contact
+        message_type (str): Type of the message, classified when not given
+    """
+    try:
+        prepared = prepare_suggestion(contact, message, message_history, conversation_key, message_type)
+        if prepared["cached"] is not None:
+            return prepared["cached"]
+        return request_suggestion(prepared)
     except Exception as e:
         logger.error(f"Failed to generate response suggestion with context: {e}")
-        return "Could not generate a suggestion due to an error."
+        return SUGGESTION_ERROR
+
+def suggest_for_batch(conversations):
+    """Generate suggestions for several conversations with a single LLM request
+    
+    Each conversation keeps its own type-specific instructions. The model answers
+    with a JSON object keyed by conversation id; conversations whose answer is
+    missing or malformed are retried with their own request.
+    
+    Args:
+        conversations (list): Conversation dicts as returned by LinkedInTool.extract_messages
         
-def determine_message_type(message):
-    """Determine the type of LinkedIn message to tailor the response"""
-    message = message.lower()
+    Returns:
+        list: One suggestion per conversation, in the same order
+    """
+    suggestions = [None] * len(conversations)
+    prepared = {}
+    for idx, conversation in enumerate(conversations):
+        messages = conversation['messages']
+        try:
+            item = prepare_suggestion(
+                conversation['contact'], messages[0], messages, conversation_key=conversation_key(conversation),
+                message_type=conversation_type(conversation)
+            )
+        except Exception as e:
+            logger.error(f"Failed to prepare response suggestion for {conversation['contact']}: {e}")
+            suggestions[idx] = SUGGESTION_ERROR
+            continue
+        if item["cached"] is not None:
+            suggestions[idx] = item["cached"]
+        else:
+            # Short ids, conversation ids can be missing or shared by contact-only fallbacks
+            prepared[str(idx + 1)] = (idx, item)
+    
+    answers = {}
+    if len(prepared) > 1:
+        try:
+            answers = request_suggestion_batch({key: item for key, (_, item) in prepared.items()})
+        except Exception as e:
+            logger.error(f"Batched suggestion request failed, falling back to one request per conversation: {e}")
     
-    # Connection request or introduction
-    if any(term in message for term in ['connect', 'connection', 'network', 'nice to meet', 'introduction']):
-        return "connection_request"
+    cache = get_suggestion_cache()
+    for key, (idx, item) in prepared.items():
+        if key in answers:
+            suggestions[idx] = answers[key]
+            if cache:
+                cache.set(item["cache_key"], answers[key])
+            continue
         
-    # Job opportunity
-    if any(term in message for term in ['job', 'position', 'opportunity', 'hiring', 'recruit', 'opening', 'role']):
-        return "job_opportunity"
+        if len(prepared) > 1:
+            logger.warning(f"No valid batched suggestion for {conversations[idx]['contact']}, requesting it alone")
+        try:
+            suggestions[idx] = request_suggestion(item)
+        except Exception as e:
+            logger.error(f"Failed to generate response suggestion for {conversations[idx]['contact']}: {e}")
+            suggestions[idx] = SUGGESTION_ERROR
+    return suggestions
+
+def request_suggestion_batch(prepared):
+    """Send several prepared conversations to the LLM in one request
+    
+    Args:
+        prepared (dict): Conversation id -> prepared prompts, see prepare_suggestion
         
-    # Sales pitch
-    if any(term in message for term in ['offer', 'service', 'product', 'solution', 'discount', 'demo', 'free trial']):
-        return "sales_pitch"
+    Returns:
+        dict: Conversation id -> suggestion, only for the ids with a valid answer
+    """
+    system_prompt = (
+        "You are a professional LinkedIn communication assistant. "
+        "You will receive several LinkedIn conversations, each with an id and its own instructions. "
+        "Write one response per conversation, following the instructions given for that conversation. "
+        "Answer with a single JSON object that maps every conversation id to its response text, and nothing else."
+    )
+    user_prompt = "\n\n".join([
+        f"### Conversation id: {key}\n"
+        f"Instructions: {item['system_prompt']}\n"
+        f"{item['user_prompt']}"
+        for key, item in prepared.items()
+    ])
+    
+    content = invoke_llm(system_prompt, user_prompt, kind="suggestion_batch", conversations=len(prepared))
+    return parse_batch_response(content, prepared.keys())
+
+def parse_batch_response(content, keys):
+    """Extract the valid suggestions from a batched JSON answer
+    
+    Returns:
+        dict: Conversation id -> non-empty suggestion, malformed entries are left out
+    """
+    text = content.strip()
+    # Models sometimes wrap JSON in a markdown code block
+    if text.startswith("```"):
+        text = text.split("\n", 1)[-1].rsplit("```", 1)[0]
+    
+    try:
+        data = json.loads(text)
+    except ValueError:
+        logger.warning("Batched suggestion answer is not valid JSON")
+        return {}
+    if not isinstance(data, dict):
+        logger.warning("Batched suggestion answer is not a JSON object")
+        return {}
+    
+    answers = {}
+    for key in keys:
+        value = data.get(key)
+        if isinstance(value, str) and value.strip():
+            answers[key] = value.strip()
+    return answers
         
-    # Default - general conversation
-    return "general"
+def determine_message_type(message):
+    """Determine the type of LinkedIn message to tailor the response"""
+    return classify_message(message)
+
+def conversation_type(conversation):
+    """Type of a conversation's latest message, classified on first use and kept on the conversation"""
+    if "message_type" not in conversation:
+        conversation["message_type"] = determine_message_type(conversation['messages'][0])
+    return conversation["message_type"]
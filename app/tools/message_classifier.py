@@ -0,0 +1,137 @@
+"""Keyword classification of LinkedIn messages into the types used to tailor responses"""
+import re
+
+# Message types and their keywords, in priority order - when a message mentions several
+# types the first one wins, as it always has
+MESSAGE_CATEGORIES = [
+    ("connection_request", ["connect", "connection", "network", "nice to meet", "introduction"]),
+    ("job_opportunity", ["job", "position", "opportunity", "opportunities", "hiring", "recruit",
+                         "opening", "role"]),
+    ("sales_pitch", ["offer", "service", "product", "solution", "discount", "demo", "free trial"]),
+]
+DEFAULT_TYPE = "general"
+
+# Inflections accepted after a keyword, so "recruiter" and "connected" still count
+# while "productive" or "jobless" do not
+KEYWORD_SUFFIX = r"(?:s|es|ed|ing|er|ers|ion|ions|ment|ments)?"
+
+
+def build_pattern(categories):
+    """Compile every keyword into one pattern with a capturing group per category
+
+    The pattern expects lowercased text. Group n holds the keywords of the
+    n-th category, so the lastindex of a match is its category and a keyword
+    listed twice belongs to the first category that lists it. A lookahead on
+    the possible first letters lets the engine reject most word starts
+    before trying any keyword.
+    """
+    groups = []
+    for _, terms in categories:
+        # Longest first so the alternation prefers "connection" over "connect"
+        terms = sorted({term.lower() for term in terms}, key=len, reverse=True)
+        groups.append("(" + "|".join(r"\s+".join(map(re.escape, term.split())) for term in terms) + ")")
+    lookahead = "".join(sorted({re.escape(term[0].lower()) for _, terms in categories for term in terms}))
+    return re.compile(rf"\b(?=[{lookahead}])(?:{'|'.join(groups)}){KEYWORD_SUFFIX}\b")
+
+
+def keyword_probes(terms):
+    """First words of the keywords, without those that already start with a shorter one"""
+    probes = []
+    for word in sorted({term.lower().split()[0] for term in terms}, key=len):
+        if not any(word.startswith(probe) for probe in probes):
+            probes.append(word)
+    return tuple(probes)
+
+
+class MessageClassifier:
+    """Word-boundary keyword classifier backed by one precompiled pattern
+
+    classify() returns (label, confidence). The label follows the category
+    priority order. Confidence is the share of keyword hits that belong to
+    the label, damped when there is little evidence: one hit scores 0.5,
+    three hits 0.75. A message without any keyword is "general" with a
+    confidence of 1.0.
+
+    label() gives the same label without the confidence. Plain substring
+    probes find where a keyword of a category could start, and the pattern
+    only runs anchored at those positions, so it never scans the whole text.
+    """
+
+    def __init__(self, categories=MESSAGE_CATEGORIES, default=DEFAULT_TYPE):
+        self.labels = [label for label, _ in categories]
+        self.default = default
+        self.pattern = build_pattern(categories)
+        # In priority order: (group of the category in the pattern, label, substring probes)
+        self.probes = [(group, label, keyword_probes(terms)) for group, (label, terms) in enumerate(categories, 1)]
+
+    def label(self, message):
+        """Label of one message, without computing a confidence"""
+        if not message:
+            return self.default
+
+        text = message.lower()
+        match = self.pattern.match
+        for group, label, probes in self.probes:
+            for probe in probes:
+                if probe in text:
+                    start = text.find(probe)
+                    while start != -1:
+                        # A keyword of the category, on word boundaries, starts here
+                        found = match(text, start)
+                        if found and found.lastindex == group:
+                            return label
+                        start = text.find(probe, start + 1)
+        return self.default
+
+    def classify(self, message):
+        """Classify one message
+
+        Returns:
+            tuple: (label, confidence) with confidence between 0 and 1
+        """
+        if not message:
+            return self.default, 1.0
+
+        hits = [0] * len(self.labels)
+        for found in self.pattern.finditer(message.lower()):
+            hits[found.lastindex - 1] += 1
+        total = sum(hits)
+        if not total:
+            return self.default, 1.0
+
+        index = next(index for index, count in enumerate(hits) if count)
+        count = hits[index]
+        return self.labels[index], round(count / total * count / (count + 1), 3)
+
+    def classify_many(self, messages):
+        """Classify a batch of messages, returning (label, confidence) tuples in order"""
+        classify = self.classify
+        return [classify(message) for message in messages]
+
+    def label_many(self, messages):
+        """Labels of a batch of messages, in order"""
+        label = self.label
+        return [label(message) for message in messages]
+
+
+_default_classifier = MessageClassifier()
+
+
+def classify(message):
+    """Classify one message with the default categories"""
+    return _default_classifier.classify(message)
+
+
+def classify_many(messages):
+    """Classify a batch of messages with the default categories"""
+    return _default_classifier.classify_many(messages)
+
+
+def label(message):
+    """Label of one message with the default categories"""
+    return _default_classifier.label(message)
+
+
+def label_many(messages):
+    """Labels of a batch of messages with the default categories"""
+    return _default_classifier.label_many(messages)
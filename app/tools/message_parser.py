@@ -0,0 +1,325 @@
+"""Parsing of the LinkedIn messaging page into conversation dicts"""
+import re
+from datetime import date, datetime, timedelta
+from importlib.util import find_spec
+
+# Checked without importing lxml, the parser is only loaded when a page is parsed
+FAST_PARSER = "lxml" if find_spec("lxml") else "html.parser"
+
+# Conversation links look like /messaging/thread/<thread id>/
+THREAD_URL_PATTERN = re.compile(r"/messaging/thread/([^/?#]+)")
+
+# Conversation list entries in order of preference - LinkedIn's UI changes, so we try several
+CARD_SELECTORS = [
+    ("li", "msg-conversation-card"),
+    ("div", "msg-conversation-card__content"),
+    ("div", "msg-conversation-listitem__link"),
+]
+CARD_CLASSES = frozenset(css_class for _, css_class in CARD_SELECTORS)
+
+
+def _has_card_class(class_value):
+    """SoupStrainer filter - at parse time the class attribute is still the raw string"""
+    return bool(class_value) and not CARD_CLASSES.isdisjoint(class_value.split())
+
+
+# Events (messages and day headings) of an open conversation thread
+THREAD_EVENT_CLASS = "msg-s-message-list__event"
+THREAD_EVENT_SELECTOR = f"li.{THREAD_EVENT_CLASS}"
+
+
+def _is_thread_event(class_value):
+    """SoupStrainer filter for the events of an open thread"""
+    return bool(class_value) and THREAD_EVENT_CLASS in class_value.split()
+
+
+def make_soup(page_source, parser="html.parser", only_class=None):
+    """Parse HTML with BeautifulSoup
+
+    bs4 is imported on first use, so runs that extract conversations in the
+    browser never load it.
+
+    Args:
+        page_source (str): HTML to parse
+        parser (str): BeautifulSoup tree builder
+        only_class (callable): Class filter, only matching elements (and everything
+                               inside them) are built instead of the whole page
+    """
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    parse_only = SoupStrainer(class_=only_class) if only_class else None
+    return BeautifulSoup(page_source, parser, parse_only=parse_only)
+
+# Runs inside the page and mirrors find_conversations_legacy() + parse_conversation_card(),
+# returning one small [contact, message, conversation_id, timestamp] row per card
+EXTRACT_CONVERSATIONS_SCRIPT = r"""
+var cardSelectors = arguments[0], limit = arguments[1];
+var NAME_SELECTORS = ["h3.msg-conversation-card__participant-names",
+                      "span.msg-conversation-listitem__participant-names", "span.t-16"];
+var MESSAGE_SELECTORS = ["span.msg-conversation-card__message-snippet-body",
+                         "div.msg-conversation-card__message-snippet", "p.mail-messages-list__body"];
+var THREAD_URL = /\/messaging\/thread\/([^\/?#]+)/;
+
+// Same as BeautifulSoup's get_text(strip=True): every text node stripped and concatenated
+function text(element) {
+    var walker = document.createTreeWalker(element, NodeFilter.SHOW_TEXT), parts = [], node;
+    while ((node = walker.nextNode())) {
+        var parent = node.parentNode.nodeName;
+        if (parent === "SCRIPT" || parent === "STYLE" || parent === "TEMPLATE") { continue; }
+        var value = node.nodeValue.trim();
+        if (value) { parts.push(value); }
+    }
+    return parts.join("");
+}
+
+function first(root, selectors) {
+    for (var i = 0; i < selectors.length; i++) {
+        var element = root.querySelector(selectors[i]);
+        if (element) { return element; }
+    }
+    return null;
+}
+
+var cards = [];
+for (var i = 0; i < cardSelectors.length && !cards.length; i++) {
+    cards = document.querySelectorAll(cardSelectors[i]);
+}
+
+var rows = [];
+for (var c = 0; c < cards.length && rows.length < limit; c++) {
+    var card = cards[c];
+    var name = first(card, NAME_SELECTORS);
+    var message = first(card, MESSAGE_SELECTORS);
+    if (!message) {
+        var divs = card.querySelectorAll("div[class]");
+        for (var d = 0; d < divs.length && !message; d++) {
+            if (divs[d].getAttribute("class").toLowerCase().indexOf("message") !== -1) { message = divs[d]; }
+        }
+    }
+    var conversationId = null;
+    var links = card.querySelectorAll("a[href]");
+    for (var l = 0; l < links.length && conversationId === null; l++) {
+        var match = THREAD_URL.exec(links[l].getAttribute("href"));
+        if (match) { conversationId = match[1]; }
+    }
+    var time = card.querySelector("time");
+    rows.push([name ? text(name) : null, message ? text(message) : null,
+               conversationId, time ? text(time) : null]);
+}
+return rows;
+"""
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+def find_conversations_legacy(soup):
+    """Find conversation elements in a full page tree, trying each selector in turn"""
+    # Try to find conversation list - we need to try multiple selectors as LinkedIn's UI might change
+    conversations = soup.find_all("li", {"class": "msg-conversation-card"})
+
+    if not conversations:
+        # Try another selector if the first one doesn't work
+        conversations = soup.find_all("div", {"class": "msg-conversation-card__content"})
+
+    if not conversations:
+        # Try more generic selectors
+        conversations = soup.find_all("div", {"class": "msg-conversation-listitem__link"})
+
+        if not conversations:
+            # As a fallback, look for any elements that might contain messaging content
+            conversations = soup.find_all("div", {"data-control-name": "overlay.expand_conversation"})
+
+    return conversations
+
+
+def find_conversations(soup):
+    """Find conversation elements with a single walk over the tree
+
+    Every candidate is bucketed by the selector it matches, and the first
+    non-empty bucket wins - the same result as trying the selectors in turn.
+    """
+    buckets = [[] for _ in CARD_SELECTORS]
+    for tag in soup.find_all(["li", "div"]):
+        classes = tag.get("class") or ()
+        for idx, (name, css_class) in enumerate(CARD_SELECTORS):
+            if tag.name == name and css_class in classes:
+                buckets[idx].append(tag)
+
+    return next((bucket for bucket in buckets if bucket), [])
+
+
+def parse_conversation_card(conversation):
+    """Extract contact, last message, thread id and time from one conversation element"""
+    contact_name = "Unknown Contact"
+    last_message = "No message content"
+
+    # Extract contact name - try multiple selectors
+    name_elem = conversation.find("h3", {"class": "msg-conversation-card__participant-names"})
+    if not name_elem:
+        name_elem = conversation.find("span", {"class": "msg-conversation-listitem__participant-names"})
+    if not name_elem:
+        name_elem = conversation.find("span", {"class": "t-16"})
+    if name_elem:
+        contact_name = name_elem.get_text(strip=True)
+
+    # Extract last message - try multiple selectors
+    msg_elem = conversation.find("span", {"class": "msg-conversation-card__message-snippet-body"})
+    if not msg_elem:
+        msg_elem = conversation.find("div", {"class": "msg-conversation-card__message-snippet"})
+    if not msg_elem:
+        msg_elem = conversation.find("p", {"class": "mail-messages-list__body"})
+    if not msg_elem:
+        # Last resort - find any element that might contain message text
+        msg_elem = conversation.find("div", class_=lambda c: c and "message" in c.lower())
+    if msg_elem:
+        last_message = msg_elem.get_text(strip=True)
+
+    # Extract the thread id from the conversation link, used to track conversations between runs
+    conversation_id = None
+    link_elem = conversation.find("a", href=THREAD_URL_PATTERN)
+    if link_elem:
+        conversation_id = THREAD_URL_PATTERN.search(link_elem["href"]).group(1)
+
+    # Extract the time of the last message as displayed in the list (e.g. "10:32 AM", "Mar 4")
+    timestamp = None
+    time_elem = conversation.find("time")
+    if time_elem:
+        timestamp = time_elem.get_text(strip=True)
+
+    return {
+        "contact": contact_name,
+        "messages": [last_message],  # For now, just include the last message in the list
+        "message_count": 1,
+        "conversation_id": conversation_id,
+        "timestamp": timestamp
+    }
+
+
+def parse_conversations(page_source, limit=5, fast=True):
+    """Parse the messaging page into conversation dicts
+
+    Args:
+        page_source (str): HTML of the LinkedIn messaging page
+        limit (int): Maximum number of conversations to return
+        fast (bool): Parse only the conversation cards with the fastest available
+                     parser. The full-page html.parser path is used when False, and
+                     as a fallback when no card is found this way.
+
+    Returns:
+        list: Conversation dicts in the format returned by LinkedInTool.extract_messages
+    """
+    conversations = []
+    if fast:
+        soup = make_soup(page_source, FAST_PARSER, only_class=_has_card_class)
+        conversations = find_conversations(soup)
+
+    if not conversations:
+        soup = make_soup(page_source)
+        conversations = find_conversations_legacy(soup)
+
+    # Process up to the limit
+    return [parse_conversation_card(conversation) for conversation in conversations[:limit]]
+
+
+def conversations_from_rows(rows, limit=5):
+    """Turn the rows returned by EXTRACT_CONVERSATIONS_SCRIPT into conversation dicts
+
+    Returns:
+        list: Conversation dicts in the same format as parse_conversations
+    """
+    conversations = []
+    for contact_name, last_message, conversation_id, timestamp in rows[:limit]:
+        conversations.append({
+            "contact": "Unknown Contact" if contact_name is None else contact_name,
+            "messages": ["No message content" if last_message is None else last_message],
+            "message_count": 1,
+            "conversation_id": conversation_id,
+            "timestamp": timestamp
+        })
+    return conversations
+
+
+def parse_day_heading(text, today=None):
+    """Turn a thread day heading ("Today", "Monday", "Mar 4", "Dec 30, 2024") into a date
+
+    Returns:
+        date: The day the heading refers to, or None if it is not recognised
+    """
+    today = today or date.today()
+    text = text.strip().lower()
+
+    if text == "today":
+        return today
+    if text == "yesterday":
+        return today - timedelta(days=1)
+    if text in WEEKDAYS:
+        # Weekday names are only used for the last week
+        days_ago = (today.weekday() - WEEKDAYS.index(text)) % 7 or 7
+        return today - timedelta(days=days_ago)
+
+    for fmt in ("%b %d, %Y", "%B %d, %Y"):
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            pass
+
+    for fmt in ("%b %d", "%B %d"):
+        try:
+            parsed = datetime.strptime(f"{text} {today.year}", f"{fmt} %Y").date()
+        except ValueError:
+            continue
+        # Dates without a year are within the last twelve months
+        return parsed if parsed <= today else parsed.replace(year=today.year - 1)
+
+    return None
+
+
+def parse_thread(page_source, depth=None, max_age_days=None, today=None):
+    """Parse the messages of an open conversation thread
+
+    Args:
+        page_source (str): HTML of a LinkedIn conversation thread page
+        depth (int): Maximum number of messages to return, None for all loaded messages
+        max_age_days (int): Skip messages from days older than this, None for no limit
+        today (date): Reference day for relative headings, defaults to today
+
+    Returns:
+        list: Message dicts {'sender', 'content', 'timestamp', 'day'} ordered newest first
+    """
+    today = today or date.today()
+    soup = make_soup(page_source, FAST_PARSER, only_class=_is_thread_event)
+
+    messages = []
+    sender = None
+    day = None
+    for event in soup.find_all("li", class_=THREAD_EVENT_CLASS):
+        heading = event.find("time", class_="msg-s-message-list__time-heading")
+        if heading:
+            day = parse_day_heading(heading.get_text(strip=True), today)
+
+        # Only the first message of a group carries the sender name and time
+        name_elem = event.find(class_="msg-s-message-group__name")
+        if name_elem:
+            sender = name_elem.get_text(strip=True)
+        time_elem = event.find("time", class_="msg-s-message-group__timestamp")
+        timestamp = time_elem.get_text(strip=True) if time_elem else None
+
+        for body in event.find_all(class_="msg-s-event-listitem__body"):
+            content = body.get_text(" ", strip=True)
+            if content:
+                messages.append({
+                    "sender": sender,
+                    "content": content,
+                    "timestamp": timestamp,
+                    "day": day.isoformat() if day else None
+                })
+
+    # The page lists messages oldest first, conversations keep the most recent one first
+    messages.reverse()
+
+    if max_age_days:
+        oldest_day = (today - timedelta(days=max_age_days)).isoformat()
+        messages = [m for m in messages if not m["day"] or m["day"] >= oldest_day]
+    if depth:
+        messages = messages[:depth]
+    return messages
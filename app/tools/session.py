@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import time
+
+from app.utils.logger import logger
+from app.utils.config import SESSION_DIR, SESSION_MAX_AGE_HOURS
+
+# Cookie that carries the authenticated LinkedIn session
+AUTH_COOKIE = "li_at"
+
+# Cookies can only be set for the domain currently loaded in the browser, a
+# small static page of the same origin avoids rendering the whole home page
+LINKEDIN_ORIGIN_URL = "https://www.linkedin.com/robots.txt"
+
+
+class SessionStore:
+    """Persist and restore an authenticated LinkedIn browser session
+
+    The session (cookies and local storage) is saved to a JSON file per account
+    after a successful login, so the next run can restore it instead of typing
+    credentials again.
+    """
+
+    def __init__(self, account, session_dir=SESSION_DIR, max_age_hours=SESSION_MAX_AGE_HOURS):
+        self.account = account or "default"
+        self.session_dir = session_dir
+        self.max_age_seconds = max_age_hours * 3600
+        # Never put the raw email address in a file name
+        account_key = hashlib.sha256(self.account.lower().encode("utf-8")).hexdigest()[:16]
+        self.session_file = os.path.join(str(session_dir), f"session_{account_key}.json")
+
+    def load(self):
+        """Read the stored session from disk
+
+        Returns:
+            dict: Stored session data, or None if missing, unreadable or expired
+        """
+        if not os.path.exists(self.session_file):
+            return None
+
+        try:
+            with open(self.session_file, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read stored session, ignoring it: {e}")
+            return None
+
+        if not self.is_fresh(data):
+            logger.info("Stored LinkedIn session is stale, a full login is required")
+            return None
+
+        return data
+
+    def is_fresh(self, data):
+        """Cheap offline check that a stored session is still worth trying"""
+        saved_at = data.get("saved_at", 0)
+        if time.time() - saved_at > self.max_age_seconds:
+            return False
+
+        auth_cookie = next((c for c in data.get("cookies", []) if c.get("name") == AUTH_COOKIE), None)
+        if not auth_cookie:
+            return False
+
+        expiry = auth_cookie.get("expiry")
+        if expiry is not None and expiry <= time.time():
+            return False
+
+        return True
+
+    def save(self, driver):
+        """Save cookies and local storage from the current browser session
+
+        Args:
+            driver: Selenium WebDriver with an authenticated LinkedIn page loaded
+
+        Returns:
+            bool: True if the session was written to disk
+        """
+        try:
+            data = {
+                "saved_at": time.time(),
+                "cookies": driver.get_cookies(),
+                "local_storage": driver.execute_script(
+                    "var items = {};"
+                    "for (var i = 0; i < window.localStorage.length; i++) {"
+                    "  var key = window.localStorage.key(i);"
+                    "  items[key] = window.localStorage.getItem(key);"
+                    "}"
+                    "return items;"
+                ) or {},
+            }
+
+            os.makedirs(str(self.session_dir), exist_ok=True)
+            # The file holds live authentication cookies, so keep it private
+            fd = os.open(self.session_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+
+            logger.info("Saved LinkedIn session for reuse")
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to save LinkedIn session: {e}")
+            return False
+
+    def restore(self, driver):
+        """Load the stored session into the browser
+
+        Args:
+            driver: Selenium WebDriver to restore the session into
+
+        Returns:
+            bool: True if a stored session was applied to the browser
+        """
+        data = self.load()
+        if not data:
+            return False
+
+        try:
+            # Cookies and local storage are scoped to the loaded origin
+            driver.get(LINKEDIN_ORIGIN_URL)
+
+            for cookie in data.get("cookies", []):
+                # Selenium rejects some fields Chrome hands back from get_cookies()
+                cookie = {k: v for k, v in cookie.items() if k != "sameSite" or v in ("Strict", "Lax", "None")}
+                try:
+                    driver.add_cookie(cookie)
+                except Exception as e:
+                    logger.debug(f"Skipping cookie {cookie.get('name')}: {e}")
+
+            local_storage = data.get("local_storage") or {}
+            if local_storage:
+                driver.execute_script(
+                    "var items = arguments[0];"
+                    "for (var key in items) { window.localStorage.setItem(key, items[key]); }",
+                    local_storage,
+                )
+
+            logger.info("Restored stored LinkedIn session")
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to restore LinkedIn session: {e}")
+            return False
+
+    def discard(self, driver):
+        """Delete the stored session and log the browser out of it
+
+        Args:
+            driver: Selenium WebDriver on a LinkedIn page holding the rejected session
+        """
+        self.clear()
+        try:
+            driver.delete_all_cookies()
+            # Restored local storage would otherwise leak into the next login
+            driver.execute_script("window.localStorage.clear();")
+        except Exception as e:
+            logger.warning(f"Failed to reset the LinkedIn session in the browser: {e}")
+
+    def clear(self):
+        """Delete the stored session"""
+        try:
+            os.remove(self.session_file)
+            logger.info("Cleared stored LinkedIn session")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to clear stored LinkedIn session: {e}")
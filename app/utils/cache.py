@@ -0,0 +1,177 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from app.utils.logger import logger
+from app.utils.config import (
+    CACHE_DIR,
+    SUGGESTION_CACHE_ENABLED,
+    SUGGESTION_CACHE_TTL_HOURS,
+    SUGGESTION_CACHE_MEMORY_SIZE,
+    SUGGESTION_CACHE_DISK_SIZE,
+)
+
+
+def make_cache_key(**parts):
+    """Hash the given parts into a stable content-addressed key"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SuggestionCache:
+    """Two-tier cache for generated response suggestions
+
+    Entries are keyed by a hash of everything that shapes the LLM output (see
+    make_cache_key), so an unchanged conversation never pays for a second
+    completion. Lookups hit an in-memory LRU first and then an SQLite file that
+    survives restarts. Both tiers honour the TTL; the disk tier is trimmed to
+    disk_size entries, least recently used first.
+    """
+
+    def __init__(self, path=None, ttl_hours=SUGGESTION_CACHE_TTL_HOURS,
+                 memory_size=SUGGESTION_CACHE_MEMORY_SIZE, disk_size=SUGGESTION_CACHE_DISK_SIZE):
+        self.path = str(path or os.path.join(str(CACHE_DIR), "suggestions.sqlite3"))
+        self.ttl = ttl_hours * 3600
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        try:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS suggestions ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_suggestions_accessed ON suggestions (accessed_at)")
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Suggestion cache disk tier disabled, could not open {self.path}: {e}")
+            self._db = None
+
+    def _expired(self, created_at, now):
+        return self.ttl > 0 and now - created_at > self.ttl
+
+    def get(self, key):
+        """Return the cached suggestion for a key, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT value, created_at FROM suggestions WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row and not self._expired(row[1], now):
+                        self._db.execute("UPDATE suggestions SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        self._remember(key, row[0], row[1])
+                        self.stats["disk_hits"] += 1
+                        return row[0]
+                    if row:
+                        self._db.execute("DELETE FROM suggestions WHERE key = ?", (key,))
+                        self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Suggestion cache read failed: {e}")
+
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, key, value):
+        """Store a suggestion in both tiers"""
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            self.stats["stores"] += 1
+
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO suggestions (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now),
+                )
+                self._evict_disk(now)
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Suggestion cache write failed: {e}")
+
+    def _remember(self, key, value, created_at):
+        """Insert into the in-memory LRU, dropping the oldest entry when full"""
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _evict_disk(self, now):
+        """Drop expired rows and trim the disk tier to disk_size entries"""
+        if self.ttl > 0:
+            cursor = self._db.execute("DELETE FROM suggestions WHERE created_at < ?", (now - self.ttl,))
+            self.stats["evictions"] += max(cursor.rowcount, 0)
+
+        count = self._db.execute("SELECT COUNT(*) FROM suggestions").fetchone()[0]
+        if count > self.disk_size:
+            cursor = self._db.execute(
+                "DELETE FROM suggestions WHERE key IN "
+                "(SELECT key FROM suggestions ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.disk_size,),
+            )
+            self.stats["evictions"] += max(cursor.rowcount, 0)
+
+    def clear(self):
+        """Remove every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM suggestions")
+                self._db.commit()
+
+    def close(self):
+        """Close the disk tier"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def get_stats(self):
+        """Hit/miss counters plus the current hit rate"""
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+_suggestion_cache = None
+_suggestion_cache_lock = threading.Lock()
+
+
+def get_suggestion_cache():
+    """Return the process-wide suggestion cache, or None when caching is disabled"""
+    global _suggestion_cache
+
+    if not SUGGESTION_CACHE_ENABLED:
+        return None
+
+    with _suggestion_cache_lock:
+        if _suggestion_cache is None:
+            _suggestion_cache = SuggestionCache()
+        return _suggestion_cache
@@ -1,6 +1,5 @@
 import os
 from pathlib import Path
-from datetime import datetime
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -12,14 +11,133 @@ LINKEDIN_PASSWORD = os.getenv("LINKEDIN_PASSWORD")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 HEADLESS = os.getenv("HEADLESS", "false").lower() == "true"
 
+# Inbox extraction - how many conversations to analyze, and how much of each thread to read
+# (THREAD_DEPTH=0 keeps the snippet shown in the conversation list only)
+CONVERSATION_LIMIT = int(os.getenv("CONVERSATION_LIMIT", "5"))
+THREAD_DEPTH = int(os.getenv("THREAD_DEPTH", "0"))
+THREAD_MAX_AGE_DAYS = int(os.getenv("THREAD_MAX_AGE_DAYS", "0"))
+
+# Response suggestion generation
+SUGGESTION_MODEL = os.getenv("SUGGESTION_MODEL", "gpt-4o-mini")
+SUGGESTION_TEMPERATURE = float(os.getenv("SUGGESTION_TEMPERATURE", "0.7"))
+# Maximum number of suggestion requests in flight at the same time
+SUGGESTION_CONCURRENCY = int(os.getenv("SUGGESTION_CONCURRENCY", "4"))
+# Conversations answered by one LLM request, 1 sends a request per conversation
+SUGGESTION_BATCH_SIZE = int(os.getenv("SUGGESTION_BATCH_SIZE", "1"))
+
+# Token budget for the conversation history in each suggestion prompt, 0 for no limit.
+# The newest messages are kept verbatim, older ones are folded into a cached rolling
+# summary of at most CONTEXT_SUMMARY_TOKENS
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+CONTEXT_SUMMARY_TOKENS = int(os.getenv("CONTEXT_SUMMARY_TOKENS", "300"))
+
+# Suggestion cache - reuse suggestions for conversations that have not changed
+SUGGESTION_CACHE_ENABLED = os.getenv("SUGGESTION_CACHE_ENABLED", "true").lower() == "true"
+SUGGESTION_CACHE_TTL_HOURS = float(os.getenv("SUGGESTION_CACHE_TTL_HOURS", "72"))
+SUGGESTION_CACHE_MEMORY_SIZE = int(os.getenv("SUGGESTION_CACHE_MEMORY_SIZE", "256"))
+SUGGESTION_CACHE_DISK_SIZE = int(os.getenv("SUGGESTION_CACHE_DISK_SIZE", "10000"))
+
+# Read the conversation list with one script inside the page instead of transferring
+# and parsing the full page source (which stays as the fallback)
+JS_EXTRACTION = os.getenv("JS_EXTRACTION", "true").lower() == "true"
+
+# Incremental sync - only analyze conversations that are new or changed since the last run
+INCREMENTAL_SYNC = os.getenv("INCREMENTAL_SYNC", "false").lower() == "true"
+
+# Analysis history - every analyzed conversation is also recorded in DATA_DIR/analyses.sqlite3,
+# searchable with `python -m app.tools.analysis_store`
+ANALYSIS_HISTORY = os.getenv("ANALYSIS_HISTORY", "true").lower() == "true"
+
+# Lean browser - only text is read, so images, video, audio, web fonts and trackers are not
+# loaded. Off by default: with a visible browser a login challenge may need the images
+LEAN_BROWSER = os.getenv("LEAN_BROWSER", "false").lower() == "true"
+# URL patterns blocked in lean mode (DevTools Network.setBlockedURLs, * is a wildcard),
+# LEAN_BLOCKED_URLS adds comma separated patterns to them
+LEAN_BLOCKED_URL_PATTERNS = [
+    # Video, audio and fonts
+    "*.mp4*", "*.webm*", "*.m3u8*", "*.m4s*", "*.mp3*", "*dms.licdn.com/playlist*",
+    "*.woff*", "*.ttf*", "*.otf*",
+    # Trackers and ads
+    "*px.ads.linkedin.com*", "*snap.licdn.com/li.lms-analytics*", "*linkedin.com/li/track*",
+    "*doubleclick.net*", "*google-analytics.com*", "*googletagmanager.com*", "*googlesyndication.com*",
+    "*bat.bing.com*", "*connect.facebook.net*", "*analytics.twitter.com*", "*ads-twitter.com*",
+] + [pattern.strip() for pattern in os.getenv("LEAN_BLOCKED_URLS", "").split(",") if pattern.strip()]
+# "eager" returns from navigation once the DOM is ready instead of waiting for every resource
+PAGE_LOAD_STRATEGY = os.getenv("PAGE_LOAD_STRATEGY", "eager" if LEAN_BROWSER else "normal")
+
+# Upper bound (seconds) for event-driven readiness waits in the browser
+WAIT_TIMEOUT = float(os.getenv("WAIT_TIMEOUT", "15"))
+# Quiet period (seconds) without new network requests before a page counts as idle
+NETWORK_IDLE_TIME = float(os.getenv("NETWORK_IDLE_TIME", "0.5"))
+# Upper bound (seconds) for the network idle wait, shorter than WAIT_TIMEOUT since the page is usable by then
+NETWORK_IDLE_TIMEOUT = float(os.getenv("NETWORK_IDLE_TIMEOUT", "3"))
+# Seconds to wait for a lazily loaded list to grow after scrolling before assuming it is exhausted
+SCROLL_LOAD_TIMEOUT = float(os.getenv("SCROLL_LOAD_TIMEOUT", "3"))
+# Upper bound (seconds) for the outcome of a login to show up (feed, challenge or error)
+LOGIN_TIMEOUT = float(os.getenv("LOGIN_TIMEOUT", "20"))
+
+# Session reuse - persist cookies/local storage after a good login so the next
+# run can skip the credential form unless the session has gone stale
+REUSE_SESSION = os.getenv("REUSE_SESSION", "true").lower() == "true"
+SESSION_MAX_AGE_HOURS = float(os.getenv("SESSION_MAX_AGE_HOURS", "168"))
+
+# Warm browser pool - keep started, logged-in browsers around between analysis runs
+# (0 disables the pool and starts a fresh browser for every run)
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "0"))
+BROWSER_POOL_MAX_AGE = float(os.getenv("BROWSER_POOL_MAX_AGE", "1800"))  # seconds
+BROWSER_POOL_MAX_USES = int(os.getenv("BROWSER_POOL_MAX_USES", "50"))
+BROWSER_POOL_CHECKOUT_TIMEOUT = float(os.getenv("BROWSER_POOL_CHECKOUT_TIMEOUT", "120"))  # seconds
+
+# Browser watchdog - the memory of Chrome's process tree is sampled between units of work
+# (pool checkouts, watch polls); a browser above BROWSER_MAX_RSS_MB or older than
+# BROWSER_MAX_AGE is closed, started again and logged in from the saved session (0 disables a limit)
+BROWSER_MAX_RSS_MB = float(os.getenv("BROWSER_MAX_RSS_MB", "1536"))
+BROWSER_MAX_AGE = float(os.getenv("BROWSER_MAX_AGE", "14400"))  # seconds
+
+# Watch mode - keep one logged-in browser open and poll the inbox. The interval drops to
+# WATCH_MIN_INTERVAL after new messages and grows by WATCH_BACKOFF_FACTOR per idle or
+# failed poll up to WATCH_MAX_INTERVAL, with +/- WATCH_JITTER of random spread
+WATCH_MIN_INTERVAL = float(os.getenv("WATCH_MIN_INTERVAL", "30"))  # seconds
+WATCH_MAX_INTERVAL = float(os.getenv("WATCH_MAX_INTERVAL", "600"))  # seconds
+WATCH_BACKOFF_FACTOR = float(os.getenv("WATCH_BACKOFF_FACTOR", "2"))
+WATCH_JITTER = float(os.getenv("WATCH_JITTER", "0.1"))
+
+# Multi-account runs - every account runs in its own worker process with its own Chrome profile.
+# Workers are started while CPU and memory allow another Chrome instance
+# (MAX_PARALLEL_ACCOUNTS=0 leaves the limit to the available resources)
+MAX_PARALLEL_ACCOUNTS = int(os.getenv("MAX_PARALLEL_ACCOUNTS", "0"))
+BROWSER_CPUS = float(os.getenv("BROWSER_CPUS", "1"))  # CPU cores reserved per Chrome instance
+BROWSER_MEMORY_MB = int(os.getenv("BROWSER_MEMORY_MB", "1024"))  # Memory reserved per Chrome instance
+ACCOUNT_TIMEOUT = float(os.getenv("ACCOUNT_TIMEOUT", "1800"))  # seconds per account run
+
+# Tracing - time every stage and write a Chrome trace-event file to logs/ after each run,
+# only the newest TRACE_KEEP trace files are kept
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+TRACE_MAX_EVENTS = int(os.getenv("TRACE_MAX_EVENTS", "100000"))
+TRACE_KEEP = int(os.getenv("TRACE_KEEP", "50"))
+
+# Log file rotation - the JSON lines log rolls over at LOG_MAX_BYTES or after LOG_ROTATE_HOURS,
+# keeping LOG_BACKUP_COUNT old files; only the newest LOG_CONTENT_KEEP content files are kept
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_ROTATE_HOURS = float(os.getenv("LOG_ROTATE_HOURS", "24"))
+LOG_CONTENT_KEEP = int(os.getenv("LOG_CONTENT_KEEP", "200"))
+
 # Define paths
 BASE_DIR = Path(__file__).resolve().parent.parent.parent  # Go up one more level to reach project root
 LOGS_DIR = BASE_DIR / "logs"
+DRIVERS_DIR = BASE_DIR / ".drivers"
+CACHE_DIR = Path(os.getenv("CACHE_DIR", BASE_DIR / ".cache"))
+DATA_DIR = Path(os.getenv("DATA_DIR", BASE_DIR / ".data"))
+SESSION_DIR = Path(os.getenv("SESSION_DIR", BASE_DIR / ".session"))
+PROFILES_DIR = Path(os.getenv("PROFILES_DIR", BASE_DIR / ".profiles"))
+ACCOUNTS_FILE = Path(os.getenv("ACCOUNTS_FILE", BASE_DIR / "accounts.json"))
+# Nothing is created at import time, the log handlers create their directories on first write
 
-# Create logs directory if it doesn't exist
-LOGS_DIR.mkdir(exist_ok=True)
+# Chrome user data directory, empty for a fresh temporary profile on every start
+BROWSER_PROFILE_DIR = os.getenv("BROWSER_PROFILE_DIR", "")
 
-# Define log file name based on current date and time
+# Define log file name - a single JSON lines file that is rotated instead of one file per run
+# (workers of a multi-account run each get their own file through LOG_FILE_NAME)
 def get_log_file_path():
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return LOGS_DIR / f"linkedin_log_{timestamp}.txt"
+    return LOGS_DIR / os.getenv("LOG_FILE_NAME", "linkedin_log.jsonl")
@@ -1,57 +1,192 @@
+import atexit
+import copy
+import hashlib
+import json
 import logging
-from pathlib import Path
+import os
+import queue
+import time
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+
+from app.utils.config import (
+    LOGS_DIR,
+    LOG_MAX_BYTES,
+    LOG_BACKUP_COUNT,
+    LOG_ROTATE_HOURS,
+    LOG_CONTENT_KEEP,
+    get_log_file_path,
+)
+
+# Attributes every LogRecord has, anything else was passed through extra= and is kept in the JSON record
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the fields passed through extra= included"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            # The content itself is written to its own file, the record only points to it
+            if key not in _RECORD_ATTRIBUTES and key != "content":
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RecordQueueHandler(QueueHandler):
+    """Queues records with the traceback kept apart from the message
+
+    The stock prepare() renders the traceback into the message and drops
+    exc_info, which would leave JsonFormatter without its "exception" field.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        # The traceback has to be rendered before the frames move on, its text is all the handlers need
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class SizeAndTimeRotatingFileHandler(RotatingFileHandler):
+    """Rotates when the file reaches max_bytes or gets older than max_age seconds"""
+
+    def __init__(self, filename, max_bytes, backup_count, max_age):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.max_age = max_age
+        self.opened_at = time.time()
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        self.opened_at = time.time()
+        return super()._open()
+
+    def shouldRollover(self, record):
+        if self.max_age and self.stream is not None and time.time() - self.opened_at >= self.max_age:
+            return True
+        return super().shouldRollover(record)
+
+
+class ContentFileHandler(logging.Handler):
+    """Writes the content attached by log_content() to the file named in the record
+
+    Only the newest `keep` files of each content directory are kept.
+    """
+
+    def __init__(self, keep):
+        super().__init__()
+        self.keep = keep
+
+    def emit(self, record):
+        content = getattr(record, "content", None)
+        path = getattr(record, "content_file", None)
+        if content is None or not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+            self._prune(os.path.dirname(path))
+        except Exception:
+            self.handleError(record)
+
+    def _prune(self, directory):
+        prune_files(directory, "*.txt", self.keep)
+
+
+def prune_files(directory, pattern, keep):
+    """Delete all but the newest `keep` files matching pattern in directory, 0 keeps everything"""
+    if not keep:
+        return
+    files = sorted(Path(directory).glob(pattern), key=lambda p: p.stat().st_mtime)
+    for old in files[:-keep]:
+        old.unlink(missing_ok=True)
 
-from app.utils.config import get_log_file_path
 
 def setup_logger():
-    """Set up and configure the logger"""
-    
+    """Set up and configure the logger
+
+    Records are put on a queue and written by a background thread, so logging
+    never waits for the disk. The log file holds JSON lines and rotates by
+    size and age; the console keeps the human readable format.
+    """
+
     log_file = get_log_file_path()
-    
+
     # Create a logger
     logger = logging.getLogger("entringer-linkedin-agent")
     logger.setLevel(logging.INFO)
-    
+    logger.propagate = False
+
     # Clear any existing handlers to avoid duplication
     if logger.handlers:
         logger.handlers.clear()
-    
-    # Create handlers
-    file_handler = logging.FileHandler(log_file)
+
+    # Create handlers, they all run on the listener thread
+    file_handler = SizeAndTimeRotatingFileHandler(log_file, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_ROTATE_HOURS * 3600)
     console_handler = logging.StreamHandler()
-    
+    content_handler = ContentFileHandler(LOG_CONTENT_KEEP)
+
     # Create formatters
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
-    
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
+    file_handler.setFormatter(JsonFormatter())
+    console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+    # Add the queue handler to the logger
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(RecordQueueHandler(log_queue))
+    listener = QueueListener(log_queue, file_handler, console_handler, content_handler, respect_handler_level=True)
+    listener.start()
+    # Flush what is still queued when the process exits
+    atexit.register(listener.stop)
+
     return logger, log_file
 
 # Initialize logger
 logger, log_file = setup_logger()
 
 def log_content(content, content_type="generic"):
-    """Log content to the log file with appropriate formatting"""
-
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Log to the standard logger (this will go to both console and log file)
-    logger.info(f"--- {content_type.upper()} CONTENT START at {timestamp} ---")
-    logger.info(content)
-    logger.info(f"--- {content_type.upper()} CONTENT END ---")
-        
-    # For message analysis, save to a dedicated file for easier reference
+    """Log a large piece of content
+
+    The content is written once, to its own file, by the logging thread, and
+    the log record only references that file. Analysis results go to
+    logs/message_analysis/, everything else to logs/content/.
+    """
+    now = datetime.now()
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:8]
     if content_type == "linkedin_message_analysis":
-        analysis_file = Path(log_file).parent / "message_analysis" / f"analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-        # Ensure the directory exists
-        analysis_file.parent.mkdir(exist_ok=True)
-        # Save the content
-        with open(analysis_file, 'w') as f:
-            f.write(f"LinkedIn Message Analysis - {timestamp}\n\n")
-            f.write(content)
-            f.write("\n\nEnd of Analysis")
+        content_file = Path(LOGS_DIR) / "message_analysis" / f"analysis_{now.strftime('%Y%m%d_%H%M%S')}_{digest}.txt"
+        content = (
+            f"LinkedIn Message Analysis - {now.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+            f"{content}\n\nEnd of Analysis"
+        )
+    else:
+        content_file = Path(LOGS_DIR) / "content" / f"{content_type}_{now.strftime('%Y%m%d_%H%M%S')}_{digest}.txt"
+
+    logger.info(
+        f"{content_type} content saved to {content_file}",
+        extra={
+            "content_type": content_type,
+            "content_file": str(content_file),
+            "content_bytes": len(content.encode("utf-8")),
+            "content": content,
+        },
+    )
+    return str(content_file)
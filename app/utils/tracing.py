@@ -0,0 +1,184 @@
+"""Nested timing spans exported in the Chrome trace-event format
+
+Open a trace file in chrome://tracing or https://ui.perfetto.dev to see where
+the time of a run goes, stage by stage and thread by thread.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from app.utils.logger import logger, prune_files
+from app.utils.config import LOGS_DIR, TRACING_ENABLED, TRACE_MAX_EVENTS, TRACE_KEEP
+
+
+class Span:
+    """A running span, attributes set on it end up in the trace event args"""
+
+    __slots__ = ("name", "attributes", "start")
+
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+        self.start = time.perf_counter()
+
+    def set(self, **attributes):
+        """Add or update attributes, e.g. the selector that matched or a byte count"""
+        self.attributes.update(attributes)
+
+
+class Tracer:
+    """Collects spans from every thread and writes them as one trace file
+
+    Spans on the same thread nest by time, which is all the trace viewers need
+    to draw them as a call tree. At most max_events spans are kept per trace,
+    and the newest keep trace files in the trace directory.
+    """
+
+    def __init__(self, enabled=TRACING_ENABLED, max_events=TRACE_MAX_EVENTS, keep=TRACE_KEEP):
+        self.enabled = enabled
+        self.max_events = max_events
+        self.keep = keep
+        self._events = []
+        # Thread id -> name, taken while the thread runs; pool threads are gone by export time
+        self._thread_names = {}
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Time a block of code
+
+        Example:
+            with tracer.span("browser.navigate", url=url) as span:
+                ...
+                span.set(status="ok")
+        """
+        span = Span(name, attributes)
+        if not self.enabled:
+            yield span
+            return
+
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            self._record(span, time.perf_counter())
+
+    def traced(self, name):
+        """Decorator form of span()"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def counter(self, name, **values):
+        """Record numeric values over time, drawn as a graph above the spans
+
+        Example:
+            tracer.counter("browser.memory", rss_mb=812.5)
+        """
+        if not self.enabled:
+            return
+
+        self._append({
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "C",
+            "ts": round((time.perf_counter() - self._origin) * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": values,
+        })
+
+    def _record(self, span, end):
+        self._append({
+            "name": span.name,
+            "cat": span.name.split(".", 1)[0],
+            "ph": "X",
+            "ts": round((span.start - self._origin) * 1e6, 1),
+            "dur": round((end - span.start) * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": {key: _json_safe(value) for key, value in span.attributes.items()},
+        })
+
+    def _append(self, event):
+        name = threading.current_thread().name
+        with self._lock:
+            self._thread_names[event["tid"]] = name
+            if len(self._events) < self.max_events:
+                self._events.append(event)
+            else:
+                self._dropped += 1
+
+    def summary(self):
+        """Total seconds and count per span name, slowest first"""
+        totals = {}
+        with self._lock:
+            events = list(self._events)
+        for event in events:
+            if event["ph"] != "X":
+                continue
+            total = totals.setdefault(event["name"], {"count": 0, "seconds": 0.0})
+            total["count"] += 1
+            total["seconds"] += event["dur"] / 1e6
+        return dict(sorted(totals.items(), key=lambda item: item[1]["seconds"], reverse=True))
+
+    def export(self, path=None):
+        """Write the collected spans as Chrome trace-event JSON and start a new trace
+
+        Returns:
+            str: Path of the trace file, or None if there was nothing to write
+        """
+        if not self.enabled:
+            return None
+
+        summary = self.summary()
+        with self._lock:
+            events, self._events = self._events, []
+            dropped, self._dropped = self._dropped, 0
+            thread_names, self._thread_names = self._thread_names, {}
+        if not events:
+            return None
+
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": thread_names[tid]}}
+            for tid in {event["tid"] for event in events} if tid in thread_names
+        ]
+
+        path = path or os.path.join(str(LOGS_DIR), f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms",
+                           "otherData": {"dropped_events": dropped}}, f)
+        except OSError as e:
+            logger.error(f"Failed to write trace file {path}: {e}")
+            return None
+        prune_files(os.path.dirname(path), "trace_*.json", self.keep)
+
+        breakdown = ", ".join(f"{name} {total['seconds']:.2f}s x{total['count']}"
+                              for name, total in list(summary.items())[:8])
+        logger.info(f"Trace written to {path} ({breakdown})")
+        return path
+
+
+def _json_safe(value):
+    """Trace args must be JSON, anything else is stored as text"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+# Process-wide tracer
+tracer = Tracer()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Direct pipeline versus CrewAI agent, offline.
+
+Runs the same synthetic inbox through `run_pipeline()` (what `main.py --direct`
+does) and through `LinkedInMessageCrew().crew().kickoff()`. The suggestion
+requests go to the fake LLM of bench_pipeline.py in both cases; the agent of
+the crew path is played by a scripted model that calls the tool once and then
+repeats its output as the final answer, which is what the real agent does.
+Latency, LLM requests and (estimated) tokens are reported for both paths.
+
+Usage:
+    python benchmarks/bench_direct.py [--sizes 10 100] [--llm-latency 0.01] [--agent-latency 1.0]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
+from unittest.mock import patch
+
+# Add the project root directory to Python path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.fakes import FakeLLM, make_messaging_page
+from benchmarks.bench_pipeline import RESULTS_DIR, git_commit, make_linkedin_tool, timed
+
+DEFAULT_SIZES = [10, 100]
+
+
+def make_agent_llm(latency):
+    """Scripted stand-in for the crew agent's model
+
+    Built on first use because the CrewAI base class is only importable once
+    CrewAI is loaded.
+    """
+    from crewai.llms.base_llm import BaseLLM
+    from app.tools.context_builder import estimate_tokens
+
+    class ScriptedAgentLLM(BaseLLM):
+        """Calls analyze_linkedin_messages, then answers with the tool output"""
+
+        def __init__(self):
+            super().__init__(model="scripted-agent")
+            self.requests = 0
+            self.input_tokens = 0
+            self.output_tokens = 0
+            self.lock = threading.Lock()
+
+        def call(self, messages, tools=None, callbacks=None, available_functions=None):
+            if isinstance(messages, str):
+                messages = [{"role": "user", "content": messages}]
+            last = messages[-1]
+            if last["role"] == "assistant" and "Observation:" in last["content"]:
+                observation = last["content"].rsplit("Observation:", 1)[1].strip()
+                answer = f"Thought: I now know the final answer\nFinal Answer: {observation}"
+            else:
+                answer = ("Thought: I need the analysis of the latest messages\n"
+                          "Action: analyze_linkedin_messages\nAction Input: {}")
+
+            with self.lock:
+                self.requests += 1
+                self.input_tokens += sum(estimate_tokens(message["content"]) for message in messages)
+                self.output_tokens += estimate_tokens(answer)
+            time.sleep(latency)
+            return answer
+
+        def supports_function_calling(self):
+            return False
+
+        def get_context_window_size(self):
+            return 128000
+
+    return ScriptedAgentLLM()
+
+
+@contextmanager
+def offline_pipeline(count, llm_latency, concurrency):
+    """Route the pipeline to a synthetic inbox and the fake suggestion LLM"""
+    from app.tools import linkedin_tools
+
+    page = make_messaging_page(count)
+    llm = FakeLLM(latency=llm_latency)
+
+    @contextmanager
+    def fake_session():
+        yield make_linkedin_tool(page, count), None
+
+    # The crew's tool takes no arguments, so the inbox size is bound into the pipeline it runs
+    pipeline = partial(linkedin_tools.run_pipeline, limit=count, max_workers=concurrency)
+    with patch.object(linkedin_tools, "get_suggestion_cache", return_value=None), \
+         patch.object(linkedin_tools, "get_conversation_store", return_value=None), \
+         patch.object(linkedin_tools, "get_analysis_store", return_value=None), \
+         patch.object(linkedin_tools, "get_llm", return_value=llm), \
+         patch.object(linkedin_tools, "linkedin_session", fake_session), \
+         patch.object(linkedin_tools, "log_content"), \
+         patch("app.tools.linkedin.log_content"), \
+         patch.object(linkedin_tools, "run_pipeline", pipeline):
+        yield linkedin_tools
+
+
+def bench_direct(count, llm_latency, concurrency):
+    """Latency and LLM usage of the direct pipeline"""
+    with offline_pipeline(count, llm_latency, concurrency) as linkedin_tools:
+        result, seconds = timed(linkedin_tools.run_pipeline)
+    usage = result["usage"]
+    return {
+        "seconds": seconds,
+        "llm_requests": usage["requests"],
+        "input_tokens": usage["input_tokens"],
+        "output_tokens": usage["output_tokens"],
+        "output_chars": len(result["output"]),
+    }
+
+
+def bench_crew(count, llm_latency, agent_latency, concurrency):
+    """Latency and LLM usage of the CrewAI path, agent requests included"""
+    # CrewAI checks for a key when it builds the agent, no request is ever sent with it.
+    # Telemetry is set up when crewai is first imported and stays off unless configured explicitly.
+    offline_env = {
+        "OPENAI_API_KEY": "sk-offline-benchmark",
+        "OTEL_SDK_DISABLED": os.environ.get("OTEL_SDK_DISABLED", "true"),
+        "CREWAI_DISABLE_TELEMETRY": os.environ.get("CREWAI_DISABLE_TELEMETRY", "true"),
+    }
+    with patch.dict(os.environ, offline_env), \
+         offline_pipeline(count, llm_latency, concurrency) as linkedin_tools:
+        from app.agents.linkedin_agent import LinkedInMessageCrew
+
+        agent_llm = make_agent_llm(agent_latency)
+        before = linkedin_tools.get_llm_usage()
+        start = time.perf_counter()
+        crew = LinkedInMessageCrew().crew()
+        for agent in crew.agents:
+            agent.llm = agent_llm
+        # The crew prints every step, that is not part of what is measured
+        with contextlib.redirect_stdout(io.StringIO()):
+            output = crew.kickoff()
+        seconds = time.perf_counter() - start
+        usage = {key: value - before[key] for key, value in linkedin_tools.get_llm_usage().items()}
+
+    return {
+        "seconds": seconds,
+        "llm_requests": usage["requests"] + agent_llm.requests,
+        "input_tokens": usage["input_tokens"] + agent_llm.input_tokens,
+        "output_tokens": usage["output_tokens"] + agent_llm.output_tokens,
+        "agent_requests": agent_llm.requests,
+        "agent_tokens": agent_llm.input_tokens + agent_llm.output_tokens,
+        "output_chars": len(output.raw),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Inbox sizes to benchmark")
+    parser.add_argument("--llm-latency", type=float, default=0.01, help="Seconds per fake suggestion request")
+    parser.add_argument("--agent-latency", type=float, default=1.0, help="Seconds per fake agent request")
+    parser.add_argument("--concurrency", type=int, default=4, help="Suggestion requests in flight")
+    parser.add_argument("--output", help="Result file, defaults to benchmarks/results/direct_<commit>.json")
+    args = parser.parse_args()
+
+    from app.utils.logger import logger
+    # Console and file logging of every conversation would dominate the timings
+    logger.setLevel(logging.WARNING)
+    for name in ("LiteLLM", "httpx", "crewai"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    # Pay for the imports up front, they are reported separately
+    import langchain.schema  # noqa: F401
+    _, crewai_seconds = timed(__import__, "app.agents.linkedin_agent")
+
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "llm_latency": args.llm_latency,
+        "agent_latency": args.agent_latency,
+        "concurrency": args.concurrency,
+        "crewai_import_seconds": crewai_seconds,
+        "sizes": {},
+    }
+    print(f"CrewAI import (crew path only): {crewai_seconds:.2f}s")
+    for count in args.sizes:
+        direct = bench_direct(count, args.llm_latency, args.concurrency)
+        crew = bench_crew(count, args.llm_latency, args.agent_latency, args.concurrency)
+        results["sizes"][str(count)] = {"direct": direct, "crew": crew}
+
+        print(f"{count} conversations")
+        for name, run in (("direct", direct), ("crew", crew)):
+            print(f"  {name:<7} {run['seconds']:8.3f}s  {run['llm_requests']:5d} LLM requests  "
+                  f"{run['input_tokens']:8d} in / {run['output_tokens']:7d} out tokens")
+        print(f"  crew overhead: {crew['seconds'] - direct['seconds']:+.3f}s, "
+              f"{crew['agent_requests']} agent requests, {crew['agent_tokens']} agent tokens")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"direct_{commit or 'results'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Query latency of the analysis history as it grows.
+Fills a temporary database with synthetic runs and times the lookups the CLI
+offers: by contact, by type, by time range and full-text.
+
+Usage: python benchmarks/bench_history.py [--rows 100000 1000000] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.tools.analysis_store import AnalysisStore
+from app.tools.message_classifier import MESSAGE_CATEGORIES, DEFAULT_TYPE
+from benchmarks.bench_classifier import SAMPLES
+
+MESSAGE_TYPES = [name for name, _ in MESSAGE_CATEGORIES] + [DEFAULT_TYPE]
+RUN_SIZE = 50
+RUN_INTERVAL = 3600  # seconds between synthetic runs
+
+
+def fill(store, rows, contacts=2000, seed=42):
+    """Add rows results in runs of RUN_SIZE, one run per hour up to now
+
+    Returns:
+        float: Seconds spent recording
+    """
+    rng = random.Random(seed)
+    runs = (rows + RUN_SIZE - 1) // RUN_SIZE
+    start_time = time.time() - runs * RUN_INTERVAL
+    elapsed = 0.0
+    for run in range(runs):
+        analyzed = [
+            {
+                "contact": f"Contact {rng.randrange(contacts)}",
+                "message": rng.choice(SAMPLES),
+                "message_count": 1,
+                "message_type": rng.choice(MESSAGE_TYPES),
+                "potential_answer": f"Thanks for reaching out! {rng.choice(SAMPLES)}",
+            }
+            for _ in range(min(RUN_SIZE, rows - run * RUN_SIZE))
+        ]
+        with patch("app.tools.analysis_store.time.time", return_value=start_time + run * RUN_INTERVAL):
+            began = time.perf_counter()
+            store.add(analyzed)
+            elapsed += time.perf_counter() - began
+    return elapsed
+
+
+def queries():
+    """The lookups that are timed, as search() arguments"""
+    week_ago = time.time() - 7 * 86400
+    return {
+        "contact": {"contact": "contact 42"},
+        "contact_last_week": {"contact": "contact 42", "since": week_ago},
+        "type_last_week": {"message_type": "job_opportunity", "since": week_ago},
+        "time_range": {"since": week_ago - 86400, "until": week_ago},
+        "full_text": {"text": "demo discount"},
+        "full_text_contact": {"text": "recruiter", "contact": "contact 42"},
+    }
+
+
+def best_of(repeat, func, **kwargs):
+    """Best wall-clock time of several calls, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(**kwargs)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(rows, repeat=20):
+    """Fill a fresh database with rows results and time every query"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = AnalysisStore(os.path.join(tmp, "analyses.sqlite3"), account="bench@example.com")
+        try:
+            results = {"rows": rows, "fill_seconds": fill(store, rows)}
+            for name, kwargs in queries().items():
+                results[f"{name}_ms"] = best_of(repeat, store.search, **kwargs) * 1000
+        finally:
+            store.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000], help="History sizes to benchmark")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per query, the best is kept")
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        results = run(rows, args.repeat)
+        print(f"{rows} results (recorded in {results['fill_seconds']:.1f}s)")
+        for name in queries():
+            print(f"  {name:<18} {results[f'{name}_ms']:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
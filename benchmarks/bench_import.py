@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Startup import benchmark.
+
+Runs an entry point under `python -X importtime` in a fresh interpreter, reports
+the slowest imports and fails when a heavy dependency is loaded before the stage
+that needs it, or when startup goes over a time budget.
+
+Usage:
+    python benchmarks/bench_import.py [--budget-ms 500] [--top 15]
+    python benchmarks/bench_import.py --code "import app.tools.linkedin_tools" --allow selenium
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+# Add the project root directory to Python path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Loaded by the crew, browser and parsing stages, never at startup
+HEAVY_MODULES = ["crewai", "langchain", "langchain_openai", "openai", "selenium", "webdriver_manager", "bs4", "lxml"]
+
+# Everything `python main.py --help` and the environment check import
+DEFAULT_CODE = "import main"
+
+
+def measure(code):
+    """Run code under -X importtime
+
+    Returns:
+        tuple: (total_microseconds, {module: cumulative_microseconds}) for top-level imports
+               of the code, interpreter startup (site) excluded
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+    )
+    return parse_importtime(completed.stderr)
+
+
+def parse_importtime(output):
+    """Parse the stderr of -X importtime into the cumulative time of every imported module"""
+    modules = {}
+    total = 0
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not cumulative.strip().isdigit():
+            # Header line
+            continue
+        depth = len(name) - len(name.lstrip(" "))
+        name = name.strip()
+        modules[name] = int(cumulative)
+        # Top-level imports carry the time of everything below them
+        if depth == 1 and name not in ("site", "encodings", "usercustomize", "sitecustomize"):
+            total += int(cumulative)
+    return total, modules
+
+
+def heavy_imports(modules, allowed=()):
+    """Heavy packages present in the imported modules, ignoring the allowed ones"""
+    loaded = {name.split(".", 1)[0] for name in modules}
+    return [name for name in HEAVY_MODULES if name in loaded and name not in allowed]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--code", default=DEFAULT_CODE, help="Python code whose imports are measured")
+    parser.add_argument("--budget-ms", type=float, default=500, help="Fail when the imports take longer")
+    parser.add_argument("--allow", nargs="*", default=[], help="Heavy packages this code may import")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest modules to list")
+    parser.add_argument("--runs", type=int, default=3, help="Best of this many runs is reported")
+    args = parser.parse_args()
+
+    # The fastest run is the least disturbed by the rest of the machine
+    total, modules = min((measure(args.code) for _ in range(args.runs)), key=lambda result: result[0])
+
+    print(f"{args.code}: {total / 1000:.1f} ms of imports")
+    for name, micros in sorted(modules.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {name:<48} {micros / 1000:8.1f} ms")
+
+    failures = []
+    heavy = heavy_imports(modules, args.allow)
+    if heavy:
+        failures.append(f"heavy packages imported at startup: {', '.join(heavy)}")
+    if total / 1000 > args.budget_ms:
+        failures.append(f"imports took {total / 1000:.1f} ms, budget is {args.budget_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of the scrape-and-analyze pipeline.
+
+Serves synthetic messaging pages through a fake browser and answers with a fake
+LLM, so no network, browser or API key is needed. Times each stage at several
+inbox sizes and writes the results as JSON so runs can be compared between commits.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--sizes 10 100 1000 10000] [--llm-latency 0.01]
+    python benchmarks/bench_pipeline.py --compare benchmarks/results/<before>.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from unittest.mock import patch
+
+# Add the project root directory to Python path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.fakes import FakeBrowserTool, FakeLLM, make_messaging_page
+
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "results")
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+
+
+def timed(func, *args, **kwargs):
+    """Run a function once and return (result, seconds)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def make_linkedin_tool(page, count):
+    """A logged-in LinkedInTool driving the fake browser"""
+    from app.tools.linkedin import LinkedInTool
+
+    tool = LinkedInTool()
+    tool.browser = FakeBrowserTool(page, count)
+    tool.logged_in = True
+    return tool
+
+
+def bench_size(count, llm_latency, concurrency):
+    """Time every stage for an inbox of the given size"""
+    from app.tools import linkedin_tools
+    from app.tools.message_classifier import label_many
+
+    page, page_seconds = timed(make_messaging_page, count)
+    tool = make_linkedin_tool(page, count)
+    llm = FakeLLM(latency=llm_latency)
+    stages = {"page_bytes": len(page), "page_build_seconds": page_seconds}
+
+    @contextmanager
+    def fake_session():
+        yield make_linkedin_tool(page, count), None
+
+    # No cache, store or pool: every run measures the full amount of work.
+    # Content files are not written, the benchmark leaves nothing behind in logs/
+    with patch.object(linkedin_tools, "get_suggestion_cache", return_value=None), \
+         patch.object(linkedin_tools, "get_conversation_store", return_value=None), \
+         patch.object(linkedin_tools, "get_analysis_store", return_value=None), \
+         patch.object(linkedin_tools, "get_llm", return_value=llm), \
+         patch.object(linkedin_tools, "linkedin_session", fake_session), \
+         patch.object(linkedin_tools, "log_content"), \
+         patch("app.tools.linkedin.log_content"):
+        conversations, stages["extract_messages_seconds"] = timed(tool.extract_messages, limit=count)
+        stages["conversations"] = len(conversations)
+
+        snippets = [conversation["messages"][0] for conversation in conversations]
+        _, stages["classify_seconds"] = timed(label_many, snippets)
+
+        _, stages["generate_suggestions_seconds"] = timed(
+            linkedin_tools.generate_suggestions, conversations, max_workers=concurrency
+        )
+
+        _, stages["analyze_linkedin_messages_seconds"] = timed(
+            linkedin_tools.run_pipeline, limit=count, max_workers=concurrency
+        )
+        stages["llm_calls"] = llm.calls
+
+    return stages
+
+
+def git_commit():
+    """Short hash of the checked out commit, or None outside a git checkout"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(before, after):
+    """Print the relative change of every timed stage between two result files"""
+    print(f"Comparing {before.get('commit')} -> {after.get('commit')}")
+    for size, stages in after["sizes"].items():
+        previous = before["sizes"].get(size)
+        if not previous:
+            continue
+        print(f"  {size} conversations")
+        for stage, seconds in stages.items():
+            if not stage.endswith("_seconds") or not previous.get(stage):
+                continue
+            change = (seconds - previous[stage]) / previous[stage] * 100
+            print(f"    {stage[:-8]:<28} {previous[stage]:9.4f}s -> {seconds:9.4f}s ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Inbox sizes to benchmark")
+    parser.add_argument("--llm-latency", type=float, default=0.01, help="Seconds per fake LLM request")
+    parser.add_argument("--concurrency", type=int, default=4, help="Suggestion requests in flight")
+    parser.add_argument("--output", help="Result file, defaults to benchmarks/results/<commit>.json")
+    parser.add_argument("--compare", help="Earlier result file to compare this run against")
+    parser.add_argument("--verbose", action="store_true", help="Keep the application's info logging")
+    args = parser.parse_args()
+
+    from app.utils.logger import logger
+    if not args.verbose:
+        # Console and file logging of every conversation would dominate the timings
+        logger.setLevel(logging.WARNING)
+
+    # Import the LLM message types up front so the first size does not pay for it
+    import langchain.schema  # noqa: F401
+
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "llm_latency": args.llm_latency,
+        "concurrency": args.concurrency,
+        "sizes": {},
+    }
+    for count in args.sizes:
+        stages = bench_size(count, args.llm_latency, args.concurrency)
+        results["sizes"][str(count)] = stages
+        print(f"{count} conversations ({stages['page_bytes']} bytes of HTML)")
+        for stage, value in stages.items():
+            if stage.endswith("_seconds") and stage != "page_build_seconds":
+                print(f"  {stage[:-8]:<28} {value:9.4f}s")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'results'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
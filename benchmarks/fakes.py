@@ -0,0 +1,129 @@
+"""
+Offline stand-ins for LinkedIn, the browser and the LLM used by the benchmarks.
+"""
+
+import random
+import threading
+import time
+from html import escape
+from types import SimpleNamespace
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Patel", "Müller", "Silva", "Okafor", "Kowalski", "Tanaka", "Dubois"]
+SNIPPETS = [
+    "Hi! I came across your profile and would love to connect.",
+    "Nice to meet you at the meetup last week, let's keep in touch.",
+    "We are hiring a senior backend engineer, would you be open to a new role?",
+    "I'm a recruiter at Acme and have an exciting opportunity for you.",
+    "Our product helps teams like yours ship faster, can I book a demo?",
+    "Limited time discount on our consulting services, start a free trial today.",
+    "Thanks for the update, that meeting was really productive.",
+    "Happy birthday! Hope you have a great day.",
+]
+
+
+def make_conversation_card(index, rng):
+    """HTML of one conversation card as rendered in the LinkedIn messaging list"""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    snippet = rng.choice(SNIPPETS)
+    return (
+        '<li class="msg-conversation-listitem msg-conversation-card ember-view">'
+        '<div class="msg-conversation-card__content--selectable">'
+        f'<a class="msg-conversation-listitem__link" href="/messaging/thread/2-{index:08d}/">'
+        '<img class="presence-entity__image" src="https://media.licdn.com/dms/image/photo.jpg" alt="">'
+        '<div class="msg-conversation-card__row">'
+        f'<h3 class="msg-conversation-card__participant-names">{escape(name)}</h3>'
+        f'<time class="msg-conversation-card__time-stamp">{rng.randint(1, 12)}:{rng.randint(0, 59):02d} PM</time>'
+        '</div>'
+        '<div class="msg-conversation-card__message-snippet">'
+        f'<span class="msg-conversation-card__message-snippet-body">{escape(snippet)}</span>'
+        '</div>'
+        '</a></div></li>'
+    )
+
+
+def make_messaging_page(count, seed=42):
+    """A synthetic LinkedIn messaging page with the given number of conversations
+
+    Besides the conversation list the page carries the usual navigation, scripts
+    and styles so parsing costs are realistic.
+    """
+    rng = random.Random(seed)
+    chrome = "".join(
+        f'<li class="global-nav__primary-item"><a href="/nav/{i}"><span>Item {i}</span></a></li>'
+        for i in range(30)
+    )
+    script = "<script>" + "var config = {};" * 2000 + "</script>"
+    style = "<style>" + ".msg-x { color: red; }" * 1000 + "</style>"
+    cards = "".join(make_conversation_card(i, rng) for i in range(count))
+    return (
+        f"<!DOCTYPE html><html><head><title>Messaging | LinkedIn</title>{style}</head><body>"
+        f'<header><nav><ul class="global-nav__primary-items">{chrome}</ul></nav></header>'
+        f'<main><ul class="msg-conversations-container__conversations-list">{cards}</ul></main>'
+        f"{script}</body></html>"
+    )
+
+
+class FakeBrowserTool:
+    """Serves a fixed messaging page through the BrowserTool interface
+
+    Everything happens in memory. In-page scripts cannot run here, so the
+    conversation list is parsed from the page source like the fallback path.
+    """
+
+    def __init__(self, page_source, conversation_count):
+        self.page_source = page_source
+        self.conversation_count = conversation_count
+        self.driver = SimpleNamespace(current_url="https://www.linkedin.com/messaging/")
+
+    def start_browser(self):
+        return True
+
+    def navigate_to(self, url):
+        self.driver.current_url = url
+        return True
+
+    def wait_for_any_element(self, selectors, by=None, timeout=None):
+        return selectors[0], None
+
+    def wait_for_network_idle(self, idle_time=None, timeout=None):
+        return True
+
+    def first_present(self, selectors):
+        return selectors[0], None
+
+    def count_elements(self, selector):
+        return self.conversation_count
+
+    def scroll_for_more(self, item_selector, direction="down", timeout=None):
+        return None
+
+    def execute_script(self, script, *args):
+        return None
+
+    def get_page_source(self):
+        return self.page_source
+
+    def get_all_text(self, selector, by=None):
+        return []
+
+    def is_alive(self):
+        return True
+
+    def close(self):
+        return True
+
+
+class FakeLLM:
+    """Chat model stand-in with a fixed latency per request"""
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def invoke(self, messages):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return SimpleNamespace(content="Thanks for reaching out, happy to talk more next week.")
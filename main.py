@@ -3,35 +3,123 @@
 # Note for GitHub Copilot: This project follows specific conventions.
 # See .github/copilot-instructions.md for branch naming and PR formats.
 
+import argparse
 import os
 import sys
-import time
 
 # Add the project root directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.utils.logger import logger
-from app.utils.config import OPENAI_API_KEY
-from app.agents.linkedin_agent import LinkedInMessageCrew
+from app.utils.tracing import tracer
 
-def main():
+# CrewAI, Selenium and BeautifulSoup are imported by the stage that uses them, so
+# --help and a missing .env answer immediately instead of after seconds of imports
+
+def parse_args(argv=None):
+    """Parse the command line arguments"""
+    parser = argparse.ArgumentParser(description="Analyze LinkedIn messages and suggest responses.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--direct", action="store_true",
+                      help="Run scrape, classify and generate directly instead of through the CrewAI agent")
+    mode.add_argument("--watch", action="store_true",
+                      help="Keep the browser logged in and analyze new messages as they arrive, until stopped")
+    mode.add_argument("--accounts", nargs="?", const="", metavar="FILE",
+                      help="Analyze every account listed in a JSON file (default: ACCOUNTS_FILE), "
+                           "each in its own worker process")
+    parser.add_argument("--max-parallel", type=int, metavar="N",
+                        help="Upper bound for accounts analyzed at the same time (default: MAX_PARALLEL_ACCOUNTS)")
+    args = parser.parse_args(argv)
+    if args.max_parallel is not None and args.accounts is None:
+        parser.error("--max-parallel only applies to --accounts")
+    return args
+
+def run_multi_account(accounts_file, max_parallel=None):
+    """Analyze several accounts in parallel worker processes and log the combined report"""
+    from app.utils.logger import log_content
+    from app.tools.account_runner import ResourceScheduler, format_report, load_accounts, run_accounts
+    from app.utils.config import ACCOUNTS_FILE, MAX_PARALLEL_ACCOUNTS
+
+    try:
+        accounts = load_accounts(accounts_file or ACCOUNTS_FILE)
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not read the accounts file: {e}")
+        sys.exit(1)
+
+    scheduler = ResourceScheduler(max_parallel=MAX_PARALLEL_ACCOUNTS if max_parallel is None else max_parallel)
+    logger.info(f"Starting LinkedIn message analysis for {len(accounts)} accounts "
+                f"(at most {scheduler.limit() or 'unlimited'} at a time)...")
+
+    results = run_accounts(accounts, scheduler=scheduler)
+    report = format_report(results)
+    log_content(report, "multi_account_report")
+    logger.info(report.splitlines()[0])
+    return results
+
+def run_direct():
+    """Run the analysis pipeline without the agent loop and print its report"""
+    from app.tools.linkedin_tools import AnalysisError, run_pipeline
+
+    try:
+        with tracer.span("pipeline.run"):
+            result = run_pipeline()
+        print(result["output"])
+        logger.info(f"\033[92mLinkedIn message analysis completed successfully.\033[0m LLM usage: {result['usage']}")
+        return result
+    except AnalysisError as e:
+        logger.error(str(e))
+    except KeyboardInterrupt:
+        logger.info("LinkedIn message analysis interrupted by user.")
+    except Exception as e:
+        logger.error(f"Error during LinkedIn message analysis: {e}")
+    finally:
+        tracer.export()
+    
+    return None
+
+def main(argv=None):
     """Main function to run the LinkedIn message analysis"""
+    args = parse_args(argv)
     
     # Check if all variable from .env file are set, for each one of them, log a warning if not, log the error and exit
     required_env_vars = ["OPENAI_API_KEY", "LINKEDIN_EMAIL", "LINKEDIN_PASSWORD"]
+    if args.accounts is not None:
+        # Credentials come from the accounts file
+        required_env_vars = ["OPENAI_API_KEY"]
     for var in required_env_vars:
         if not os.getenv(var):
             logger.error(f"Environment variable {var} is not set.")
             sys.exit(1)
 
+    if args.watch:
+        from app.tools.inbox_watcher import InboxWatcher
+        try:
+            return InboxWatcher().run()
+        except KeyboardInterrupt:
+            logger.info("LinkedIn inbox watch interrupted by user.")
+            return None
+
+    if args.accounts is not None:
+        try:
+            return run_multi_account(args.accounts, args.max_parallel)
+        except KeyboardInterrupt:
+            logger.info("LinkedIn message analysis interrupted by user.")
+            return None
+
     logger.info("Starting LinkedIn message analysis...")
 
+    if args.direct:
+        return run_direct()
+
     try:
         # Create and run the LinkedIn message crew
-        crew = LinkedInMessageCrew().crew()
+        with tracer.span("crew.create"):
+            from app.agents.linkedin_agent import LinkedInMessageCrew
+            crew = LinkedInMessageCrew().crew()
         
         # Run the crew
-        result = crew.kickoff()
+        with tracer.span("crew.kickoff"):
+            result = crew.kickoff()
         
         logger.info("\033[92mLinkedIn message analysis completed successfully.\033[0m")
         
@@ -41,6 +129,9 @@ def main():
         logger.info("LinkedIn message analysis interrupted by user.")
     except Exception as e:
         logger.error(f"Error during LinkedIn message analysis: {e}")
+    finally:
+        # Breakdown of where the time of this run went
+        tracer.export()
     
     return None
 
@@ -0,0 +1,187 @@
+"""
+Tests for the multi-account runner.
+Workers run a short Python snippet instead of the analysis, so no browser is started.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+
+def make_worker_class(script):
+    """AccountWorker whose process runs the given script, RESULT holds the result path"""
+    from app.tools.account_runner import AccountWorker
+
+    class ScriptWorker(AccountWorker):
+        def command(self):
+            return [sys.executable, "-c", f"RESULT = {self.result_path!r}\n{script}"]
+
+    return ScriptWorker
+
+
+# Reports the account it was given through the environment, and when it ran
+REPORTING_SCRIPT = """
+import json, os, time
+start = time.time()
+time.sleep(0.3)
+with open(RESULT, "w") as f:
+    json.dump({"status": "ok", "output": os.environ["LINKEDIN_EMAIL"],
+               "profile": os.environ["BROWSER_PROFILE_DIR"], "log": os.environ["LOG_FILE_NAME"],
+               "start": start, "end": time.time()}, f)
+"""
+
+
+class TestLoadAccounts(unittest.TestCase):
+    """Test reading the accounts file"""
+
+    def write(self, data):
+        handle, path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(handle, "w") as f:
+            json.dump(data, f)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_password_from_environment(self):
+        """password_env names the variable holding the password"""
+        from app.tools.account_runner import load_accounts
+        path = self.write([
+            {"email": "a@example.com", "password": "secret"},
+            {"email": "b@example.com", "password_env": "TEST_ACCOUNT_B_PASSWORD", "name": "Sales"},
+        ])
+        with patch.dict(os.environ, {"TEST_ACCOUNT_B_PASSWORD": "from-env"}):
+            accounts = load_accounts(path)
+        self.assertEqual(accounts[0], {"name": "a@example.com", "email": "a@example.com", "password": "secret"})
+        self.assertEqual(accounts[1]["name"], "Sales")
+        self.assertEqual(accounts[1]["password"], "from-env")
+
+    def test_missing_password(self):
+        """An account without a password is rejected"""
+        from app.tools.account_runner import load_accounts
+        path = self.write([{"email": "a@example.com", "password_env": "TEST_UNSET_PASSWORD_VARIABLE"}])
+        with self.assertRaises(ValueError):
+            load_accounts(path)
+
+
+class TestResourceScheduler(unittest.TestCase):
+    """Test how many browsers may run at once"""
+
+    def test_cpu_limit(self):
+        """Cores divided by the cores reserved per browser, and the configured maximum"""
+        from app.tools.account_runner import ResourceScheduler
+        scheduler = ResourceScheduler(max_parallel=0, cpus_per_browser=2, memory_per_browser_mb=0, cpus=8)
+        self.assertEqual(scheduler.limit(), 4)
+        self.assertEqual(scheduler.free_slots([101]), 3)
+        self.assertEqual(scheduler.free_slots([101, 102, 103, 104]), 0)
+
+        scheduler = ResourceScheduler(max_parallel=2, cpus_per_browser=2, memory_per_browser_mb=0, cpus=8)
+        self.assertEqual(scheduler.free_slots([101]), 1)
+
+    def test_memory_limit(self):
+        """Available memory is checked on every call, workers still starting keep their share reserved"""
+        from app.tools.account_runner import ResourceScheduler
+        memory = [3000]
+        usage = {}
+        scheduler = ResourceScheduler(max_parallel=0, cpus_per_browser=1, memory_per_browser_mb=1000,
+                                      memory_probe=lambda: memory[0], usage_probe=usage.get, cpus=16)
+        self.assertEqual(scheduler.free_slots([]), 3)
+
+        # A browser that is fully up is already left out of the available memory
+        usage[101] = 1200 * 1024 * 1024
+        self.assertEqual(scheduler.free_slots([101]), 3)
+
+        # A burst of starts, before the new browsers have taken their memory
+        usage.update({102: 0, 103: 400 * 1024 * 1024})
+        self.assertEqual(scheduler.free_slots([101, 102, 103]), 1)
+        # A worker that cannot be measured keeps its full share
+        self.assertEqual(scheduler.free_slots([101, 104]), 2)
+
+        memory[0] = 500
+        self.assertEqual(scheduler.free_slots([101]), 0)
+        # One worker may always run
+        self.assertEqual(scheduler.free_slots([]), 1)
+
+
+class TestRunAccounts(unittest.TestCase):
+    """Test running accounts in worker processes"""
+
+    accounts = [{"name": f"account {i}", "email": f"user{i}@example.com", "password": "secret"} for i in range(3)]
+
+    def test_results_per_account(self):
+        """Every worker gets its own account, profile and log file, results keep the account order"""
+        from app.tools.account_runner import ResourceScheduler, run_accounts, account_key
+        scheduler = ResourceScheduler(max_parallel=3, cpus_per_browser=0, memory_per_browser_mb=0)
+        results = run_accounts(self.accounts, scheduler=scheduler, worker_class=make_worker_class(REPORTING_SCRIPT))
+
+        self.assertEqual([result["account"] for result in results], ["account 0", "account 1", "account 2"])
+        for account, result in zip(self.accounts, results):
+            self.assertEqual(result["status"], "ok")
+            self.assertEqual(result["output"], account["email"])
+            self.assertTrue(result["profile"].endswith(account_key(account["email"])))
+            self.assertIn(account_key(account["email"]), result["log"])
+        # Three workers were allowed, so they ran at the same time
+        self.assertLess(max(result["start"] for result in results), min(result["end"] for result in results))
+
+    def test_scheduler_limit(self):
+        """No more workers run at once than the scheduler allows"""
+        from app.tools.account_runner import ResourceScheduler, run_accounts
+        scheduler = ResourceScheduler(max_parallel=1, cpus_per_browser=0, memory_per_browser_mb=0)
+        results = run_accounts(self.accounts, scheduler=scheduler, worker_class=make_worker_class(REPORTING_SCRIPT))
+
+        spans = sorted((result["start"], result["end"]) for result in results)
+        for (_, end), (start, _) in zip(spans, spans[1:]):
+            self.assertGreaterEqual(start, end)
+
+    def test_failed_and_timed_out_workers(self):
+        """A crashing worker and a hanging one are reported without stopping the others"""
+        from app.tools.account_runner import ResourceScheduler, run_accounts
+        script = (
+            "import os, sys, time, json\n"
+            "email = os.environ['LINKEDIN_EMAIL']\n"
+            "if email.startswith('user0'): sys.exit(3)\n"
+            "if email.startswith('user1'): time.sleep(60)\n"
+            "json.dump({'status': 'ok', 'output': email}, open(RESULT, 'w'))\n"
+        )
+        scheduler = ResourceScheduler(max_parallel=3, cpus_per_browser=0, memory_per_browser_mb=0)
+        start = time.monotonic()
+        results = run_accounts(self.accounts, scheduler=scheduler, timeout=1,
+                               worker_class=make_worker_class(script))
+
+        self.assertLess(time.monotonic() - start, 30)
+        self.assertEqual([result["status"] for result in results], ["failed", "timeout", "ok"])
+        self.assertIn("code 3", results[0]["error"])
+
+    def test_worker_failure(self):
+        """A worker whose analysis fails reports it as failed instead of ok"""
+        from app.tools.account_runner import run_worker
+        from app.tools.linkedin_tools import AnalysisError
+
+        handle, path = tempfile.mkstemp(suffix=".json")
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        for error in (AnalysisError("Failed to log in to LinkedIn."), RuntimeError("browser crashed")):
+            with self.subTest(error=type(error).__name__), \
+                 patch("app.tools.linkedin_tools.run_pipeline", side_effect=error), \
+                 patch("app.utils.tracing.tracer.export"):
+                result = run_worker(path)
+                with open(path) as f:
+                    self.assertEqual(json.load(f), result)
+            self.assertEqual((result["status"], result["error"]), ("failed", str(error)))
+
+    def test_format_report(self):
+        """The report counts successful accounts and lists every output"""
+        from app.tools.account_runner import format_report
+        report = format_report([
+            {"account": "a", "status": "ok", "seconds": 1.5, "output": "Contact: X"},
+            {"account": "b", "status": "failed", "seconds": 0.2, "error": "Worker exited with code 1"},
+        ])
+        self.assertTrue(report.startswith("Analyzed 1 of 2 accounts"))
+        self.assertIn("=== b (failed, 0.2s) ===", report)
+        self.assertIn("Contact: X", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Tests for the searchable analysis history.
+"""
+
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+
+def analysis(contact, message, message_type="general", answer="Thanks!"):
+    return {
+        "contact": contact,
+        "message": message,
+        "message_count": 1,
+        "message_type": message_type,
+        "potential_answer": answer,
+        "conversation_key": f"contact:{contact}",
+        "timestamp": "10:00 AM",
+    }
+
+
+class TestAnalysisStore(unittest.TestCase):
+    """Test recording and searching analysis results"""
+
+    def _make_store(self, path=":memory:", account="user@example.com"):
+        from app.tools.analysis_store import AnalysisStore
+        store = AnalysisStore(path=path, account=account)
+        self.addCleanup(store.close)
+        return store
+
+    def _add_at(self, store, when, analyzed):
+        from unittest.mock import patch
+        with patch("app.tools.analysis_store.time.time", return_value=when):
+            store.add(analyzed)
+
+    def test_lookups(self):
+        """Results are found by contact, type, time range and account, newest first"""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "analyses.sqlite3")
+        store = self._make_store(path=path)
+        self._add_at(store, 1000, [analysis("Jane Doe", "Are you open to a new role?", "job_opportunity"),
+                                   analysis("Bob", "Nice to meet you", "connection_request")])
+        self._add_at(store, 2000, [analysis("Jane Doe", "Any news on the offer?", "sales_pitch")])
+        # Accounts share the database file
+        other = self._make_store(path=path, account="other@example.com")
+        self._add_at(other, 3000, [analysis("Jane Doe", "Hello from the other account")])
+
+        self.assertEqual([r["analyzed_at"] for r in store.search(contact="jane doe")], [3000, 2000, 1000])
+        self.assertEqual([r["contact"] for r in store.search(message_type="connection_request")], ["Bob"])
+        self.assertEqual([r["message"] for r in store.search(since=1500, until=3000)], ["Any news on the offer?"])
+        self.assertEqual(len(store.search(account="other@example.com")), 1)
+        self.assertEqual(len(store.search(limit=2)), 2)
+        self.assertEqual(store.count(), 4)
+
+        result = store.search(contact="Bob")[0]
+        self.assertEqual(result["suggestion"], "Thanks!")
+        self.assertEqual(result["account"], "user@example.com")
+        self.assertEqual(result["message_timestamp"], "10:00 AM")
+
+    def test_full_text_search(self):
+        """Every word has to appear in the contact, message or suggestion, punctuation is literal"""
+        store = self._make_store()
+        store.add([analysis("Jane Doe", "Can we talk about the contract renewal?", answer="Sure, Tuesday works."),
+                   analysis("Bob", "Is the contract signed?", answer="Not yet."),
+                   analysis("Cid", "Follow-up on \"pricing\"", answer="Sent it over.")])
+
+        self.assertEqual([r["contact"] for r in store.search("contract renewal")], ["Jane Doe"])
+        self.assertEqual([r["contact"] for r in store.search("tuesday")], ["Jane Doe"])
+        self.assertEqual(len(store.search("contract")), 2)
+        self.assertEqual([r["contact"] for r in store.search('follow-up "pricing')], ["Cid"])
+        self.assertEqual([r["contact"] for r in store.search("doe", message_type="general")], ["Jane Doe"])
+
+    def test_queries_use_indexes(self):
+        """Lookups never scan the whole history"""
+        store = self._make_store()
+        statements = []
+        store._db.set_trace_callback(statements.append)
+        for kwargs in [{"contact": "Jane"}, {"message_type": "general"}, {"since": 0}, {"text": "contract"}]:
+            with self.subTest(**kwargs):
+                store.search(**kwargs)
+                # FTS5 traces its own statements as well
+                sql = [statement for statement in statements if statement.startswith("SELECT analyses.")][-1]
+                plan = " ".join(row[-1] for row in store._db.execute(f"EXPLAIN QUERY PLAN {sql}"))
+                self.assertNotIn("SCAN analyses ", plan + " ")
+
+    def test_parse_time(self):
+        """Relative times count back from now, ISO dates are local time"""
+        from datetime import datetime
+        from app.tools.analysis_store import parse_time
+        self.assertEqual(parse_time("7d", now=1000000), 1000000 - 7 * 86400)
+        self.assertEqual(parse_time("90m", now=10000), 10000 - 5400)
+        self.assertEqual(parse_time("2026-10-01"), datetime(2026, 10, 1).timestamp())
+        with self.assertRaises(ValueError):
+            parse_time("last week")
+
+    def test_command_line(self):
+        """The CLI prints the matching results of a database file"""
+        from app.tools.analysis_store import main
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "analyses.sqlite3")
+            store = self._make_store(path=path)
+            store.add([analysis("Jane Doe", "Are you open to a new role?", "job_opportunity"),
+                       analysis("Bob", "Hi")])
+
+            output = io.StringIO()
+            with redirect_stdout(output):
+                results = main(["--db", path, "--contact", "Jane Doe", "--since", "1d", "--type", "job_opportunity"])
+            store.close()
+
+        self.assertEqual([r["contact"] for r in results], ["Jane Doe"])
+        self.assertIn("Potential Answer: Thanks!", output.getvalue())
+        self.assertIn("1 results", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
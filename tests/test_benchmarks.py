@@ -0,0 +1,97 @@
+"""
+Smoke tests for the offline benchmark suite.
+"""
+
+import unittest
+
+
+class TestBenchmarkFakes(unittest.TestCase):
+    """Test that the synthetic inbox goes through the real pipeline"""
+
+    def test_messaging_page_parses(self):
+        """Every synthetic conversation card is found by the parser"""
+        from benchmarks.fakes import make_messaging_page
+        from app.tools.message_parser import parse_conversations
+        conversations = parse_conversations(make_messaging_page(25), limit=100)
+        self.assertEqual(len(conversations), 25)
+        self.assertEqual(conversations[3]["conversation_id"], "2-00000003")
+
+    def test_bench_size(self):
+        """A small run times every stage and answers every conversation"""
+        from benchmarks.bench_pipeline import bench_size
+        stages = bench_size(5, llm_latency=0, concurrency=2)
+        self.assertEqual(stages["conversations"], 5)
+        # generate_suggestions and the full tool each answer all five
+        self.assertEqual(stages["llm_calls"], 10)
+        for stage in ["extract_messages", "classify", "generate_suggestions", "analyze_linkedin_messages"]:
+            self.assertIn(f"{stage}_seconds", stages)
+
+
+class TestDirectBenchmark(unittest.TestCase):
+    """Test the direct pipeline against the crew path"""
+
+    def test_crew_adds_agent_requests(self):
+        """Both paths answer every conversation, the crew adds its agent round trips on top"""
+        import os
+        offline_keys = ("OPENAI_API_KEY", "OTEL_SDK_DISABLED", "CREWAI_DISABLE_TELEMETRY")
+        environ = {key: os.environ.get(key) for key in offline_keys}
+        from benchmarks.bench_direct import bench_direct, bench_crew
+        direct = bench_direct(3, llm_latency=0, concurrency=2)
+        crew = bench_crew(3, llm_latency=0, agent_latency=0, concurrency=2)
+        # The offline key and telemetry switches do not outlive the benchmark
+        self.assertEqual({key: os.environ.get(key) for key in offline_keys}, environ)
+
+        self.assertEqual(direct["llm_requests"], 3)
+        self.assertEqual(crew["agent_requests"], 2)
+        self.assertEqual(crew["llm_requests"], 5)
+        self.assertGreater(crew["input_tokens"], direct["input_tokens"])
+        # The agent hands back the tool output as its final answer
+        self.assertEqual(crew["output_chars"], direct["output_chars"])
+
+
+class TestHistoryBenchmark(unittest.TestCase):
+    """Test the analysis history benchmark"""
+
+    def test_small_history(self):
+        """Every query is timed against a filled database"""
+        from benchmarks.bench_history import queries, run
+        results = run(120, repeat=1)
+        self.assertEqual(results["rows"], 120)
+        for name in queries():
+            self.assertIn(f"{name}_ms", results)
+
+
+class TestImportBenchmark(unittest.TestCase):
+    """Test that startup stays free of the heavy dependencies"""
+
+    def test_parse_importtime(self):
+        """Cumulative times are read per module, only top-level imports count towards the total"""
+        from benchmarks.bench_import import parse_importtime
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       100 |        150 |   json.decoder\n"
+            "import time:       200 |        350 | json\n"
+            "import time:        50 |        900 | site\n"
+        )
+        total, modules = parse_importtime(output)
+        self.assertEqual(total, 350)
+        self.assertEqual(modules["json.decoder"], 150)
+
+    def test_main_import_is_light(self):
+        """Importing main (what --help and the environment check need) loads no heavy package"""
+        from benchmarks.bench_import import measure, heavy_imports
+        _, modules = measure("import main")
+        self.assertIn("main", modules)
+        self.assertEqual(heavy_imports(modules), [])
+
+    def test_pipeline_import_without_crewai(self):
+        """The analysis pipeline can be imported without loading CrewAI"""
+        from benchmarks.bench_import import measure
+        _, modules = measure("import app.tools.linkedin_tools")
+        self.assertIn("app.tools.linkedin_tools", modules)
+        self.assertNotIn("crewai", modules)
+        self.assertNotIn("bs4", modules)
+
+
+if __name__ == "__main__":
+    unittest.main()
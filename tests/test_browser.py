@@ -0,0 +1,166 @@
+"""
+Tests for the event-driven readiness waits in BrowserTool.
+These use a mocked WebDriver, no real browser is started.
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+
+class TestBrowserWaits(unittest.TestCase):
+    """Test BrowserTool wait helpers"""
+
+    def _make_browser(self):
+        from app.tools.browser import BrowserTool
+        browser = BrowserTool()
+        browser.driver = MagicMock()
+        return browser
+
+    def test_wait_until_returns_condition_value(self):
+        """wait_until returns as soon as the condition is truthy"""
+        browser = self._make_browser()
+        calls = iter([False, False, "ready"])
+        result = browser.wait_until(lambda driver: next(calls), timeout=2, poll_frequency=0.01)
+        self.assertEqual(result, "ready")
+
+    def test_wait_until_survives_navigation(self):
+        """A poll that fails while the page navigates away is retried"""
+        from selenium.common.exceptions import JavascriptException, StaleElementReferenceException
+        browser = self._make_browser()
+        calls = iter([JavascriptException("page unloaded"), StaleElementReferenceException("gone"), "ready"])
+
+        def condition(driver):
+            result = next(calls)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        self.assertEqual(browser.wait_until(condition, timeout=2, poll_frequency=0.01), "ready")
+
+    def test_wait_until_timeout(self):
+        """wait_until returns None once the upper bound is reached"""
+        browser = self._make_browser()
+        self.assertIsNone(browser.wait_until(lambda driver: False, timeout=0.05, poll_frequency=0.01))
+
+    def test_wait_for_any_element(self):
+        """The first selector with a match wins, all checked in one script call"""
+        browser = self._make_browser()
+        element = MagicMock()
+        browser.driver.execute_script.side_effect = [None, [1, element]]
+        self.assertEqual(browser.wait_for_any_element([".a", ".b", ".c"], timeout=1), (".b", element))
+        self.assertEqual(browser.driver.execute_script.call_count, 2)
+
+    def test_wait_for_any_element_other_locator(self):
+        """Non-CSS locators fall back to one lookup per selector"""
+        from selenium.webdriver.common.by import By
+        browser = self._make_browser()
+        element = MagicMock()
+        browser.driver.find_elements.side_effect = lambda by, selector: [element] if selector == "//b" else []
+        self.assertEqual(browser.wait_for_any_element(["//a", "//b"], by=By.XPATH, timeout=1), ("//b", element))
+
+    def test_wait_for_network_idle(self):
+        """The page is idle once the resource count stops changing"""
+        browser = self._make_browser()
+        counts = iter([1, 2, 3])
+        browser.driver.execute_script.side_effect = lambda script: next(counts, 3)
+        self.assertTrue(browser.wait_for_network_idle(idle_time=0.05, timeout=2))
+
+    def test_wait_for_network_idle_defaults(self):
+        """The idle wait has its own short cap and does not count beacons or pings"""
+        from app.tools.browser import RESOURCE_COUNT_SCRIPT
+        from app.utils.config import NETWORK_IDLE_TIMEOUT, WAIT_TIMEOUT
+        browser = self._make_browser()
+        with patch.object(browser, "wait_until", return_value=True) as wait_until:
+            browser.wait_for_network_idle()
+        self.assertEqual(wait_until.call_args.args[1], NETWORK_IDLE_TIMEOUT)
+        self.assertLess(NETWORK_IDLE_TIMEOUT, WAIT_TIMEOUT)
+
+        wait_until.call_args.args[0](browser.driver)
+        browser.driver.execute_script.assert_called_with(RESOURCE_COUNT_SCRIPT)
+        self.assertIn("'beacon'", RESOURCE_COUNT_SCRIPT)
+        self.assertIn("'ping'", RESOURCE_COUNT_SCRIPT)
+
+    def test_wait_without_browser(self):
+        """Waiting before the browser is started fails cleanly"""
+        from app.tools.browser import BrowserTool
+        self.assertIsNone(BrowserTool().wait_until(lambda driver: True, timeout=0.1))
+
+
+class TestLeanMode(unittest.TestCase):
+    """Test the lean browser settings"""
+
+    def test_lean_options(self):
+        """Lean mode turns off images, remote fonts and autoplay"""
+        from app.tools.browser import BrowserTool, LEAN_CONTENT_SETTINGS
+        from app.utils.config import PAGE_LOAD_STRATEGY
+        options = BrowserTool(lean=True).chrome_options()
+        self.assertIn("--blink-settings=imagesEnabled=false", options.arguments)
+        self.assertIn("--disable-remote-fonts", options.arguments)
+        self.assertEqual(options.experimental_options["prefs"], LEAN_CONTENT_SETTINGS)
+        self.assertEqual(options.page_load_strategy, PAGE_LOAD_STRATEGY)
+
+    def test_regular_options(self):
+        """Without lean mode every resource is loaded"""
+        from app.tools.browser import BrowserTool
+        options = BrowserTool(lean=False).chrome_options()
+        self.assertNotIn("--blink-settings=imagesEnabled=false", options.arguments)
+        self.assertNotIn("prefs", options.experimental_options)
+
+    def test_block_resources(self):
+        """URL patterns are blocked through DevTools, a failure is not fatal"""
+        from app.tools.browser import BrowserTool
+        from app.utils.config import LEAN_BLOCKED_URL_PATTERNS
+        browser = BrowserTool(lean=True)
+        browser.driver = MagicMock()
+        self.assertTrue(browser.block_resources())
+        browser.driver.execute_cdp_cmd.assert_called_with("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URL_PATTERNS})
+        self.assertIn("*doubleclick.net*", LEAN_BLOCKED_URL_PATTERNS)
+
+        browser.driver.execute_cdp_cmd.side_effect = Exception("not a Chromium driver")
+        self.assertFalse(browser.block_resources())
+
+
+class TestStartBrowser(unittest.TestCase):
+    """Test driver resolution and setup when the browser starts"""
+
+    def test_stale_cached_driver_is_resolved_again(self):
+        """A cached driver that fails to start is refreshed once, and the browser is set up as usual"""
+        from selenium.common.exceptions import SessionNotCreatedException
+        from app.tools.browser import BrowserTool
+
+        cached = {"chrome_binary": "/usr/bin/chrome", "driver_path": "/drivers/old", "cached": True}
+        fresh = {"chrome_binary": "/usr/bin/chrome", "driver_path": "/drivers/new"}
+        driver = MagicMock()
+        browser = BrowserTool(lean=True)
+        with patch("app.tools.browser.resolve_chromedriver", side_effect=[cached, fresh]) as resolve, \
+             patch("app.tools.browser.Service") as service, \
+             patch("app.tools.browser.webdriver.Chrome",
+                   side_effect=[SessionNotCreatedException("session not created"), driver]) as chrome, \
+             patch.object(BrowserTool, "block_resources") as block_resources:
+            self.assertTrue(browser.start_browser())
+
+        resolve.assert_called_with(refresh=True)
+        service.assert_called_with(executable_path="/drivers/new")
+        self.assertEqual(chrome.call_args.kwargs["options"].binary_location, "/usr/bin/chrome")
+        self.assertIs(browser.driver, driver)
+        driver.execute_script.assert_called_once()
+        block_resources.assert_called_once()
+
+    def test_fresh_driver_is_not_resolved_again(self):
+        """A driver that was just resolved is not refreshed when it fails"""
+        from app.tools.browser import BrowserTool
+
+        fresh = {"chrome_binary": "/usr/bin/chrome", "driver_path": "/drivers/new"}
+        browser = BrowserTool(lean=False)
+        with patch("app.tools.browser.resolve_chromedriver", return_value=fresh) as resolve, \
+             patch("app.tools.browser.Service"), \
+             patch("app.tools.browser.webdriver.Chrome", side_effect=Exception("session not created")), \
+             patch.object(BrowserTool, "_try_alternative_browser_setup", return_value=False) as fallback:
+            self.assertFalse(browser.start_browser())
+
+        resolve.assert_called_once_with()
+        fallback.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+Tests for the warm browser pool.
+A fake LinkedInTool is used so no browser is started.
+"""
+
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+
+class FakeLinkedInTool:
+    """Stand-in for LinkedInTool that tracks start/login/close calls"""
+
+    instances = []
+
+    def __init__(self, start_ok=True, login_ok=True):
+        self.start_ok = start_ok
+        self.login_ok = login_ok
+        self.logged_in = False
+        self.closed = False
+        self.browser = MagicMock()
+        self.browser.is_alive.return_value = True
+        self.browser.age.return_value = 0
+        self.browser.memory_usage.return_value = None
+        FakeLinkedInTool.instances.append(self)
+
+    def start(self):
+        return self.start_ok
+
+    def login(self):
+        self.logged_in = self.login_ok
+        return self.login_ok
+
+    def close(self):
+        self.closed = True
+        return True
+
+
+class TestBrowserPool(unittest.TestCase):
+    """Test BrowserPool checkout/checkin and recycling"""
+
+    def setUp(self):
+        FakeLinkedInTool.instances = []
+
+    def _make_pool(self, **kwargs):
+        from app.tools.browser_pool import BrowserPool
+        kwargs.setdefault("factory", FakeLinkedInTool)
+        kwargs.setdefault("max_age", 0)
+        kwargs.setdefault("max_uses", 0)
+        return BrowserPool(**kwargs)
+
+    def test_browser_is_reused(self):
+        """A checked-in browser is handed out again without a new start"""
+        pool = self._make_pool(size=2)
+        first = pool.checkout()
+        pool.checkin(first)
+        self.assertIs(pool.checkout(), first)
+        self.assertEqual(len(FakeLinkedInTool.instances), 1)
+
+    def test_warm(self):
+        """Warming pre-starts up to the pool size"""
+        pool = self._make_pool(size=2)
+        self.assertEqual(pool.warm(), 2)
+        self.assertEqual(pool.stats()["idle"], 2)
+        pool.checkout()
+        pool.checkout()
+        self.assertEqual(len(FakeLinkedInTool.instances), 2)
+
+    def test_max_uses_recycles(self):
+        """A browser that served max_uses checkouts is closed"""
+        pool = self._make_pool(size=1, max_uses=1)
+        first = pool.checkout()
+        pool.checkin(first)
+        self.assertTrue(first.closed)
+        self.assertIsNot(pool.checkout(), first)
+
+    def test_unhealthy_browser_is_recycled(self):
+        """A browser failing its health check is not handed out again"""
+        pool = self._make_pool(size=1)
+        first = pool.checkout()
+        pool.checkin(first)
+        first.browser.is_alive.return_value = False
+        second = pool.checkout()
+        self.assertIsNot(second, first)
+        self.assertTrue(first.closed)
+
+    def test_oversized_browser_is_recycled(self):
+        """A browser checked in above the watchdog's memory limit is closed"""
+        from app.tools.browser_watchdog import BrowserWatchdog
+        pool = self._make_pool(size=1, watchdog=BrowserWatchdog(max_rss_mb=100, max_age=0))
+        first = pool.checkout()
+        first.browser.memory_usage.return_value = 200 * 1024 * 1024
+        pool.checkin(first)
+        self.assertTrue(first.closed)
+        self.assertEqual(pool.stats()["idle"], 0)
+        self.assertIsNot(pool.checkout(), first)
+
+    def test_bounded_size(self):
+        """Checkout blocks until a browser is returned when the pool is exhausted"""
+        pool = self._make_pool(size=1)
+        first = pool.checkout()
+        self.assertIsNone(pool.checkout(timeout=0.05))
+
+        threading.Timer(0.05, pool.checkin, args=(first,)).start()
+        self.assertIs(pool.checkout(timeout=2), first)
+
+    def test_failed_login_returns_none(self):
+        """A browser that cannot log in is closed and not pooled"""
+        pool = self._make_pool(size=1, factory=lambda: FakeLinkedInTool(login_ok=False))
+        self.assertIsNone(pool.checkout())
+        self.assertTrue(FakeLinkedInTool.instances[0].closed)
+        self.assertEqual(pool.stats()["creating"], 0)
+
+    def test_lease_discards_on_error(self):
+        """An exception inside a lease discards the browser"""
+        pool = self._make_pool(size=1)
+        with self.assertRaises(RuntimeError):
+            with pool.lease() as tool:
+                raise RuntimeError("boom")
+        self.assertTrue(tool.closed)
+        self.assertEqual(pool.stats()["idle"], 0)
+
+    def test_close(self):
+        """Closing the pool closes idle browsers and refuses checkouts"""
+        pool = self._make_pool(size=1)
+        pool.warm()
+        pool.close()
+        self.assertTrue(FakeLinkedInTool.instances[0].closed)
+        self.assertIsNone(pool.checkout())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Tests for the browser memory watchdog.
+Process memory is read from /proc where available, browsers are mocked.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+MB = 1024 * 1024
+
+
+def make_browser(rss_mb=None, age=0):
+    browser = MagicMock()
+    browser.memory_usage.return_value = None if rss_mb is None else rss_mb * MB
+    browser.age.return_value = age
+    return browser
+
+
+class TestProcessTree(unittest.TestCase):
+    """Test reading a process tree and its memory from /proc"""
+
+    def _write_process(self, proc, pid, ppid, rss_pages, name="chrome"):
+        os.makedirs(os.path.join(proc, str(pid)))
+        with open(os.path.join(proc, str(pid), "stat"), "w") as f:
+            f.write(f"{pid} ({name}) S {ppid} 1 1 0 -1\n")
+        with open(os.path.join(proc, str(pid), "statm"), "w") as f:
+            f.write(f"1000 {rss_pages} 10 1 0 50 0\n")
+
+    def test_tree_and_rss(self):
+        """Descendants are summed, unrelated processes are not"""
+        from app.tools.browser_watchdog import PAGE_SIZE, process_tree, process_tree_rss
+        with tempfile.TemporaryDirectory() as proc:
+            self._write_process(proc, 10, 1, 100, name="chromedriver")
+            self._write_process(proc, 11, 10, 200)
+            # Command names may contain spaces and parentheses
+            self._write_process(proc, 12, 11, 300, name="chrome (renderer) x")
+            self._write_process(proc, 20, 1, 5000, name="other")
+            os.makedirs(os.path.join(proc, "self"))
+
+            self.assertEqual(sorted(process_tree(10, proc)), [10, 11, 12])
+            self.assertEqual(process_tree_rss(10, proc), 600 * PAGE_SIZE)
+            self.assertIsNone(process_tree_rss(10, os.path.join(proc, "missing")))
+
+    @unittest.skipUnless(os.path.isdir("/proc/self"), "needs /proc")
+    def test_live_process(self):
+        """A child process is included in the memory of its parent"""
+        from app.tools.browser_watchdog import process_tree, process_tree_rss
+        child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        self.addCleanup(child.wait)
+        self.addCleanup(child.kill)
+
+        self.assertIn(child.pid, process_tree(os.getpid()))
+        self.assertGreater(process_tree_rss(os.getpid()), process_tree_rss(child.pid))
+
+
+class TestBrowserWatchdog(unittest.TestCase):
+    """Test the recycling decision"""
+
+    def test_within_limits(self):
+        """No reason to recycle, the sample is still recorded"""
+        from app.tools.browser_watchdog import BrowserWatchdog
+        watchdog = BrowserWatchdog(max_rss_mb=1000, max_age=3600)
+        self.assertIsNone(watchdog.recycle_reason(make_browser(rss_mb=400, age=60)))
+        self.assertEqual(watchdog.peak_rss_mb, 400)
+
+    def test_limits(self):
+        """Memory and age limits each trigger a recycle, 0 disables them"""
+        from app.tools.browser_watchdog import BrowserWatchdog
+        self.assertIn("MB", BrowserWatchdog(max_rss_mb=1000, max_age=0).recycle_reason(make_browser(rss_mb=1500)))
+        self.assertIn("old", BrowserWatchdog(max_rss_mb=0, max_age=3600).recycle_reason(make_browser(age=4000)))
+        self.assertIsNone(BrowserWatchdog(max_rss_mb=0, max_age=0).recycle_reason(make_browser(rss_mb=1500, age=4000)))
+
+    def test_unknown_memory(self):
+        """A browser whose memory cannot be measured is only recycled by age"""
+        from app.tools.browser_watchdog import BrowserWatchdog
+        watchdog = BrowserWatchdog(max_rss_mb=1000, max_age=0)
+        self.assertIsNone(watchdog.recycle_reason(make_browser()))
+
+    def test_check_recycles(self):
+        """check() only recycles a tool that is over its limits"""
+        from app.tools.browser_watchdog import BrowserWatchdog
+        watchdog = BrowserWatchdog(max_rss_mb=1000, max_age=0)
+        tool = MagicMock()
+        tool.browser = make_browser(rss_mb=500)
+        self.assertTrue(watchdog.check(tool))
+        tool.recycle.assert_not_called()
+
+        tool.browser = make_browser(rss_mb=1500)
+        tool.recycle.return_value = False
+        self.assertFalse(watchdog.check(tool))
+        self.assertEqual(watchdog.recycled, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Tests for the two-tier response suggestion cache.
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+
+class TestSuggestionCache(unittest.TestCase):
+    """Test SuggestionCache memory and disk tiers"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "suggestions.sqlite3")
+
+    def _make_cache(self, **kwargs):
+        from app.utils.cache import SuggestionCache
+        cache = SuggestionCache(path=self.path, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_key_is_content_addressed(self):
+        """Equal inputs give equal keys, any change gives a new key"""
+        from app.utils.cache import make_cache_key
+        key = make_cache_key(contact="Ann", message_history=["hi"], model="m")
+        self.assertEqual(key, make_cache_key(model="m", message_history=["hi"], contact="Ann"))
+        self.assertNotEqual(key, make_cache_key(contact="Ann", message_history=["hi!"], model="m"))
+
+    def test_memory_then_disk_hit(self):
+        """Entries survive a restart through the disk tier"""
+        cache = self._make_cache()
+        self.assertIsNone(cache.get("k"))
+        cache.set("k", "suggestion")
+        self.assertEqual(cache.get("k"), "suggestion")
+        cache.close()
+
+        restarted = self._make_cache()
+        self.assertEqual(restarted.get("k"), "suggestion")
+        stats = restarted.get_stats()
+        self.assertEqual(stats["disk_hits"], 1)
+        self.assertEqual(stats["hit_rate"], 1.0)
+
+    def test_memory_lru_eviction(self):
+        """The in-memory tier keeps only the most recently used entries"""
+        cache = self._make_cache(memory_size=2)
+        for key in ("a", "b", "c"):
+            cache.set(key, key)
+        self.assertEqual(list(cache._memory), ["b", "c"])
+        # Evicted from memory, still served from disk
+        self.assertEqual(cache.get("a"), "a")
+
+    def test_disk_size_eviction(self):
+        """The disk tier is trimmed to its maximum size"""
+        cache = self._make_cache(memory_size=1, disk_size=2)
+        for key in ("a", "b", "c"):
+            cache.set(key, key)
+            time.sleep(0.01)
+        cache._memory.clear()
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), "c")
+
+    def test_ttl_expiry(self):
+        """Entries older than the TTL are not returned"""
+        cache = self._make_cache(ttl_hours=1)
+        cache.set("k", "suggestion")
+        with patch("app.utils.cache.time.time", return_value=time.time() + 7200):
+            self.assertIsNone(cache.get("k"))
+
+
+if __name__ == "__main__":
+    unittest.main()
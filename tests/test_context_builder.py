@@ -0,0 +1,102 @@
+"""
+Tests for token-budgeted prompt context and rolling summaries.
+The summarizer is a fake, no API calls are made.
+"""
+
+import unittest
+
+
+class FakeSummarizer:
+    """Records what it is asked to summarize and appends message numbers to the summary"""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def __call__(self, previous_summary, messages, max_tokens):
+        if self.fail:
+            raise RuntimeError("API error")
+        self.calls.append(list(messages))
+        numbers = [m.split()[1] for m in messages]
+        return " ".join(filter(None, [previous_summary] + numbers))
+
+
+def make_history(count, size=40):
+    """History of numbered messages, most recent first, each about size / 4 tokens"""
+    return [f"message {i} " + "x" * size for i in reversed(range(count))]
+
+
+class TestContextBuilder(unittest.TestCase):
+    """Test budget enforcement and incremental summaries"""
+
+    def _make_builder(self, summarizer, budget=100, summary_tokens=30):
+        from app.tools.context_builder import ContextBuilder
+        from app.utils.cache import SuggestionCache
+        self.cache = SuggestionCache(":memory:")
+        self.addCleanup(self.cache.close)
+        return ContextBuilder(summarizer, budget=budget, summary_tokens=summary_tokens, cache=self.cache)
+
+    def test_short_history_is_kept_verbatim(self):
+        """Nothing is summarized while the history fits the budget"""
+        summarizer = FakeSummarizer()
+        builder = self._make_builder(summarizer)
+        history = make_history(3)
+        self.assertEqual(builder.build("thread-1", history), (history, None))
+        self.assertEqual(summarizer.calls, [])
+
+    def test_budget_is_enforced(self):
+        """The newest messages stay verbatim and the rest is summarized"""
+        from app.tools.context_builder import estimate_tokens
+        summarizer = FakeSummarizer()
+        builder = self._make_builder(summarizer)
+        history = make_history(20)
+        recent, summary = builder.build("thread-1", history)
+        self.assertEqual(recent, history[:len(recent)])
+        used = sum(estimate_tokens(m) for m in recent) + estimate_tokens(summary)
+        self.assertLessEqual(used, 100)
+        # Every older message is in the summary, oldest first
+        self.assertEqual(summary.split(), [str(i) for i in range(20 - len(recent))])
+
+    def test_summary_is_extended_incrementally(self):
+        """A later run only summarizes the messages that left the verbatim window"""
+        summarizer = FakeSummarizer()
+        builder = self._make_builder(summarizer)
+        _, first = builder.build("thread-1", make_history(20))
+        summarized = sum(len(call) for call in summarizer.calls)
+
+        summarizer.calls.clear()
+        _, second = builder.build("thread-1", make_history(22))
+        self.assertEqual(sum(len(call) for call in summarizer.calls), 2)
+        self.assertTrue(second.startswith(first))
+        self.assertEqual(second.split()[-1], str(summarized + 1))
+
+        # Nothing new, the cached summary is reused as it is
+        summarizer.calls.clear()
+        self.assertEqual(builder.build("thread-1", make_history(22))[1], second)
+        self.assertEqual(summarizer.calls, [])
+
+    def test_summaries_are_per_conversation(self):
+        """Another conversation gets its own summary"""
+        summarizer = FakeSummarizer()
+        builder = self._make_builder(summarizer)
+        builder.build("thread-1", make_history(20))
+        summarizer.calls.clear()
+        builder.build("thread-2", make_history(20))
+        self.assertTrue(summarizer.calls)
+
+    def test_summarizer_failure(self):
+        """Without a summary the prompt still fits, the older messages are left out"""
+        builder = self._make_builder(FakeSummarizer(fail=True))
+        recent, summary = builder.build("thread-1", make_history(20))
+        self.assertIsNone(summary)
+        self.assertLess(len(recent), 20)
+
+    def test_no_budget(self):
+        """A budget of 0 keeps the whole history"""
+        builder = self._make_builder(FakeSummarizer(), budget=0)
+        history = make_history(50)
+        self.assertEqual(builder.build("thread-1", history), (history, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
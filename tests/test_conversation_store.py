@@ -0,0 +1,65 @@
+"""
+Tests for the incremental inbox sync store.
+"""
+
+import unittest
+
+
+def conversation(contact, snippet, timestamp="10:00 AM", conversation_id=None):
+    return {
+        "contact": contact,
+        "messages": [snippet],
+        "message_count": 1,
+        "conversation_id": conversation_id,
+        "timestamp": timestamp,
+    }
+
+
+class TestConversationStore(unittest.TestCase):
+    """Test ConversationStore change detection"""
+
+    def _make_store(self, account="user@example.com"):
+        from app.tools.conversation_store import ConversationStore
+        store = ConversationStore(path=":memory:", account=account)
+        self.addCleanup(store.close)
+        return store
+
+    def test_only_delta_is_reported(self):
+        """Unchanged conversations are skipped on the next sync"""
+        store = self._make_store()
+        inbox = [conversation("Ann", "Hi"), conversation("Bob", "Hello", conversation_id="2-abc")]
+        self.assertEqual(store.sync(inbox), inbox)
+        self.assertEqual(store.sync(inbox), [])
+
+        updated = [conversation("Ann", "Are you there?", "10:05 AM"), inbox[1], conversation("Cid", "Hey")]
+        self.assertEqual([c["contact"] for c in store.sync(updated)], ["Ann", "Cid"])
+        self.assertEqual(store.count(), 3)
+
+    def test_changed_does_not_mark_seen(self):
+        """Conversations are reported again until they are marked as seen"""
+        store = self._make_store()
+        inbox = [conversation("Ann", "Hi")]
+        self.assertEqual(store.changed(inbox), inbox)
+        self.assertEqual(store.changed(inbox), inbox)
+        store.mark_seen(inbox)
+        self.assertEqual(store.changed(inbox), [])
+
+    def test_thread_id_identifies_conversation(self):
+        """A renamed contact with the same thread id is the same conversation"""
+        store = self._make_store()
+        store.sync([conversation("Ann", "Hi", conversation_id="2-abc")])
+        self.assertEqual(len(store.sync([conversation("Ann B.", "Hi", conversation_id="2-abc")])), 1)
+        self.assertEqual(store.count(), 1)
+
+
+    def test_opened_thread_keeps_list_fingerprint(self):
+        """Reading the full thread does not make the conversation look changed"""
+        store = self._make_store()
+        listed = conversation("Ann", "Ann: Are you free?")
+        opened = dict(listed, snippet=listed["messages"][0], messages=["Are you free?", "Hi"], message_count=2)
+        store.mark_seen([opened])
+        self.assertEqual(store.changed([listed]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
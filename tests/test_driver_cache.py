@@ -0,0 +1,74 @@
+"""
+Tests for the resolved ChromeDriver manifest.
+No browser is started and nothing is downloaded.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+
+class TestDriverManifest(unittest.TestCase):
+    """Test DriverManifest and resolve_chromedriver"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.chrome = self._make_executable("chrome")
+        self.driver = self._make_executable("chromedriver")
+
+    def _make_executable(self, name):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "w") as f:
+            f.write("#!/bin/sh\n")
+        os.chmod(path, 0o755)
+        return path
+
+    def test_lookup_after_record(self):
+        """A recorded driver is returned while Chrome is unchanged"""
+        from app.tools.driver_cache import DriverManifest
+        manifest = DriverManifest(self.tmp_dir.name)
+        self.assertIsNone(manifest.lookup())
+
+        manifest.record(self.chrome, "120.0.1", self.driver)
+        entry = manifest.lookup()
+        self.assertEqual(entry["driver_path"], self.driver)
+        self.assertEqual(entry["chrome_version"], "120.0.1")
+
+    def test_chrome_update_invalidates_entry(self):
+        """Changing the Chrome binary forces a new probe"""
+        from app.tools.driver_cache import DriverManifest
+        manifest = DriverManifest(self.tmp_dir.name)
+        manifest.record(self.chrome, "120.0.1", self.driver)
+
+        with open(self.chrome, "a") as f:
+            f.write("# updated\n")
+        self.assertIsNone(manifest.lookup())
+
+    def test_missing_driver_invalidates_entry(self):
+        """A deleted driver is not returned from the manifest"""
+        from app.tools.driver_cache import DriverManifest
+        manifest = DriverManifest(self.tmp_dir.name)
+        manifest.record(self.chrome, "120.0.1", self.driver)
+        os.remove(self.driver)
+        self.assertIsNone(manifest.lookup())
+
+    def test_resolve_uses_manifest_without_probing(self):
+        """The hot path neither spawns Chrome nor calls webdriver_manager"""
+        from app.tools import driver_cache
+
+        with patch.object(driver_cache, "find_chrome_binary", return_value=self.chrome), \
+             patch.object(driver_cache, "probe_chrome_version", return_value="120.0.1") as probe, \
+             patch.object(driver_cache, "install_chromedriver", return_value=self.driver) as install:
+            first = driver_cache.resolve_chromedriver(self.tmp_dir.name)
+            second = driver_cache.resolve_chromedriver(self.tmp_dir.name)
+
+        self.assertEqual(first["driver_path"], self.driver)
+        self.assertEqual(second["driver_path"], self.driver)
+        self.assertEqual(probe.call_count, 1)
+        self.assertEqual(install.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
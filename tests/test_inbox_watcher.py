@@ -0,0 +1,194 @@
+"""
+Tests for the inbox watcher.
+A fake LinkedInTool serves an inbox that the tests change between polls.
+"""
+
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+
+def make_conversation(contact, message):
+    return {"contact": contact, "messages": [message], "message_count": 1,
+            "conversation_id": contact.lower(), "timestamp": "10:00"}
+
+
+class FakeInboxTool:
+    """LinkedInTool stand-in serving a shared, changeable inbox"""
+
+    instances = []
+
+    def __init__(self, inbox, navigate_ok=True):
+        self.inbox = inbox
+        self.navigate_ok = navigate_ok
+        self.logged_out = False
+        self.closed = False
+        self.recycled = 0
+        self.browser = MagicMock()
+        self.browser.is_alive.return_value = True
+        self.browser.age.return_value = 0
+        self.browser.memory_usage.return_value = None
+        FakeInboxTool.instances.append(self)
+
+    def start(self):
+        return True
+
+    def login(self):
+        return True
+
+    def go_to_messages(self):
+        return self.navigate_ok
+
+    def iter_conversations(self, limit=5, thread_depth=0, max_age_days=0, select=None):
+        conversations = [dict(c) for c in self.inbox[:limit]]
+        return iter(select(conversations) if select else conversations)
+
+    def is_logged_out(self):
+        return self.logged_out
+
+    def recycle(self):
+        self.recycled += 1
+        self.browser.memory_usage.return_value = None
+        return True
+
+    def close(self):
+        self.closed = True
+        return True
+
+
+class TestAdaptiveInterval(unittest.TestCase):
+    """Test the polling schedule"""
+
+    def test_backoff_and_reset(self):
+        """Idle polls back off exponentially up to the maximum, activity resets the interval"""
+        from app.tools.inbox_watcher import AdaptiveInterval
+        interval = AdaptiveInterval(minimum=10, maximum=60, factor=2, jitter=0)
+        self.assertEqual([interval.idle() for _ in range(4)], [20, 40, 60, 60])
+        self.assertEqual(interval.activity(), 10)
+
+    def test_jitter(self):
+        """Jitter spreads the interval by at most the given fraction"""
+        from app.tools.inbox_watcher import AdaptiveInterval
+        low = AdaptiveInterval(minimum=100, maximum=100, jitter=0.1, rng=lambda: 0.0)
+        high = AdaptiveInterval(minimum=100, maximum=100, jitter=0.1, rng=lambda: 0.999999)
+        self.assertAlmostEqual(low.activity(), 90)
+        self.assertAlmostEqual(high.activity(), 110, places=3)
+
+
+class TestInboxWatcher(unittest.TestCase):
+    """Test polling, change detection and session recovery"""
+
+    def setUp(self):
+        from app.tools.conversation_store import ConversationStore
+        FakeInboxTool.instances = []
+        self.inbox = [make_conversation("Alice", "Hello"), make_conversation("Bob", "Hi there")]
+        self.store = ConversationStore(path=":memory:", account="test")
+        self.addCleanup(self.store.close)
+
+        for target, kwargs in [
+            ("app.tools.linkedin_tools.get_suggestion_cache", {"return_value": None}),
+            ("app.tools.linkedin_tools.get_analysis_store", {"return_value": None}),
+            ("app.tools.linkedin_tools.suggest_for_conversation", {"return_value": "Thanks!"}),
+            ("app.tools.inbox_watcher.log_content", {}),
+            ("app.tools.inbox_watcher.tracer.export", {}),
+        ]:
+            patcher = patch(target, **kwargs)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def make_watcher(self, watchdog=None, **tool_kwargs):
+        from app.tools.inbox_watcher import AdaptiveInterval, InboxWatcher
+        interval = AdaptiveInterval(minimum=1, maximum=8, factor=2, jitter=0)
+        return InboxWatcher(interval=interval, store=self.store, thread_depth=0, watchdog=watchdog,
+                            tool_factory=lambda: FakeInboxTool(self.inbox, **tool_kwargs))
+
+    def test_only_changes_are_analyzed(self):
+        """The first poll analyzes the inbox, later ones only what changed, on the same session"""
+        watcher = self.make_watcher()
+
+        self.assertEqual(watcher.poll(), 1)
+        self.assertEqual(watcher.stats["analyzed"], 2)
+        # Nothing new - back off
+        self.assertEqual(watcher.poll(), 2)
+        self.assertEqual(watcher.poll(), 4)
+        self.assertEqual(watcher.stats["analyzed"], 2)
+
+        self.inbox[1] = make_conversation("Bob", "Are you free tomorrow?")
+        self.assertEqual(watcher.poll(), 1)
+        self.assertEqual(watcher.stats["analyzed"], 3)
+        self.assertEqual(watcher.stats["logins"], 1)
+        self.assertEqual(len(FakeInboxTool.instances), 1)
+
+    def test_failed_poll_restarts_session(self):
+        """A poll that cannot reach the inbox closes the browser and backs off"""
+        watcher = self.make_watcher(navigate_ok=False)
+
+        self.assertEqual(watcher.poll(), 2)
+        self.assertEqual(watcher.stats["failed_polls"], 1)
+        self.assertTrue(FakeInboxTool.instances[0].closed)
+        self.assertIsNone(watcher.linkedin_tool)
+
+        watcher.poll()
+        self.assertEqual(watcher.stats["logins"], 2)
+
+    def test_expired_session(self):
+        """An empty inbox on the login page counts as a failure, not as an idle poll"""
+        watcher = self.make_watcher()
+        watcher.poll()
+        FakeInboxTool.instances[0].logged_out = True
+
+        watcher.poll()
+        self.assertEqual(watcher.stats["failed_polls"], 1)
+        self.assertTrue(FakeInboxTool.instances[0].closed)
+
+    def test_oversized_browser_is_recycled(self):
+        """A browser above the memory limit is replaced between polls, on the same tool"""
+        from app.tools.browser_watchdog import BrowserWatchdog
+        watcher = self.make_watcher(watchdog=BrowserWatchdog(max_rss_mb=100, max_age=0))
+        watcher.poll()
+        tool = FakeInboxTool.instances[0]
+        tool.browser.memory_usage.return_value = 200 * 1024 * 1024
+
+        self.inbox[0] = make_conversation("Alice", "Any news?")
+        self.assertEqual(watcher.poll(), 1)
+        self.assertEqual(tool.recycled, 1)
+        self.assertEqual(watcher.stats["recycles"], 1)
+        self.assertEqual(watcher.stats["logins"], 1)
+        self.assertEqual(watcher.stats["analyzed"], 3)
+
+    def test_failed_recycle_restarts_session(self):
+        """A browser that cannot log in again after recycling fails the poll"""
+        from app.tools.browser_watchdog import BrowserWatchdog
+        watcher = self.make_watcher(watchdog=BrowserWatchdog(max_rss_mb=0, max_age=60))
+        watcher.poll()
+        tool = FakeInboxTool.instances[0]
+        tool.browser.age.return_value = 120
+        tool.recycle = MagicMock(return_value=False)
+
+        watcher.poll()
+        self.assertEqual(watcher.stats["failed_polls"], 1)
+        self.assertTrue(tool.closed)
+
+    def test_run_until_stopped(self):
+        """stop() ends the loop after the current poll and the browser is closed"""
+        from app.tools.inbox_watcher import AdaptiveInterval
+        watcher = self.make_watcher()
+        watcher.interval = AdaptiveInterval(minimum=0.01, maximum=0.02, jitter=0)
+
+        timer = threading.Timer(0.2, watcher.stop)
+        timer.start()
+        stats = watcher.run()
+        timer.join()
+
+        self.assertGreater(stats["polls"], 1)
+        self.assertEqual(stats["analyzed"], 2)
+        self.assertTrue(FakeInboxTool.instances[0].closed)
+
+    def test_max_polls(self):
+        """run() can be limited to a number of polls"""
+        watcher = self.make_watcher()
+        self.assertEqual(watcher.run(max_polls=1)["polls"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+"""
+Tests for LinkedInTool login outcome detection.
+The browser is mocked, no real login is attempted.
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+
+class TestLoginOutcome(unittest.TestCase):
+    """Test the combined wait for login success and challenge markers"""
+
+    def _make_tool(self, detected=None, url="https://www.linkedin.com/feed/"):
+        from app.tools.linkedin import LinkedInTool
+        tool = LinkedInTool()
+        tool.session_store = None
+        tool.browser.driver = MagicMock()
+        tool.browser.driver.current_url = url
+        tool.browser.first_present = MagicMock(return_value=(detected, MagicMock()) if detected else None)
+        return tool
+
+    def test_success_marker(self):
+        """A feed marker means the login went through"""
+        tool = self._make_tool(".global-nav__me-photo")
+        self.assertEqual(tool.wait_for_login_outcome(timeout=1), "logged_in")
+
+    def test_challenge_markers(self):
+        """Challenge markers are classified without waiting for the success selectors"""
+        for selector, outcome in [("#captcha-challenge", "captcha"),
+                                  (".pin-verification", "pin"),
+                                  ("#error-for-password", "bad_credentials")]:
+            with self.subTest(selector=selector):
+                tool = self._make_tool(selector)
+                self.assertEqual(tool.wait_for_login_outcome(timeout=1), outcome)
+                self.assertEqual(tool.browser.first_present.call_count, 1)
+
+    def test_page_navigating_during_poll(self):
+        """A poll that fails because the page is navigating does not end the wait"""
+        from selenium.common.exceptions import JavascriptException
+        tool = self._make_tool()
+        tool.browser.first_present.side_effect = [JavascriptException("document unloaded"),
+                                                  (".global-nav__me-photo", MagicMock())]
+        self.assertEqual(tool.wait_for_login_outcome(timeout=2), "logged_in")
+
+    def test_challenge_url(self):
+        """A checkpoint page counts as a challenge"""
+        tool = self._make_tool(url="https://www.linkedin.com/checkpoint/challenge/AgE")
+        self.assertEqual(tool.wait_for_login_outcome(timeout=1), "challenge")
+
+    def test_unknown_after_timeout(self):
+        """No marker within the timeout gives an unknown outcome"""
+        tool = self._make_tool(url="https://www.linkedin.com/checkpoint/lg/login-submit")
+        self.assertEqual(tool.wait_for_login_outcome(timeout=0.3), "unknown")
+
+    def test_login_stops_on_challenge(self):
+        """login() fails fast and does not mark the tool as logged in"""
+        tool = self._make_tool("#captcha-challenge")
+        tool.browser.navigate_to = MagicMock(return_value=True)
+        tool.browser.send_keys = MagicMock(return_value=True)
+        tool.browser.wait_and_click = MagicMock(return_value=True)
+        with patch("app.tools.linkedin.LINKEDIN_EMAIL", "user@example.com"), \
+             patch("app.tools.linkedin.LINKEDIN_PASSWORD", "secret"):
+            self.assertFalse(tool.login())
+        self.assertFalse(tool.logged_in)
+        self.assertEqual(tool.login_outcome, "captcha")
+
+
+class TestRecycle(unittest.TestCase):
+    """Test replacing a long-lived browser"""
+
+    def test_recycle(self):
+        """recycle() saves the session, replaces the browser and logs in again"""
+        from app.tools.linkedin import LinkedInTool
+        tool = LinkedInTool()
+        tool.session_store = MagicMock()
+        old_browser = tool.browser
+        old_browser.driver = driver = MagicMock()
+        tool.logged_in = True
+
+        with patch("app.tools.linkedin.BrowserTool") as browser_class, \
+             patch.object(LinkedInTool, "login", return_value=True) as login:
+            browser_class.return_value.start_browser.return_value = True
+            self.assertTrue(tool.recycle())
+
+        tool.session_store.save.assert_called_once_with(driver)
+        driver.quit.assert_called_once()
+        self.assertIs(tool.browser, browser_class.return_value)
+        login.assert_called_once()
+
+
+class TestScrolling(unittest.TestCase):
+    """Test that list and thread scrolling stop as soon as enough is loaded"""
+
+    def _make_tool(self, counts):
+        from app.tools.linkedin import LinkedInTool
+        tool = LinkedInTool()
+        tool.browser = MagicMock()
+        tool.browser.first_present.return_value = ("li.msg-conversation-card", MagicMock())
+        tool.browser.count_elements.return_value = counts[0]
+        tool.browser.scroll_for_more.side_effect = counts[1:] + [None]
+        return tool
+
+    def test_conversation_list_stops_at_limit(self):
+        """The inbox is paged only until the limit is covered"""
+        tool = self._make_tool([8, 16, 24, 32])
+        self.assertEqual(tool._load_conversations(20), 24)
+        self.assertEqual(tool.browser.scroll_for_more.call_count, 2)
+
+    def test_conversation_list_exhausted(self):
+        """Paging stops when no more conversations load"""
+        tool = self._make_tool([8, 12])
+        self.assertEqual(tool._load_conversations(50), 12)
+
+    def test_thread_stops_at_depth(self):
+        """A thread is scrolled up only until the requested depth is loaded"""
+        tool = self._make_tool([5, 10, 15, 20])
+        self.assertEqual(tool._load_thread_history(8), 10)
+        tool.browser.scroll_for_more.assert_called_once_with("li.msg-s-message-list__event", direction="up")
+
+    def test_thread_stops_at_age_limit(self):
+        """Scrolling stops once the oldest loaded day is past the age limit"""
+        tool = self._make_tool([5, 10])
+        tool.browser.get_all_text.return_value = ["Dec 30, 2001"]
+        self.assertEqual(tool._load_thread_history(50, max_age_days=7), 5)
+        tool.browser.scroll_for_more.assert_not_called()
+
+
+class TestInBrowserExtraction(unittest.TestCase):
+    """Test that the conversation list is read in the page, with the page source as fallback"""
+
+    def setUp(self):
+        # extract_messages logs what it read, that is not part of these tests
+        patcher = patch("app.tools.linkedin.log_content")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _make_tool(self, rows):
+        from app.tools.linkedin import LinkedInTool
+        tool = LinkedInTool()
+        tool.logged_in = True
+        tool.browser = MagicMock()
+        tool.browser.wait_for_any_element.return_value = None
+        tool.browser.execute_script.return_value = rows
+        tool.browser.get_page_source.return_value = FIXTURE_PAGE
+        return tool
+
+    def test_rows_are_used_without_page_source(self):
+        """Script rows become conversation dicts and the page source is never fetched"""
+        tool = self._make_tool([["Jane Doe", "Hello", "2-abc", "10:32 AM"], [None, None, None, None]])
+        with patch("app.tools.linkedin.JS_EXTRACTION", True):
+            conversations = tool.extract_messages(limit=5)
+        self.assertEqual(conversations[0], {
+            "contact": "Jane Doe", "messages": ["Hello"], "message_count": 1,
+            "conversation_id": "2-abc", "timestamp": "10:32 AM"
+        })
+        self.assertEqual(conversations[1]["contact"], "Unknown Contact")
+        self.assertEqual(conversations[1]["messages"], ["No message content"])
+        tool.browser.get_page_source.assert_not_called()
+
+    def test_falls_back_to_page_source(self):
+        """A failed or empty script result is parsed from the page source instead"""
+        for rows in (None, []):
+            with self.subTest(rows=rows):
+                tool = self._make_tool(rows)
+                with patch("app.tools.linkedin.JS_EXTRACTION", True):
+                    conversations = tool.extract_messages(limit=5)
+                self.assertEqual([c["contact"] for c in conversations], ["Jane Doe"])
+                tool.browser.get_page_source.assert_called_once()
+
+    def test_disabled(self):
+        """With JS_EXTRACTION off the script is not run"""
+        tool = self._make_tool([["Jane Doe", "Hello", None, None]])
+        with patch("app.tools.linkedin.JS_EXTRACTION", False):
+            tool.extract_messages(limit=5)
+        tool.browser.execute_script.assert_not_called()
+
+
+FIXTURE_PAGE = """
+<ul><li class="msg-conversation-card">
+  <h3 class="msg-conversation-card__participant-names">Jane Doe</h3>
+  <span class="msg-conversation-card__message-snippet-body">Hello</span>
+</li></ul>
+"""
+
+
+if __name__ == "__main__":
+    unittest.main()
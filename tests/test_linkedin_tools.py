@@ -0,0 +1,351 @@
+"""
+Tests for response suggestion generation.
+The LLM is replaced with a fake, no API calls are made.
+"""
+
+import json
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+
+class FakeLLM:
+    """Echoes the latest message back after a delay and tracks concurrency"""
+
+    def __init__(self, delay=0.05, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def invoke(self, messages):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            user_prompt = messages[-1].content
+            latest = user_prompt.split("Latest Message: ")[1].split("\n")[0]
+            if latest == self.fail_on:
+                raise RuntimeError("API error")
+            return SimpleNamespace(content=f"Reply to {latest}")
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def make_conversations(count):
+    return [
+        {"contact": f"Contact {i}", "messages": [f"message {i}"], "message_count": 1}
+        for i in range(count)
+    ]
+
+
+class TestGenerateSuggestions(unittest.TestCase):
+    """Test the concurrent generation stage"""
+
+    def setUp(self):
+        # Keep results from other tests (or earlier runs) out of the way
+        patcher = patch("app.tools.linkedin_tools.get_suggestion_cache", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_order_is_preserved(self):
+        """Suggestions come back in conversation order"""
+        from app.tools import linkedin_tools
+        llm = FakeLLM()
+        with patch.object(linkedin_tools, "get_llm", return_value=llm):
+            suggestions = linkedin_tools.generate_suggestions(make_conversations(6), max_workers=3)
+        self.assertEqual(suggestions, [f"Reply to message {i}" for i in range(6)])
+        self.assertGreater(llm.max_in_flight, 1)
+        self.assertLessEqual(llm.max_in_flight, 3)
+
+    def test_failures_are_isolated(self):
+        """One failing conversation does not affect the others"""
+        from app.tools import linkedin_tools
+        llm = FakeLLM(fail_on="message 1")
+        with patch.object(linkedin_tools, "get_llm", return_value=llm):
+            suggestions = linkedin_tools.generate_suggestions(make_conversations(3))
+        self.assertEqual(suggestions[0], "Reply to message 0")
+        self.assertEqual(suggestions[1], linkedin_tools.SUGGESTION_ERROR)
+        self.assertEqual(suggestions[2], "Reply to message 2")
+
+    def test_llm_client_is_shared(self):
+        """The LLM client is only constructed once"""
+        from app.tools import linkedin_tools
+        with patch.object(linkedin_tools, "_llm", None), \
+             patch("langchain_openai.ChatOpenAI") as chat_openai:
+            first = linkedin_tools.get_llm()
+            second = linkedin_tools.get_llm()
+        self.assertIs(first, second)
+        self.assertEqual(chat_openai.call_count, 1)
+
+
+    def test_cached_suggestion_skips_llm(self):
+        """An unchanged conversation is answered from the suggestion cache"""
+        from app.tools import linkedin_tools
+        from app.utils.cache import SuggestionCache
+        cache = SuggestionCache(path=":memory:")
+        llm = FakeLLM(delay=0)
+        with patch.object(linkedin_tools, "get_llm", return_value=llm), \
+             patch.object(linkedin_tools, "get_suggestion_cache", return_value=cache), \
+             patch.object(llm, "invoke", wraps=llm.invoke) as invoke:
+            first = linkedin_tools.generate_suggestions(make_conversations(2))
+            second = linkedin_tools.generate_suggestions(make_conversations(2))
+        self.assertEqual(first, second)
+        self.assertEqual(invoke.call_count, 2)
+        self.assertEqual(cache.get_stats()["memory_hits"], 2)
+
+    def test_long_history_fits_budget(self):
+        """Older messages of a long thread reach the LLM as a summary"""
+        from app.tools import linkedin_tools
+        from app.tools.context_builder import ContextBuilder
+        prompts = []
+
+        class RecordingLLM(FakeLLM):
+            def invoke(self, messages):
+                prompts.append(messages[-1].content)
+                return super().invoke(messages)
+
+        builder = ContextBuilder(lambda summary, messages, max_tokens: "earlier small talk",
+                                 budget=50, summary_tokens=10)
+        history = ["latest"] + [f"older message {i} " + "x" * 40 for i in range(100)]
+        with patch.object(linkedin_tools, "get_llm", return_value=RecordingLLM(delay=0)), \
+             patch.object(linkedin_tools, "get_context_builder", return_value=builder):
+            suggestion = linkedin_tools.generate_response_suggestion_with_context("Jane", "latest", history)
+        self.assertEqual(suggestion, "Reply to latest")
+        self.assertIn("Summary of earlier messages: earlier small talk", prompts[0])
+        self.assertNotIn("older message 99", prompts[0])
+        self.assertLess(len(prompts[0]), 600)
+
+
+
+class FakeStreamingTool:
+    """LinkedInTool stand-in that records when each conversation is scraped"""
+
+    def __init__(self, conversations, scrape_delay=0.02):
+        self.conversations = conversations
+        self.scrape_delay = scrape_delay
+        self.scraped = []
+
+    def go_to_messages(self):
+        return True
+
+    def iter_conversations(self, limit=5, thread_depth=0, max_age_days=0, select=None):
+        conversations = self.conversations[:limit]
+        if select:
+            conversations = select(conversations)
+        for conversation in conversations:
+            time.sleep(self.scrape_delay)
+            self.scraped.append(conversation["contact"])
+            yield conversation
+
+
+class TestStreamAnalysis(unittest.TestCase):
+    """Test the streaming scrape-to-LLM pipeline"""
+
+    def setUp(self):
+        patcher = patch("app.tools.linkedin_tools.get_suggestion_cache", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def stream(self, tool, **kwargs):
+        from contextlib import contextmanager
+        from app.tools import linkedin_tools
+
+        @contextmanager
+        def session():
+            yield tool, None
+
+        with patch.object(linkedin_tools, "linkedin_session", session):
+            return list(linkedin_tools.stream_analysis(**kwargs))
+
+    def test_results_in_inbox_order(self):
+        """Every conversation is analyzed and results keep the inbox order"""
+        from app.tools import linkedin_tools
+        tool = FakeStreamingTool(make_conversations(6))
+        with patch.object(linkedin_tools, "get_llm", return_value=FakeLLM()):
+            results = self.stream(tool, limit=6, max_workers=2)
+        self.assertEqual([r["contact"] for r in results], [f"Contact {i}" for i in range(6)])
+        self.assertEqual(results[3]["potential_answer"], "Reply to message 3")
+
+    def test_generation_overlaps_scraping(self):
+        """The first suggestion is requested before the last conversation is scraped"""
+        from app.tools import linkedin_tools
+        tool = FakeStreamingTool(make_conversations(4), scrape_delay=0.05)
+        scraped_at_first_call = []
+
+        class RecordingLLM(FakeLLM):
+            def invoke(self, messages):
+                scraped_at_first_call.append(len(tool.scraped))
+                return super().invoke(messages)
+
+        with patch.object(linkedin_tools, "get_llm", return_value=RecordingLLM(delay=0.01)):
+            self.stream(tool, limit=4, max_workers=2)
+        self.assertLess(scraped_at_first_call[0], 4)
+
+    def test_backpressure_bounds_pending_work(self):
+        """Scraping pauses while 2 * max_workers conversations wait for a suggestion"""
+        from app.tools import linkedin_tools
+        tool = FakeStreamingTool(make_conversations(8), scrape_delay=0)
+        emitted = []
+
+        with patch.object(linkedin_tools, "get_llm", return_value=FakeLLM(delay=0.05)), \
+             patch.object(linkedin_tools, "linkedin_session") as session:
+            session.return_value.__enter__.return_value = (tool, None)
+            for result in linkedin_tools.stream_analysis(limit=8, max_workers=1):
+                emitted.append(len(tool.scraped) - len(emitted))
+        self.assertLessEqual(max(emitted), 2)
+
+    def test_each_conversation_is_classified_once(self):
+        """The label is computed once and reused for the prompts, the cache key and the result"""
+        from app.tools import linkedin_tools
+        tool = FakeStreamingTool(make_conversations(3), scrape_delay=0)
+        with patch.object(linkedin_tools, "get_llm", return_value=FakeLLM()), \
+             patch.object(linkedin_tools, "determine_message_type",
+                          wraps=linkedin_tools.determine_message_type) as determine:
+            results = self.stream(tool, limit=3, max_workers=2)
+        self.assertEqual(determine.call_count, 3)
+        self.assertEqual([r["message_type"] for r in results], ["general"] * 3)
+
+    def test_failed_suggestions_are_not_marked_seen(self):
+        """Only successfully analyzed conversations are recorded in the store"""
+        from app.tools import linkedin_tools
+        from app.tools.conversation_store import ConversationStore
+        store = ConversationStore(":memory:", account="test")
+        tool = FakeStreamingTool(make_conversations(3), scrape_delay=0)
+        with patch.object(linkedin_tools, "get_llm", return_value=FakeLLM(fail_on="message 1")):
+            results = self.stream(tool, limit=3, store=store)
+        self.assertEqual(len(results), 3)
+        self.assertEqual([c["contact"] for c in store.changed(make_conversations(3))], ["Contact 1"])
+
+    def test_login_failure_raises(self):
+        """Session errors surface as AnalysisError"""
+        from contextlib import contextmanager
+        from app.tools import linkedin_tools
+
+        @contextmanager
+        def session():
+            yield None, "Failed to start the browser."
+
+        with patch.object(linkedin_tools, "linkedin_session", session):
+            with self.assertRaises(linkedin_tools.AnalysisError):
+                list(linkedin_tools.stream_analysis())
+
+
+class FakeBatchLLM(FakeLLM):
+    """Answers batched prompts with JSON keyed by conversation id"""
+
+    def __init__(self, drop=None, raw=None, **kwargs):
+        super().__init__(delay=0, **kwargs)
+        self.drop = drop
+        self.raw = raw
+        self.batch_sizes = []
+
+    def invoke(self, messages):
+        user_prompt = messages[-1].content
+        if "### Conversation id:" not in user_prompt:
+            self.batch_sizes.append(1)
+            return super().invoke(messages)
+
+        answers = {}
+        for block in user_prompt.split("### Conversation id: ")[1:]:
+            key = block.split("\n")[0]
+            latest = block.split("Latest Message: ")[1].split("\n")[0]
+            if latest != self.drop:
+                answers[key] = f"Reply to {latest}"
+        self.batch_sizes.append(len(answers) + (self.drop is not None))
+        content = self.raw if self.raw is not None else "```json\n" + json.dumps(answers) + "\n```"
+        return SimpleNamespace(content=content)
+
+
+class TestBatchedSuggestions(unittest.TestCase):
+    """Test packing several conversations into one request"""
+
+    def setUp(self):
+        patcher = patch("app.tools.linkedin_tools.get_suggestion_cache", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_batches_keep_order(self):
+        """Conversations are answered in batches and come back in order"""
+        from app.tools import linkedin_tools
+        llm = FakeBatchLLM()
+        with patch.object(linkedin_tools, "get_llm", return_value=llm):
+            suggestions = linkedin_tools.generate_suggestions(make_conversations(7), batch_size=3)
+        self.assertEqual(suggestions, [f"Reply to message {i}" for i in range(7)])
+        self.assertEqual(sorted(llm.batch_sizes), [1, 3, 3])
+
+    def test_missing_answer_falls_back(self):
+        """A conversation left out of the JSON answer gets its own request"""
+        from app.tools import linkedin_tools
+        llm = FakeBatchLLM(drop="message 1")
+        with patch.object(linkedin_tools, "get_llm", return_value=llm):
+            suggestions = linkedin_tools.suggest_for_batch(make_conversations(3))
+        self.assertEqual(suggestions, [f"Reply to message {i}" for i in range(3)])
+        self.assertEqual(llm.batch_sizes, [3, 1])
+
+    def test_malformed_answer_falls_back(self):
+        """An answer that is not a JSON object is retried one conversation at a time"""
+        from app.tools import linkedin_tools
+        for raw in ["Sure! Here are the replies.", '["a", "b"]', '{"1": "", "2": 5}']:
+            with self.subTest(raw=raw):
+                llm = FakeBatchLLM(raw=raw)
+                with patch.object(linkedin_tools, "get_llm", return_value=llm):
+                    suggestions = linkedin_tools.suggest_for_batch(make_conversations(2))
+                self.assertEqual(suggestions, ["Reply to message 0", "Reply to message 1"])
+
+    def test_streaming_batches(self):
+        """The streaming pipeline groups conversations into batched requests"""
+        from contextlib import contextmanager
+        from app.tools import linkedin_tools
+        tool = FakeStreamingTool(make_conversations(5), scrape_delay=0)
+
+        @contextmanager
+        def session():
+            yield tool, None
+
+        llm = FakeBatchLLM()
+        with patch.object(linkedin_tools, "get_llm", return_value=llm), \
+             patch.object(linkedin_tools, "linkedin_session", session):
+            results = list(linkedin_tools.stream_analysis(limit=5, batch_size=2))
+        self.assertEqual([r["potential_answer"] for r in results], [f"Reply to message {i}" for i in range(5)])
+        self.assertEqual(sorted(llm.batch_sizes), [1, 2, 2])
+
+
+class TestRunPipeline(unittest.TestCase):
+    """Test the direct scrape -> classify -> generate pipeline"""
+
+    def test_result_and_usage(self):
+        """Every conversation is classified and answered, and the LLM usage of the run is reported"""
+        from contextlib import contextmanager
+        from app.tools import linkedin_tools
+        conversations = make_conversations(2)
+        conversations[1]["messages"] = ["We are hiring for a senior role, are you open to new opportunities?"]
+        tool = FakeStreamingTool(conversations, scrape_delay=0)
+
+        @contextmanager
+        def session():
+            yield tool, None
+
+        with patch.object(linkedin_tools, "get_llm", return_value=FakeLLM(delay=0)), \
+             patch.object(linkedin_tools, "linkedin_session", session), \
+             patch.object(linkedin_tools, "get_suggestion_cache", return_value=None), \
+             patch.object(linkedin_tools, "get_conversation_store", return_value=None), \
+             patch.object(linkedin_tools, "get_analysis_store", return_value=None), \
+             patch.object(linkedin_tools, "log_content") as log_content:
+            result = linkedin_tools.run_pipeline(limit=2)
+
+        self.assertEqual([r["contact"] for r in result["analyzed"]], ["Contact 0", "Contact 1"])
+        self.assertEqual(result["analyzed"][1]["message_type"], "job_opportunity")
+        self.assertEqual(result["usage"]["requests"], 2)
+        self.assertGreater(result["usage"]["input_tokens"], 0)
+        self.assertIn("Contact: Contact 1", result["output"])
+        log_content.assert_called_once_with(result["output"], "linkedin_message_analysis")
+
+
+if __name__ == "__main__":
+    unittest.main()
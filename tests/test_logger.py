@@ -0,0 +1,99 @@
+"""
+Tests for the queue-based JSON lines logging.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+
+def make_record(msg, **extra):
+    record = logging.LogRecord("entringer-linkedin-agent", logging.INFO, __file__, 1, msg, (), None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class TestLogger(unittest.TestCase):
+    """Test structured records, rotation and content files"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+
+    def test_json_records(self):
+        """Records are single JSON lines with extra fields but without the content"""
+        from app.utils.logger import JsonFormatter
+        line = JsonFormatter().format(make_record("saved", content_file="a.txt", content="x" * 1000))
+        entry = json.loads(line)
+        self.assertEqual(entry["message"], "saved")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["content_file"], "a.txt")
+        self.assertNotIn("content", entry)
+
+    def test_exception_survives_the_queue(self):
+        """A traceback logged with exc_info=True reaches the JSON record as its own field"""
+        import queue
+        from app.utils.logger import JsonFormatter, RecordQueueHandler
+        log_queue = queue.SimpleQueue()
+        test_logger = logging.getLogger("test-exception-survives-the-queue")
+        test_logger.propagate = False
+        test_logger.addHandler(RecordQueueHandler(log_queue))
+        self.addCleanup(test_logger.handlers.clear)
+
+        try:
+            raise ValueError("bad message")
+        except ValueError:
+            test_logger.error("Parsing %s failed", "thread", exc_info=True)
+
+        entry = json.loads(JsonFormatter().format(log_queue.get_nowait()))
+        self.assertEqual(entry["message"], "Parsing thread failed")
+        self.assertIn("ValueError: bad message", entry["exception"])
+        self.assertNotIn("Traceback", entry["message"])
+
+    def test_rotation_by_size_and_age(self):
+        """The log file rolls over when it is too big or too old"""
+        from app.utils.logger import SizeAndTimeRotatingFileHandler
+        path = os.path.join(self.tmp, "logs", "agent.jsonl")
+        handler = SizeAndTimeRotatingFileHandler(path, max_bytes=200, backup_count=2, max_age=3600)
+        self.addCleanup(handler.close)
+        for i in range(20):
+            handler.emit(make_record(f"message {i} " + "x" * 50))
+        self.assertEqual(sorted(os.listdir(os.path.dirname(path))), ["agent.jsonl", "agent.jsonl.1", "agent.jsonl.2"])
+
+        handler.maxBytes = 0
+        self.assertFalse(handler.shouldRollover(make_record("fresh")))
+        handler.opened_at = time.time() - 7200
+        self.assertTrue(handler.shouldRollover(make_record("old")))
+
+    def test_content_files_are_pruned(self):
+        """Only the newest content files are kept"""
+        from app.utils.logger import ContentFileHandler
+        handler = ContentFileHandler(keep=2)
+        for i in range(4):
+            path = os.path.join(self.tmp, "content", f"part_{i}.txt")
+            handler.emit(make_record("saved", content=f"body {i}", content_file=path))
+            os.utime(path, (i, i))
+        self.assertEqual(sorted(os.listdir(os.path.join(self.tmp, "content"))), ["part_2.txt", "part_3.txt"])
+
+    def test_log_content_writes_once_in_background(self):
+        """log_content returns at once and the listener writes the content file"""
+        from app.utils import logger as logger_module
+        with patch.object(logger_module, "LOGS_DIR", self.tmp):
+            path = logger_module.log_content("Contact: Jane", "linkedin_message_analysis")
+        self.assertTrue(path.startswith(os.path.join(self.tmp, "message_analysis")))
+
+        deadline = time.time() + 5
+        while not os.path.exists(path) and time.time() < deadline:
+            time.sleep(0.01)
+        with open(path) as f:
+            self.assertIn("Contact: Jane", f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Tests for the keyword message classifier.
+"""
+
+import unittest
+
+
+class TestMessageClassifier(unittest.TestCase):
+    """Test labels, word boundaries and confidence scores"""
+
+    def test_labels(self):
+        """Each message type is recognised, including inflected keywords"""
+        from app.tools.message_classifier import classify
+        cases = {
+            "Would love to connect with you": "connection_request",
+            "Nice to meet you at the conference": "connection_request",
+            "We are hiring a senior engineer": "job_opportunity",
+            "I'm a recruiter at Acme": "job_opportunity",
+            "Exciting opportunities at our company": "job_opportunity",
+            "Book a demo of our new product": "sales_pitch",
+            "Start your FREE TRIAL today": "sales_pitch",
+            "Thanks, talk soon!": "general",
+        }
+        for message, label in cases.items():
+            with self.subTest(message=message):
+                self.assertEqual(classify(message)[0], label)
+
+    def test_word_boundaries(self):
+        """Keywords inside unrelated words do not count"""
+        from app.tools.message_classifier import classify
+        for message in ["That meeting was productive", "A jobless weekend", "Seriously controlled"]:
+            with self.subTest(message=message):
+                self.assertEqual(classify(message), ("general", 1.0))
+
+    def test_priority_and_confidence(self):
+        """The first matching type wins and confidence reflects the share of hits"""
+        from app.tools.message_classifier import classify
+        label, mixed = classify("Let's connect, we are hiring for a role and offer a discount")
+        self.assertEqual(label, "connection_request")
+        _, focused = classify("We are hiring for a role, the job is remote")
+        self.assertLess(mixed, focused)
+        self.assertTrue(0 < mixed < focused < 1)
+
+    def test_classify_many(self):
+        """The batch API returns the same results in order"""
+        from app.tools.message_classifier import classify, classify_many
+        messages = ["connect?", "", None, "our product", "hi"]
+        self.assertEqual(classify_many(messages), [classify(m) for m in messages])
+
+    def test_label_matches_classify(self):
+        """The label-only path agrees with classify, word boundaries and priority included"""
+        from app.tools.message_classifier import classify, label, label_many
+        messages = ["Let's connect, we are hiring and offer a discount", "We are hiring for a role",
+                    "Quite productive", "A jobless weekend", "Nice  to\nmeet you", "Start your FREE TRIAL",
+                    "Connected recruiters", "", None, "hi"]
+        for message in messages:
+            with self.subTest(message=message):
+                self.assertEqual(label(message), classify(message)[0])
+        self.assertEqual(label_many(messages), [classify(m)[0] for m in messages])
+
+    def test_shared_keyword_belongs_to_first_category(self):
+        """A keyword listed by two categories counts for the one listed first"""
+        from app.tools.message_classifier import MessageClassifier
+        classifier = MessageClassifier([("first", ["offer", "demo"]), ("second", ["offer", "job"])])
+        self.assertEqual(classifier.label("Our offer"), "first")
+        self.assertEqual(classifier.classify("Our offer and a job"), ("first", 0.25))
+        self.assertEqual(classifier.label("Some jobs"), "second")
+
+    def test_determine_message_type(self):
+        """The suggestion prompts keep using the same labels"""
+        from app.tools.linkedin_tools import determine_message_type
+        self.assertEqual(determine_message_type("We are hiring!"), "job_opportunity")
+        self.assertEqual(determine_message_type("Quite productive"), "general")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Tests for parsing the LinkedIn messaging page.
+The fast parsing path must return exactly what the full-page html.parser
+path returns on the saved fixtures.
+"""
+
+import os
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+FIXTURES = [
+    "messaging_cards.html",
+    "messaging_listitem.html",
+    "messaging_overlay.html",
+    "messaging_empty.html",
+]
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class TestMessageParser(unittest.TestCase):
+    """Test parse_conversations on saved messaging pages"""
+
+    def test_fast_path_matches_full_parse(self):
+        """Scoped parsing gives the same result as parsing the whole page"""
+        from app.tools import message_parser
+        parsers = {"html.parser", message_parser.FAST_PARSER}
+        for name in FIXTURES:
+            page_source = load_fixture(name)
+            for limit in (1, 5, 100):
+                expected = message_parser.parse_conversations(page_source, limit, fast=False)
+                for parser in parsers:
+                    with self.subTest(fixture=name, limit=limit, parser=parser), \
+                         patch.object(message_parser, "FAST_PARSER", parser):
+                        self.assertEqual(message_parser.parse_conversations(page_source, limit), expected)
+
+    def test_conversation_cards(self):
+        """Fields are extracted with the selector fallbacks"""
+        from app.tools.message_parser import parse_conversations
+        conversations = parse_conversations(load_fixture("messaging_cards.html"), limit=10)
+
+        self.assertEqual(len(conversations), 6)
+        self.assertEqual(conversations[0], {
+            "contact": "Jane   Recruiter",
+            "messages": ["Hi! We have an opening for a Senior Engineer role & I think you'd be a great fit."],
+            "message_count": 1,
+            "conversation_id": "2-MjQ1ZTRhN2Yt",
+            "timestamp": "10:32 AM",
+        })
+        self.assertEqual(conversations[1]["conversation_id"], "2-ZGVhZGJlZWYt")
+        self.assertEqual(conversations[2]["messages"], ["Great to reconnect, let's grab coffee!"])
+        self.assertEqual(conversations[3]["contact"], "Unknown Contact")
+        self.assertEqual(conversations[4]["messages"], ["No message content"])
+
+    def test_selector_fallbacks(self):
+        """Older list layouts and the overlay bubbles are still found"""
+        from app.tools.message_parser import parse_conversations
+        listitems = parse_conversations(load_fixture("messaging_listitem.html"))
+        self.assertEqual([c["contact"] for c in listitems], ["Priya Product", "Omar   Ops", "Lee Lead"])
+
+        overlay = parse_conversations(load_fixture("messaging_overlay.html"))
+        self.assertEqual([c["contact"] for c in overlay], ["Olivia Overlay", "Second Bubble"])
+
+    def test_limit_and_empty_page(self):
+        """The limit is honoured and an empty inbox gives an empty list"""
+        from app.tools.message_parser import parse_conversations
+        self.assertEqual(len(parse_conversations(load_fixture("messaging_cards.html"), limit=2)), 2)
+        self.assertEqual(parse_conversations(load_fixture("messaging_empty.html")), [])
+
+
+
+class TestThreadParser(unittest.TestCase):
+    """Test parse_thread and parse_day_heading"""
+
+    TODAY = date(2025, 3, 10)
+
+    def test_thread_messages_newest_first(self):
+        """Messages come back newest first with the group sender carried over"""
+        from app.tools.message_parser import parse_thread
+        thread = parse_thread(load_fixture("messaging_thread.html"), today=self.TODAY)
+
+        self.assertEqual([m["content"] for m in thread], [
+            "About 12 engineers. Free for a call?",
+            "Sounds interesting, what's the team size?",
+            "It's remote-friendly & well paid.",
+            "We have an opening for a Senior Engineer role.",
+            "Happy holidays! Hope you're well.",
+        ])
+        self.assertEqual(thread[0]["sender"], "Jane Recruiter")
+        self.assertEqual(thread[1]["sender"], "You")
+        self.assertEqual(thread[2]["sender"], "Jane Recruiter")
+        self.assertEqual(thread[2]["day"], "2025-03-03")
+        self.assertEqual(thread[4]["day"], "2024-12-30")
+
+    def test_thread_depth_and_age(self):
+        """Depth keeps the newest messages and the age limit drops old days"""
+        from app.tools.message_parser import parse_thread
+        page_source = load_fixture("messaging_thread.html")
+        self.assertEqual(len(parse_thread(page_source, depth=2, today=self.TODAY)), 2)
+        self.assertEqual(len(parse_thread(page_source, max_age_days=30, today=self.TODAY)), 4)
+        self.assertEqual(len(parse_thread(page_source, max_age_days=1, today=self.TODAY)), 2)
+
+    def test_day_headings(self):
+        """Relative and absolute day headings are resolved against today"""
+        from app.tools.message_parser import parse_day_heading
+        self.assertEqual(parse_day_heading("Today", self.TODAY), self.TODAY)
+        self.assertEqual(parse_day_heading("Yesterday", self.TODAY), date(2025, 3, 9))
+        # 2025-03-10 is a Monday
+        self.assertEqual(parse_day_heading("Friday", self.TODAY), date(2025, 3, 7))
+        self.assertEqual(parse_day_heading("Monday", self.TODAY), date(2025, 3, 3))
+        self.assertEqual(parse_day_heading("Mar 4", self.TODAY), date(2025, 3, 4))
+        self.assertEqual(parse_day_heading("Dec 30", self.TODAY), date(2024, 12, 30))
+        self.assertEqual(parse_day_heading("Dec 30, 2023", self.TODAY), date(2023, 12, 30))
+        self.assertIsNone(parse_day_heading("Sponsored", self.TODAY))
+
+
+if __name__ == "__main__":
+    unittest.main()
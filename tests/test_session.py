@@ -0,0 +1,82 @@
+"""
+Tests for persisting and restoring LinkedIn browser sessions.
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+
+
+class TestSessionStore(unittest.TestCase):
+    """Test the SessionStore used by LinkedInTool.login"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def _make_store(self, **kwargs):
+        from app.tools.session import SessionStore
+        return SessionStore("user@example.com", session_dir=self.tmp_dir.name, **kwargs)
+
+    def _make_driver(self, cookies):
+        driver = MagicMock()
+        driver.get_cookies.return_value = cookies
+        driver.execute_script.return_value = {"voyager": "1"}
+        return driver
+
+    def test_save_and_restore(self):
+        """A saved session is written privately and applied to a new browser"""
+        store = self._make_store()
+        cookies = [{"name": "li_at", "value": "token", "expiry": time.time() + 3600}]
+        self.assertTrue(store.save(self._make_driver(cookies)))
+        self.assertEqual(os.stat(store.session_file).st_mode & 0o777, 0o600)
+        self.assertNotIn("user@example.com", store.session_file)
+
+        new_driver = MagicMock()
+        self.assertTrue(store.restore(new_driver))
+        new_driver.get.assert_called_once_with("https://www.linkedin.com/robots.txt")
+        new_driver.add_cookie.assert_called_once_with(cookies[0])
+
+    def test_missing_auth_cookie_is_stale(self):
+        """Sessions without the auth cookie are not worth restoring"""
+        store = self._make_store()
+        store.save(self._make_driver([{"name": "lang", "value": "en"}]))
+        self.assertIsNone(store.load())
+        self.assertFalse(store.restore(MagicMock()))
+
+    def test_expired_session_is_stale(self):
+        """Sessions past their expiry or max age are rejected offline"""
+        store = self._make_store()
+        store.save(self._make_driver([{"name": "li_at", "value": "token", "expiry": time.time() - 1}]))
+        self.assertIsNone(store.load())
+
+        store = self._make_store(max_age_hours=0)
+        store.save(self._make_driver([{"name": "li_at", "value": "token"}]))
+        self.assertIsNone(store.load())
+
+    def test_clear(self):
+        """Clearing removes the stored session file"""
+        store = self._make_store()
+        store.save(self._make_driver([{"name": "li_at", "value": "token"}]))
+        store.clear()
+        self.assertFalse(os.path.exists(store.session_file))
+        store.clear()
+
+    def test_discard(self):
+        """A rejected session is removed from disk and from the browser"""
+        store = self._make_store()
+        driver = self._make_driver([{"name": "li_at", "value": "token"}])
+        store.save(driver)
+        store.discard(driver)
+        self.assertFalse(os.path.exists(store.session_file))
+        driver.delete_all_cookies.assert_called_once()
+        driver.execute_script.assert_called_with("window.localStorage.clear();")
+
+        driver.delete_all_cookies.side_effect = Exception("browser closed")
+        store.discard(driver)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+Tests for timing spans and the Chrome trace-event export.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+
+class TestTracer(unittest.TestCase):
+    """Test span recording, nesting and export"""
+
+    def _make_tracer(self, **kwargs):
+        from app.utils.tracing import Tracer
+        return Tracer(enabled=True, **kwargs)
+
+    def test_nested_spans_and_attributes(self):
+        """Nested spans are recorded inside their parent with their attributes"""
+        tracer = self._make_tracer()
+        with tracer.span("linkedin.extract_messages", limit=5):
+            with tracer.span("browser.page_source") as span:
+                span.set(bytes=1234)
+
+        inner, outer = tracer._events
+        self.assertEqual(inner["args"], {"bytes": 1234})
+        self.assertEqual(outer["args"], {"limit": 5})
+        self.assertEqual(outer["cat"], "linkedin")
+        self.assertLessEqual(outer["ts"], inner["ts"])
+        self.assertGreaterEqual(outer["ts"] + outer["dur"], inner["ts"] + inner["dur"])
+
+    def test_errors_are_recorded(self):
+        """A failing block still produces a span, marked with the error"""
+        tracer = self._make_tracer()
+        with self.assertRaises(ValueError):
+            with tracer.span("llm.invoke"):
+                raise ValueError("boom")
+        self.assertEqual(tracer._events[0]["args"]["error"], "ValueError: boom")
+
+    def test_traced_decorator(self):
+        """The decorator form times the call and returns its result"""
+        tracer = self._make_tracer()
+        work = tracer.traced("browser.start")(lambda: 42)
+        self.assertEqual(work(), 42)
+        self.assertEqual(tracer._events[0]["name"], "browser.start")
+
+    def test_export(self):
+        """The trace file is valid Chrome trace-event JSON and the tracer starts over"""
+        tracer = self._make_tracer()
+        with tracer.span("crew.kickoff", when=object()):
+            with tracer.span("llm.invoke"):
+                pass
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = tracer.export(os.path.join(tmp, "trace.json"))
+            with open(path) as f:
+                trace = json.load(f)
+
+        spans = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+        self.assertEqual(sorted(event["name"] for event in spans), ["crew.kickoff", "llm.invoke"])
+        self.assertIsInstance(spans[-1]["args"]["when"], str)
+        self.assertIsNone(tracer.export())
+
+    def test_export_keeps_newest_traces(self):
+        """Only the newest keep trace files are left in the trace directory"""
+        tracer = self._make_tracer(keep=2)
+        with tempfile.TemporaryDirectory() as tmp:
+            for index in range(3):
+                old = os.path.join(tmp, f"trace_2020010{index}_000000.json")
+                open(old, "w").close()
+                os.utime(old, (index, index))
+            other = os.path.join(tmp, "notes.json")
+            open(other, "w").close()
+            os.utime(other, (0, 0))
+
+            with tracer.span("watch.poll"):
+                pass
+            path = tracer.export(os.path.join(tmp, "trace_20300101_000000.json"))
+
+            self.assertEqual(sorted(os.listdir(tmp)),
+                             ["notes.json", "trace_20200102_000000.json", os.path.basename(path)])
+
+    def test_thread_names_of_finished_threads(self):
+        """Spans of a thread that has exited by export time keep its name"""
+        import threading
+
+        tracer = self._make_tracer()
+
+        def work():
+            with tracer.span("llm.invoke"):
+                pass
+
+        worker = threading.Thread(target=work, name="suggestion_0")
+        worker.start()
+        worker.join()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(tracer.export(os.path.join(tmp, "trace.json"))) as f:
+                trace = json.load(f)
+
+        names = [event["args"]["name"] for event in trace["traceEvents"] if event["ph"] == "M"]
+        self.assertEqual(names, ["suggestion_0"])
+
+    def test_counter(self):
+        """Counters are recorded as "C" events and left out of the span summary"""
+        tracer = self._make_tracer()
+        tracer.counter("browser.memory", rss_mb=512.0)
+        with tracer.span("watch.poll"):
+            pass
+
+        counter = tracer._events[0]
+        self.assertEqual((counter["ph"], counter["args"]), ("C", {"rss_mb": 512.0}))
+        self.assertEqual(list(tracer.summary()), ["watch.poll"])
+
+    def test_bounded_and_disabled(self):
+        """At most max_events spans are kept, and a disabled tracer records nothing"""
+        tracer = self._make_tracer(max_events=2)
+        for _ in range(5):
+            with tracer.span("browser.wait"):
+                pass
+        self.assertEqual(len(tracer._events), 2)
+        self.assertEqual(tracer.summary()["browser.wait"]["count"], 2)
+
+        from app.utils.tracing import Tracer
+        disabled = Tracer(enabled=False)
+        with disabled.span("browser.wait") as span:
+            span.set(selector_hit="x")
+        self.assertEqual(disabled._events, [])
+        self.assertIsNone(disabled.export())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,8 @@ Utility script to check ChromeDriver installation and compatibility with Chrome.
 Run this script to diagnose ChromeDriver issues.
 """
 
+import argparse
+import importlib.util
 import os
 import sys
 import platform
@@ -12,6 +14,9 @@ import re
 import time
 import logging
 
+# Add the project root directory to Python path so the app's driver cache can be shared
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -96,43 +101,69 @@ def find_chrome_binary():
     logger.warning("Could not find Chrome/Chromium binary")
     return None
 
-def test_selenium_setup():
-    """Test if Selenium can set up and use ChromeDriver"""
+def check_driver_cache(refresh=False):
+    """Report the driver manifest used by the app and optionally refresh it
+    
+    Returns the resolved ChromeDriver path, or None if it could not be resolved.
+    """
+    try:
+        from app.tools.driver_cache import DriverManifest, resolve_chromedriver
+    except ImportError as e:
+        logger.error(f"Could not load the app's driver cache: {e}")
+        return None
+    
+    manifest = DriverManifest()
+    entry = manifest.lookup()
+    if entry:
+        logger.info(f"Driver manifest at {manifest.path} is current: "
+                    f"Chrome {entry['chrome_version']} ({entry['chrome_binary']}) -> {entry['driver_path']}")
+    else:
+        logger.info(f"Driver manifest at {manifest.path} is missing or stale")
+    
+    if refresh or not entry:
+        try:
+            logger.info("Refreshing driver manifest (probing Chrome and installing ChromeDriver)...")
+            entry = resolve_chromedriver(refresh=True)
+        except Exception as e:
+            logger.error(f"Failed to install ChromeDriver: {e}")
+            return None
+    
+    if not entry:
+        return None
+    
+    driver_path = entry["driver_path"]
+    logger.info(f"ChromeDriver installed at: {driver_path}")
+    
+    # Check if the file is executable
+    if not os.access(driver_path, os.X_OK):
+        logger.error(f"ChromeDriver at {driver_path} is not executable!")
+    else:
+        logger.info(f"ChromeDriver at {driver_path} is executable")
+    
+    return driver_path
+
+def test_selenium_setup(refresh=False):
+    """Test if Selenium can set up and use ChromeDriver
+    
+    The shared driver manifest is only refreshed when it is missing or stale,
+    or when refresh is set.
+    """
     try:
         from selenium import webdriver
         from selenium.webdriver.chrome.options import Options
         
         logger.info("Selenium is installed")
         
-        try:
-            from webdriver_manager.chrome import ChromeDriverManager
+        if importlib.util.find_spec("webdriver_manager"):
             logger.info("webdriver_manager is installed")
-            
-            # Create a local directory for testing
-            test_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".test_drivers")
-            os.makedirs(test_dir, exist_ok=True)
-            
-            # Try to install ChromeDriver
-            try:
-                logger.info("Attempting to install ChromeDriver...")
-                driver_path = ChromeDriverManager(path=test_dir).install()
-                logger.info(f"ChromeDriver installed at: {driver_path}")
-                
-                # Make sure the file is executable
-                os.chmod(driver_path, 0o755)
-                
-                # Check if the file is executable
-                if not os.access(driver_path, os.X_OK):
-                    logger.error(f"ChromeDriver at {driver_path} is not executable!")
-                else:
-                    logger.info(f"ChromeDriver at {driver_path} is executable")
-                
-            except Exception as e:
-                logger.error(f"Failed to install ChromeDriver: {e}")
-                return
-        except ImportError:
+        else:
             logger.warning("webdriver_manager is not installed")
         
+        # Check the shared driver manifest, the app picks up any refresh
+        driver_path = check_driver_cache(refresh=refresh)
+        if not driver_path:
+            return
+        
         # Try to start Chrome with Selenium
         logger.info("Attempting to start Chrome with Selenium...")
         
@@ -147,19 +178,17 @@ def test_selenium_setup():
             options.binary_location = chrome_binary
         
         try:
-            # Try with webdriver_manager if available
+            # Try with the driver resolved into the shared manifest
             from selenium.webdriver.chrome.service import Service
-            from webdriver_manager.chrome import ChromeDriverManager
             
-            driver_path = ChromeDriverManager(path=test_dir).install()
             service = Service(executable_path=driver_path)
             driver = webdriver.Chrome(service=service, options=options)
             
-            logger.info("Successfully started Chrome with webdriver_manager")
+            logger.info("Successfully started Chrome with the cached ChromeDriver")
             driver.quit()
             
         except Exception as e:
-            logger.error(f"Failed to start Chrome with webdriver_manager: {e}")
+            logger.error(f"Failed to start Chrome with the cached ChromeDriver: {e}")
             
             # Try with default Service
             try:
@@ -179,6 +208,11 @@ def test_selenium_setup():
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Check ChromeDriver installation and compatibility with Chrome.")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Probe Chrome and reinstall ChromeDriver even if the driver manifest is current")
+    args = parser.parse_args()
+    
     logger.info("=== ChromeDriver Compatibility Check ===")
     logger.info(f"Platform: {platform.platform()}")
     logger.info(f"Python version: {sys.version}")
@@ -194,7 +228,7 @@ def main():
     chrome_binary = find_chrome_binary()
     
     # Check Selenium setup
-    test_selenium_setup()
+    test_selenium_setup(refresh=args.refresh)
     
     logger.info("=== Check Complete ===")
     